@@ -0,0 +1,556 @@
+"""
+Throughput benchmarks for the migration tool.
+
+`load-modes` compares the `executemany` and `LOAD DATA LOCAL INFILE` load modes on the
+same synthetic rows against a real MySQL server, for a fresh insert and for an upsert
+over existing keys, and checks that both modes leave identical table contents behind.
+It uses the MySQL credentials from `.env`; scratch tables named `benchmark_*` are
+dropped and recreated on every run.
+
+`offline` needs no database. It runs the real loaders (`fetch_and_insert_rows`,
+`fetch_and_update_rows`) end to end between a synthetic pyodbc-style source and a
+recording MySQL stand-in, for the insert, upsert and incremental (checkpointed) paths.
+Each scenario runs in a fresh process and reports rows/s, peak RSS and per-phase
+timings, compared against a stored baseline.
+
+Usage:
+    python benchmark.py load-modes --rows 200000 --batch-size 5000
+    python benchmark.py offline --rows 100000 --save-baseline
+    python benchmark.py offline --rows 100000
+"""
+import os
+import sys
+import json
+import time
+import random
+import logging
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from decimal import Decimal
+from datetime import datetime, date, timedelta
+from dotenv import load_dotenv
+from db_operations import (
+    connect_mysql,
+    close_connections,
+    create_mysql_table_from_odbc_metadata,
+    drop_mysql_table_if_exists,
+    insert_data_to_mysql,
+    upsert_data_to_mysql,
+    load_data_to_mysql,
+    fetch_odbc_metadata,
+    fetch_and_insert_rows,
+    fetch_and_update_rows
+)
+from metrics import TableMetrics
+from sync_state import SYNC_STATE_TABLE, mapping_key, save_sync_state
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+# Converted-row layout written by the benchmarks, as (name, type) metadata tuples
+BENCHMARK_COLUMNS = [
+    ("INV_ID", "INT"),
+    ("INV_CUSNME", "STRING"),
+    ("INV_TOTAL", "DECIMAL"),
+    ("INV_DATE", "DATE"),
+    ("INV_TIME", "TIME"),
+    ("INV_NOTES", "TEXT"),
+]
+BENCHMARK_PRIMARY_KEY = ["INV_ID"]
+BENCHMARK_UPDATE_COLUMNS = ["INV_CUSNME", "INV_TOTAL", "INV_NOTES"]
+TIMESTAMP_COLUMNS = [("created_at", "DATETIME"), ("updated_at", "DATETIME")]
+
+
+def synthetic_rows(row_count, seed=0, now=None):
+    """
+    Generate converted rows shaped like `convert_chunk` output for BENCHMARK_COLUMNS.
+
+    Values include NULLs and text with tabs, newlines and backslashes so the
+    LOAD DATA escaping is exercised.
+    """
+    rng = random.Random(seed)
+    now = now or datetime(2024, 1, 1, 12, 0, 0)
+    awkward_notes = ["tab\tseparated", "line\nbreak", "back\\slash", "\\N", "carriage\rreturn", ""]
+    rows = []
+    for row_id in range(1, row_count + 1):
+        rows.append((
+            row_id,
+            f"CUSTOMER {rng.randint(1, 5000):05d}",
+            Decimal(rng.randint(0, 10_000_000)) / 100,
+            None if row_id % 50 == 0 else date(2020, 1, 1) + timedelta(days=rng.randint(0, 1800)),
+            None if row_id % 40 == 0 else f"{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:00",
+            rng.choice(awkward_notes) if row_id % 7 == 0 else "x" * rng.randint(0, 120),
+            now,
+            now,
+        ))
+    return rows
+
+
+def time_batches(rows, batch_size, write_batch):
+    """Write rows in batches and return the elapsed seconds."""
+    started = time.perf_counter()
+    for offset in range(0, len(rows), batch_size):
+        write_batch(rows[offset:offset + batch_size])
+    return time.perf_counter() - started
+
+
+def benchmark_load_modes(mysql_conn, row_count, batch_size):
+    """
+    Time inserts and upserts for each load mode into its own scratch table.
+
+    Returns:
+        list: (mode, phase, rows, seconds) tuples.
+    """
+    columns = BENCHMARK_COLUMNS + TIMESTAMP_COLUMNS
+    rows = synthetic_rows(row_count)
+    # Upsert pass: same keys, changed update columns and a later timestamp
+    later = datetime(2024, 1, 2, 12, 0, 0)
+    updated_rows = [row[:1] + (row[1] + " UPDATED", row[2] + 1) + row[3:5] + (row[5] + "!",) + (later, later) for row in rows]
+
+    writers = {
+        "executemany": (
+            lambda table, chunk: insert_data_to_mysql(mysql_conn, table, columns, chunk, BENCHMARK_PRIMARY_KEY, batch_size),
+            lambda table, chunk: upsert_data_to_mysql(mysql_conn, table, columns, chunk, BENCHMARK_UPDATE_COLUMNS),
+        ),
+        "load_data": (
+            lambda table, chunk: load_data_to_mysql(mysql_conn, table, columns, chunk, BENCHMARK_PRIMARY_KEY),
+            lambda table, chunk: load_data_to_mysql(
+                mysql_conn, table, columns, chunk, BENCHMARK_PRIMARY_KEY, update_columns=BENCHMARK_UPDATE_COLUMNS
+            ),
+        ),
+    }
+
+    results = []
+    for mode, (insert_batch, upsert_batch) in writers.items():
+        table = f"benchmark_{mode}"
+        drop_mysql_table_if_exists(mysql_conn, table)
+        create_mysql_table_from_odbc_metadata(mysql_conn, table, BENCHMARK_COLUMNS, BENCHMARK_PRIMARY_KEY, [], {})
+        results.append((mode, "insert", len(rows), time_batches(rows, batch_size, lambda chunk: insert_batch(table, chunk))))
+        results.append((mode, "upsert", len(rows), time_batches(updated_rows, batch_size, lambda chunk: upsert_batch(table, chunk))))
+    return results
+
+
+def table_checksums(mysql_conn, tables):
+    """Return `CHECKSUM TABLE` values keyed by table name."""
+    cursor = mysql_conn.cursor()
+    try:
+        cursor.execute(f"CHECKSUM TABLE {', '.join(f'`{table}`' for table in tables)}")
+        return {name.split(".")[-1]: checksum for name, checksum in cursor.fetchall()}
+    finally:
+        cursor.close()
+
+
+# Synthetic source tables for the offline benchmarks. Columns are (name, Python type
+# reported in `cursor.description`, value kind, width); `exceptions` and
+# `update_columns` are used as a table mapping would.
+SYNTHETIC_TABLES = {
+    "narrow": {
+        "columns": [
+            ("ID", int, "id", 0),
+            ("NAME", str, "text", 20),
+            ("AMOUNT", Decimal, "decimal", 0),
+            ("INV_DATE", date, "date", 0),
+            ("INV_TIME", str, "time_str", 0),
+        ],
+        "exceptions": {"INV_TIME": {"type": "TIME"}},
+        "update_columns": ["NAME", "AMOUNT"],
+    },
+    "wide": {
+        "columns": (
+            [("ID", int, "id", 0)]
+            + [(f"TXT_{n:02d}", str, "text", 60) for n in range(1, 25)]
+            + [(f"AMT_{n:02d}", Decimal, "decimal", 0) for n in range(1, 5)]
+            + [
+                ("DUE_DATE", str, "date_str", 0),
+                ("INV_TIME", str, "time_str", 0),
+                ("NOTES", str, "text", 400),
+                ("CREATED", datetime, "datetime", 0),
+            ]
+        ),
+        "exceptions": {"DUE_DATE": {"type": "DATE"}, "INV_TIME": {"type": "TIME"}},
+        "update_columns": ["TXT_01", "AMT_01", "NOTES"],
+    },
+}
+OFFLINE_SCENARIOS = ["insert", "upsert", "incremental"]
+# Share of the table the incremental scenario reads past its stored watermark
+INCREMENTAL_FRACTION = 0.1
+# Dirty values substituted for a column kind with probability `dirty_ratio`
+DIRTY_VALUES = {
+    "text": ["trailing spaces   ", "", None],
+    "time_str": ["25:61 PM", "", "9:30A", None],
+    "date_str": ["13/45/2020", "", "2021-02-30", None],
+}
+DEFAULT_BASELINE_PATH = "benchmark_baseline.json"
+
+
+def _value_pool(kind, width, rng):
+    """Distinct values to draw from for one column kind, so rows are cheap to generate."""
+    if kind == "text":
+        alphabet = "ABCDEFGHIJKLMNOPQRSTUVWXYZ 0123456789"
+        return ["".join(rng.choice(alphabet) for _ in range(rng.randint(width // 2, width))) for _ in range(256)]
+    if kind == "decimal":
+        return [Decimal(rng.randint(0, 10_000_000)) / 100 for _ in range(1024)]
+    if kind == "date":
+        return [date(2020, 1, 1) + timedelta(days=day) for day in range(1800)]
+    if kind == "datetime":
+        return [datetime(2020, 1, 1) + timedelta(minutes=rng.randint(0, 2_500_000)) for _ in range(1024)]
+    if kind == "time_str":
+        return [f"{hour % 12 or 12}:{minute:02d} {'AM' if hour < 12 else 'PM'}" for hour in range(24) for minute in range(60)]
+    if kind == "date_str":
+        return [(date(2020, 1, 1) + timedelta(days=day)).strftime("%m/%d/%Y") for day in range(1800)]
+    return [None]
+
+
+class SyntheticOdbcCursor:
+    """
+    pyodbc-style cursor over generated rows, ordered by the `id` column (1..row_count).
+
+    Only what the loaders issue is understood: the `WHERE 1=0` metadata probe, `TOP n`
+    page limits, and a single-column keyset predicate whose value is the last parameter.
+    Other predicates are ignored.
+    """
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.description = None
+        self._next_id = 1
+        self._last_id = 0
+
+    def execute(self, query, *params):
+        columns = self.connection.columns
+        self.description = [(name, python_type, None, width or None, None, None, True) for name, python_type, _, width in columns]
+        if "WHERE 1=0" in query:
+            self._next_id, self._last_id = 1, 0
+            return self
+        self._next_id = int(params[-1]) + 1 if params else 1
+        self._last_id = self.connection.row_count
+        if " TOP " in query:
+            limit = int(query.split(" TOP ", 1)[1].split()[0])
+            self._last_id = min(self._last_id, self._next_id + limit - 1)
+        return self
+
+    def fetchmany(self, size):
+        end_id = min(self._last_id, self._next_id + size - 1)
+        rows = [self.connection.make_row(row_id) for row_id in range(self._next_id, end_id + 1)]
+        self._next_id = end_id + 1
+        return rows
+
+    def close(self):
+        pass
+
+
+class SyntheticOdbcConnection:
+    """Stand-in for a pyodbc connection serving one generated table."""
+
+    def __init__(self, table_spec, row_count, dirty_ratio=0.0, seed=0):
+        self.columns = table_spec["columns"]
+        self.row_count = row_count
+        self.dirty_ratio = dirty_ratio
+        self.rng = random.Random(seed)
+        self.pools = [_value_pool(kind, width, self.rng) for _, _, kind, width in self.columns]
+
+    def make_row(self, row_id):
+        rng = self.rng
+        row = []
+        for (_, _, kind, _), pool in zip(self.columns, self.pools):
+            if kind == "id":
+                row.append(row_id)
+            elif self.dirty_ratio and kind in DIRTY_VALUES and rng.random() < self.dirty_ratio:
+                row.append(rng.choice(DIRTY_VALUES[kind]))
+            else:
+                row.append(pool[rng.randrange(len(pool))])
+        return tuple(row)
+
+    def cursor(self):
+        return SyntheticOdbcCursor(self)
+
+    def close(self):
+        pass
+
+
+class RecordingMySQLCursor:
+    """
+    Cursor of the MySQL stand-in: answers the few reads the loaders make and records writes.
+
+    `executemany` renders every value with `str()` as a rough stand-in for the client-side
+    statement encoding a real connector does.
+    """
+
+    def __init__(self, connection):
+        self.connection = connection
+        self._result = []
+
+    def execute(self, query, params=None):
+        statement = " ".join(query.split())
+        self.connection.statements += 1
+        self._result = []
+        if statement.startswith("SELECT @@max_allowed_packet"):
+            self._result = [(64 * 1024 * 1024,)]
+        elif statement.startswith("SELECT COUNT(*) FROM information_schema"):
+            self._result = [(1,)]
+        elif statement.startswith("SELECT `state_value`") and SYNC_STATE_TABLE in statement:
+            value = self.connection.sync_state.get(tuple(params))
+            self._result = [(value,)] if value is not None else []
+        elif statement.startswith(f"INSERT INTO `{SYNC_STATE_TABLE}`"):
+            self.connection.sync_state[tuple(params[:2])] = params[2]
+
+    def executemany(self, query, rows):
+        self.connection.statements += 1
+        for row in rows:
+            self.connection.rows += 1
+            self.connection.bytes += sum(len(str(value)) for value in row)
+
+    def fetchone(self):
+        return self._result.pop(0) if self._result else None
+
+    def fetchall(self):
+        result, self._result = self._result, []
+        return result
+
+    def close(self):
+        pass
+
+
+class RecordingMySQLConnection:
+    """Stand-in for a MySQL connection that keeps sync state in memory and counts writes."""
+
+    def __init__(self):
+        self.statements = 0
+        self.rows = 0
+        self.bytes = 0
+        self.commits = 0
+        self.sync_state = {}
+
+    def cursor(self):
+        return RecordingMySQLCursor(self)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        pass
+
+    def is_connected(self):
+        return True
+
+    def close(self):
+        pass
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB, or None where it cannot be measured."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def run_offline_scenario(
+    scenario, table, row_count, chunk_size, dirty_ratio=0.0, load_mode="executemany", seed=0,
+    pipeline_depth=0, conversion_workers=0
+):
+    """
+    Run one loader end to end against the synthetic source and the MySQL stand-in.
+
+    Returns:
+        dict: Scenario result with the load settings, rows, seconds, rows/s, peak RSS and phase timings.
+    """
+    # Keep dirty-value warnings from flooding the output without skipping their cost
+    logging.basicConfig(level=logging.WARNING, handlers=[logging.NullHandler()], force=True)
+    spec = SYNTHETIC_TABLES[table]
+    source_table = f"SYNTH_{table.upper()}"
+    destination_table = f"benchmark_{table}_{scenario}"
+    odbc_conn = SyntheticOdbcConnection(spec, row_count, dirty_ratio, seed)
+    mysql_conn = RecordingMySQLConnection()
+    metrics = TableMetrics(source_table, destination_table)
+    exceptions = spec["exceptions"]
+
+    with metrics.phase("metadata"):
+        columns = fetch_odbc_metadata(odbc_conn, source_table, exceptions)
+
+    loader_args = dict(
+        odbc_conn=odbc_conn,
+        mysql_conn=mysql_conn,
+        source_table=source_table,
+        destination_table=destination_table,
+        columns=columns,
+        primary_key=["ID"],
+        unique_keys=[],
+        exceptions=exceptions,
+        trim_trailing_spaces=True,
+        load_mode=load_mode,
+        queue_depth=pipeline_depth,
+        conversion_workers=conversion_workers,
+        metrics=metrics,
+    )
+    started = time.perf_counter()
+    if scenario == "upsert":
+        rows = fetch_and_update_rows(
+            sort_column=None, update_columns=spec["update_columns"], chunk_size=chunk_size, **loader_args
+        )
+    elif scenario == "incremental":
+        # Resume from a stored watermark so only the newest rows are read, page by page
+        start_id = int(row_count * (1 - INCREMENTAL_FRACTION))
+        save_sync_state(mysql_conn.cursor(), mapping_key(source_table, destination_table), "watermark", [start_id])
+        rows = fetch_and_insert_rows(
+            chunk_size, sort_column="ID", checkpoint=True, page_size=chunk_size * 4, **loader_args
+        )
+    else:
+        rows = fetch_and_insert_rows(chunk_size, sort_column=None, **loader_args)
+    seconds = time.perf_counter() - started
+
+    report = metrics.to_dict()
+    return {
+        "scenario": scenario,
+        "table": table,
+        "load_mode": load_mode,
+        "pipeline_depth": pipeline_depth,
+        "conversion_workers": conversion_workers,
+        "rows": rows,
+        "bad_rows": report["bad_rows"],
+        "seconds": round(seconds, 3),
+        "rows_per_second": round(rows / seconds, 1) if seconds else 0,
+        "peak_rss_mb": peak_rss_mb(),
+        "phases": {name: phase["seconds"] for name, phase in report["phases"].items()},
+    }
+
+
+def benchmark_offline(
+    scenarios, tables, row_count, chunk_size, dirty_ratio=0.0, load_mode="executemany",
+    pipeline_depth=0, conversion_workers=0
+):
+    """Run every scenario/table pair in a fresh process so peak RSS is measured per scenario."""
+    results = []
+    context = multiprocessing.get_context("spawn")
+    for table in tables:
+        for scenario in scenarios:
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                results.append(executor.submit(
+                    run_offline_scenario, scenario, table, row_count, chunk_size, dirty_ratio, load_mode,
+                    pipeline_depth=pipeline_depth, conversion_workers=conversion_workers
+                ).result())
+    return results
+
+
+def result_key(result):
+    """
+    Identify a result by scenario, table, load mode and worker settings, so only like runs are compared.
+
+    Baseline results recorded without these settings count as the defaults.
+    """
+    key = f"{result['scenario']}/{result['table']}/{result.get('load_mode', 'executemany')}"
+    if result.get("pipeline_depth"):
+        key += f" depth={result['pipeline_depth']}"
+    if result.get("conversion_workers"):
+        key += f" workers={result['conversion_workers']}"
+    return key
+
+
+def compare_with_baseline(results, baseline, tolerance):
+    """
+    Compare rows/s against a stored baseline.
+
+    Returns:
+        list: (key, baseline rows/s, current rows/s, relative change, regressed) tuples.
+    """
+    baseline_by_key = {result_key(result): result for result in baseline.get("results", [])}
+    comparisons = []
+    for result in results:
+        previous = baseline_by_key.get(result_key(result))
+        if not previous or not previous.get("rows_per_second"):
+            continue
+        change = result["rows_per_second"] / previous["rows_per_second"] - 1
+        comparisons.append((result_key(result), previous["rows_per_second"], result["rows_per_second"], change, change < -tolerance))
+    return comparisons
+
+
+def print_offline_results(results, comparisons):
+    phase_names = sorted({name for result in results for name in result["phases"]})
+    print(f"{'scenario':<48}{'rows':>9}{'bad':>7}{'seconds':>9}{'rows/s':>11}{'rss MB':>8}  " + " ".join(f"{name:>11}" for name in phase_names))
+    for result in results:
+        rss = result["peak_rss_mb"] if result["peak_rss_mb"] is not None else "-"
+        phases = " ".join(f"{result['phases'].get(name, 0):>11.3f}" for name in phase_names)
+        print(
+            f"{result_key(result):<48}{result['rows']:>9}{result['bad_rows']:>7}{result['seconds']:>9.2f}"
+            f"{result['rows_per_second']:>11.0f}{rss:>8}  {phases}"
+        )
+    if comparisons:
+        print("\nAgainst baseline:")
+        for key, previous, current, change, regressed in comparisons:
+            print(f"  {key:<46}{previous:>11.0f} -> {current:>11.0f} rows/s ({change:+.1%}){'  REGRESSION' if regressed else ''}")
+
+
+def print_results(results):
+    print(f"{'mode':<14}{'phase':<10}{'rows':>10}{'seconds':>10}{'rows/s':>12}")
+    for mode, phase, rows, seconds in results:
+        print(f"{mode:<14}{phase:<10}{rows:>10}{seconds:>10.2f}{rows / seconds if seconds else 0:>12.0f}")
+
+
+def main_offline(args):
+    results = benchmark_offline(
+        args.scenarios, args.tables, args.rows, args.batch_size, args.dirty_ratio, args.load_mode,
+        args.pipeline_depth, args.conversion_workers
+    )
+    comparisons = []
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline) as f:
+            comparisons = compare_with_baseline(results, json.load(f), args.tolerance)
+    print_offline_results(results, comparisons)
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump({"recorded_at": datetime.now().isoformat(timespec="seconds"), "results": results}, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+    if any(regressed for *_, regressed in comparisons):
+        sys.exit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the migration tool.")
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+    load_modes = subparsers.add_parser("load-modes", help="Compare executemany with LOAD DATA LOCAL INFILE.")
+    load_modes.add_argument("--rows", type=int, default=100_000, help="Synthetic rows to write per mode.")
+    load_modes.add_argument("--batch-size", type=int, default=int(os.getenv("BATCH_SIZE", 5000)), help="Rows per batch.")
+    offline = subparsers.add_parser("offline", help="Run the loaders against a synthetic source and a MySQL stand-in.")
+    offline.add_argument("--rows", type=int, default=100_000, help="Synthetic source rows per table.")
+    offline.add_argument("--batch-size", type=int, default=int(os.getenv("BATCH_SIZE", 5000)), help="Rows per batch.")
+    offline.add_argument("--tables", nargs="+", choices=sorted(SYNTHETIC_TABLES), default=sorted(SYNTHETIC_TABLES))
+    offline.add_argument("--scenarios", nargs="+", choices=OFFLINE_SCENARIOS, default=OFFLINE_SCENARIOS)
+    offline.add_argument("--dirty-ratio", type=float, default=0.01, help="Share of TIME/DATE/text values replaced with dirty ones.")
+    offline.add_argument("--load-mode", choices=["executemany", "load_data"], default="executemany")
+    offline.add_argument("--pipeline-depth", type=int, default=0, help="Batches buffered between the read, convert and write stages.")
+    offline.add_argument("--conversion-workers", type=int, default=0, help="Processes converting rows; 0 or 1 converts in the loader.")
+    offline.add_argument("--baseline", default=DEFAULT_BASELINE_PATH, help="Baseline results file to compare against.")
+    offline.add_argument("--save-baseline", action="store_true", help="Store this run as the new baseline.")
+    offline.add_argument("--tolerance", type=float, default=0.15, help="Allowed rows/s drop before a scenario counts as a regression.")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
+    if args.benchmark == "offline":
+        main_offline(args)
+        return
+
+    load_dotenv()
+    mysql_conn = connect_mysql(
+        os.getenv("DB_HOST", "localhost"),
+        os.getenv("DB_USER", "root"),
+        os.getenv("DB_PASSWORD", ""),
+        os.getenv("DB_NAME", "tracker"),
+        allow_local_infile=True
+    )
+    try:
+        results = benchmark_load_modes(mysql_conn, args.rows, args.batch_size)
+        print_results(results)
+        checksums = table_checksums(mysql_conn, ["benchmark_executemany", "benchmark_load_data"])
+        identical = len(set(checksums.values())) == 1
+        print(f"Table contents identical across modes: {'yes' if identical else 'NO'} {checksums}")
+    finally:
+        close_connections(mysql_conn)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,257 @@
+"""
+Building blocks of the continuous sync daemon (`main.py daemon`).
+
+`ConfigWatcher` reloads the mappings file when it changes, `IntervalScheduler` decides
+which mappings are due, and `StatusBoard` keeps the state of the daemon and of every
+mapping, written to a JSON file as runs finish and optionally served over HTTP.
+"""
+import os
+import json
+import time
+import logging
+import threading
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from sync_state import mapping_key
+
+# Seconds between mapping runs when neither the mapping nor DAEMON_INTERVAL set one
+DEFAULT_INTERVAL = 300
+# Longest sleep between checks for due mappings and config changes, in seconds
+DEFAULT_POLL_SECONDS = 5
+
+
+def _timestamp(value):
+    if not value or value == float("inf"):
+        return None
+    return datetime.fromtimestamp(value).isoformat(timespec="seconds")
+
+
+class ConfigWatcher:
+    """Reload the table mappings whenever the file's modification time changes."""
+
+    def __init__(self, path, loader):
+        self.path = path
+        self.loader = loader
+        self.mtime = None
+        self.mappings = []
+        self.loaded_at = None
+
+    def poll(self):
+        """
+        Reload the mappings if the file changed since the last successful load.
+
+        A file that cannot be read or holds no mappings is logged and the previous
+        mappings are kept, so a half-saved edit never stops the daemon.
+
+        Returns:
+            bool: True when new mappings were loaded.
+        """
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except OSError as e:
+            if self.mtime is not None:
+                logging.error(f"Cannot read {self.path}, keeping the current mappings: {str(e)}")
+            return False
+        if mtime == self.mtime:
+            return False
+        self.mtime = mtime
+        mappings = self.loader(self.path)
+        if not mappings:
+            logging.error(f"No valid table mappings in {self.path}, keeping the current mappings.")
+            return False
+        if self.loaded_at is not None:
+            logging.info(f"Reloaded {len(mappings)} table mappings from {self.path}.")
+        self.mappings = mappings
+        self.loaded_at = time.time()
+        return True
+
+
+class IntervalScheduler:
+    """
+    When each mapping runs next.
+
+    A mapping runs every `interval` seconds (its own, or `default_interval`), measured
+    from the start of its previous run. A run that takes longer than its interval is
+    followed by the next one immediately, never by a burst of missed runs.
+    """
+
+    def __init__(self, default_interval=DEFAULT_INTERVAL):
+        self.default_interval = default_interval
+        self.mappings = {}
+        self.next_due = {}
+
+    def interval(self, mapping):
+        return float(mapping.get("interval", self.default_interval))
+
+    def sync(self, mappings):
+        """Track a new set of mappings; new ones are due at once, known ones keep their schedule."""
+        self.mappings = {mapping_key(m.get("source"), m.get("destination")): m for m in mappings}
+        self.next_due = {key: self.next_due.get(key, 0.0) for key in self.mappings}
+
+    def started(self, mapping):
+        """Keep a mapping from being due again until its run has finished."""
+        key = mapping_key(mapping.get("source"), mapping.get("destination"))
+        if key in self.next_due:
+            self.next_due[key] = float("inf")
+
+    def due(self, now):
+        """Mappings whose next run is due, most overdue first."""
+        keys = sorted((key for key, due in self.next_due.items() if due <= now), key=self.next_due.get)
+        return [self.mappings[key] for key in keys]
+
+    def finished(self, mapping, started, finished):
+        """Schedule a mapping's next run; returns its due time."""
+        key = mapping_key(mapping.get("source"), mapping.get("destination"))
+        if key not in self.next_due:
+            return None
+        self.next_due[key] = max(started + self.interval(mapping), finished)
+        return self.next_due[key]
+
+    def seconds_until_next(self, now):
+        upcoming = [due for due in self.next_due.values() if due != float("inf")]
+        if not upcoming:
+            return None
+        return max(0.0, min(upcoming) - now)
+
+
+class StatusBoard:
+    """
+    Thread-safe state of the daemon and of each mapping.
+
+    `write` stores it as JSON through a temporary file, so readers never see a partial
+    file; `serve_status` exposes the same document over HTTP.
+    """
+
+    def __init__(self, path=None, stale_after=None):
+        self.path = path
+        self.stale_after = stale_after
+        self.started_at = time.time()
+        self.heartbeat_at = self.started_at
+        self.config_loaded_at = None
+        self.error = None
+        self.state = "running"
+        self.tables = {}
+        self._lock = threading.Lock()
+
+    def set_mappings(self, mappings, scheduler, loaded_at):
+        """Reset the table list to the current mappings, keeping what is known about each."""
+        with self._lock:
+            self.config_loaded_at = loaded_at
+            tables = {}
+            for mapping in mappings:
+                key = mapping_key(mapping.get("source"), mapping.get("destination"))
+                tables[key] = self.tables.get(key) or {
+                    "source": mapping.get("source"),
+                    "destination": mapping.get("destination"),
+                    "running": False,
+                    "runs": 0,
+                    "failures": 0,
+                    "last_status": None,
+                    "last_started_at": None,
+                    "last_rows": 0,
+                    "last_duration": None,
+                    "last_error": None,
+                    "last_success_at": None,
+                }
+                tables[key]["interval"] = scheduler.interval(mapping)
+                tables[key]["next_run_at"] = _timestamp(scheduler.next_due.get(key))
+            self.tables = tables
+
+    def start(self, mapping):
+        with self._lock:
+            table = self.tables.get(mapping_key(mapping.get("source"), mapping.get("destination")))
+            if table is not None:
+                table["running"] = True
+                table["next_run_at"] = None
+
+    def record(self, summary, started, next_due):
+        """Store the outcome of one mapping run (see `main.migrate_mapping`)."""
+        with self._lock:
+            table = self.tables.get(mapping_key(summary["source"], summary["destination"]))
+            if table is None:
+                return
+            table["running"] = False
+            table["runs"] += 1
+            table["last_status"] = summary["status"]
+            table["last_started_at"] = _timestamp(started)
+            table["last_rows"] = summary["rows"]
+            table["last_duration"] = round(summary["duration"], 3)
+            table["last_error"] = summary["error"]
+            table["next_run_at"] = _timestamp(next_due)
+            if summary["status"] == "failed":
+                table["failures"] += 1
+            else:
+                table["last_success_at"] = _timestamp(started + summary["duration"])
+
+    def heartbeat(self, error=None):
+        """Mark the main loop as alive; `error` is the last loop-level error, if any."""
+        with self._lock:
+            self.heartbeat_at = time.time()
+            self.error = error
+
+    def is_healthy(self):
+        """True while the main loop keeps beating; a loop stuck for `stale_after` seconds is unhealthy."""
+        if not self.stale_after:
+            return True
+        with self._lock:
+            return time.time() - self.heartbeat_at < self.stale_after
+
+    def to_dict(self):
+        with self._lock:
+            tables = [dict(table) for table in self.tables.values()]
+            status = {
+                "pid": os.getpid(),
+                "state": self.state,
+                "started_at": _timestamp(self.started_at),
+                "heartbeat_at": _timestamp(self.heartbeat_at),
+                "config_loaded_at": _timestamp(self.config_loaded_at),
+                "error": self.error,
+            }
+        status["healthy"] = self.is_healthy()
+        status["failing_tables"] = sum(1 for table in tables if table["last_status"] == "failed")
+        status["tables"] = tables
+        return status
+
+    def write(self):
+        if not self.path:
+            return
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump(self.to_dict(), f, indent=1)
+        os.replace(temp_path, self.path)
+
+
+def serve_status(board, host, port):
+    """
+    Serve the status board over HTTP from a background thread.
+
+    `GET /status` returns the board as JSON; `GET /health` returns 200 while the main
+    loop is alive and 503 once it has stalled.
+
+    Returns:
+        ThreadingHTTPServer: The running server; call `shutdown()` to stop it.
+    """
+    class StatusHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.rstrip("/") in ("", "/status"):
+                code, body = 200, board.to_dict()
+            elif self.path.rstrip("/") == "/health":
+                healthy = board.is_healthy()
+                code, body = (200 if healthy else 503), {"healthy": healthy}
+            else:
+                code, body = 404, {"error": "not found"}
+            payload = json.dumps(body, indent=1).encode("utf-8")
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            logging.debug(f"Status request: {format % args}")
+
+    server = ThreadingHTTPServer((host, port), StatusHandler)
+    thread = threading.Thread(target=server.serve_forever, name="status-http", daemon=True)
+    thread.start()
+    logging.info(f"Serving daemon status on http://{host}:{server.server_address[1]}/status")
+    return server
@@ -1,19 +1,654 @@
 import os
+import time
+import zlib
+import queue
+import hashlib
+import tempfile
 import pyodbc
 import logging
+import threading
+import multiprocessing
 import mysql.connector
-from datetime import datetime, timedelta, date
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+from decimal import Decimal
+from functools import lru_cache
+from datetime import datetime, timedelta, date, time as datetime_time
 from mysql.connector import Error as MySQLError
+from mysql.connector.errors import InterfaceError, OperationalError
+from sync_state import mapping_key, ensure_sync_state_table, load_sync_state, save_sync_state
+from metrics import timed_phase
+from retry import is_transient_error
 
 def close_connections(*connections):
     for conn in connections:
         if conn:
-            conn.close()
+            try:
+                conn.close()
+            except Exception as e:
+                logging.warning(f"Error closing connection: {str(e)}")
     logging.info("Connections closed")
 
+def rollback_quietly(mysql_conn):
+    """Roll back the open transaction, ignoring errors from a connection that is already gone."""
+    try:
+        mysql_conn.rollback()
+    except Exception as e:
+        logging.debug(f"Rollback failed: {str(e)}")
+
+# Cheap query run on an ODBC connection to tell whether the server still answers
+ODBC_PING_QUERY = "SELECT 1"
+
+def is_connection_usable(conn):
+    """
+    Cheap liveness check: MySQL connections are pinged, ODBC connections run `ODBC_PING_QUERY`.
+
+    A connection the server dropped still looks open to pyodbc, so only a round trip
+    tells. An ODBC source that rejects the query itself is still connected; only
+    communication failures (see `retry.is_transient_error`) count as dead.
+    """
+    try:
+        is_connected = getattr(conn, "is_connected", None)
+        if is_connected is not None:
+            return is_connected()
+        if getattr(conn, "closed", False):
+            return False
+    except Exception:
+        return False
+    cursor = None
+    try:
+        cursor = conn.cursor()
+        cursor.execute(ODBC_PING_QUERY)
+        cursor.fetchall()
+        return True
+    except Exception as e:
+        return not is_transient_error(e)
+    finally:
+        if cursor is not None:
+            try:
+                cursor.close()
+            except Exception:
+                pass
+
+class ConnectionPool:
+    """
+    A small thread-safe pool of database connections.
+
+    Connections are opened lazily through `factory` (e.g. a lambda around `connect_odbc`
+    or `connect_mysql`) and at most `max_size` are handed out at once; callers beyond
+    that block until a connection is released. Idle connections that have died are
+    closed and replaced when they are next borrowed.
+    """
+
+    def __init__(self, factory, max_size):
+        self.factory = factory
+        self.max_size = max_size
+        self._idle = queue.LifoQueue()
+        self._connections = []
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_size)
+
+    def acquire(self):
+        """Borrow a connection, opening a new one if none is idle."""
+        self._slots.acquire()
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            if is_connection_usable(conn):
+                return conn
+            logging.info("Replacing a dead pooled connection.")
+            self._discard(conn)
+        try:
+            conn = self.factory()
+        except Exception:
+            self._slots.release()
+            raise
+        with self._lock:
+            self._connections.append(conn)
+        return conn
+
+    def release(self, conn):
+        """Return a borrowed connection to the pool."""
+        self._idle.put(conn)
+        self._slots.release()
+
+    def _discard(self, conn):
+        with self._lock:
+            if conn in self._connections:
+                self._connections.remove(conn)
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    @contextmanager
+    def connection(self):
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def close_all(self):
+        """Close every connection the pool has opened."""
+        with self._lock:
+            connections, self._connections = self._connections, []
+        self._idle = queue.LifoQueue()
+        for conn in connections:
+            try:
+                conn.close()
+            except Exception as e:
+                logging.warning(f"Error closing pooled connection: {str(e)}")
+
 def clean_column_name(column_name):
     return column_name.strip().replace('#', '_')
 
+# Marks the end of a stage's output in the pipeline queues
+_PIPELINE_DONE = object()
+
+def _queue_put(q, item, stop_event):
+    """Put an item on a bounded queue, giving up once the pipeline is stopping."""
+    while not stop_event.is_set():
+        try:
+            q.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+def _queue_drain(q, stop_event):
+    """Yield items from a pipeline queue until the producing stage is done."""
+    while not stop_event.is_set():
+        try:
+            item = q.get(timeout=0.1)
+        except queue.Empty:
+            continue
+        if item is _PIPELINE_DONE:
+            return
+        yield item
+
+def _pipeline_stage(items, func, out_queue, stop_event, errors):
+    """Run one pipeline stage in a worker thread, recording the first error it raises."""
+    try:
+        for item in items:
+            if not _queue_put(out_queue, func(item) if func else item, stop_event):
+                break
+    except BaseException as e:
+        errors.append(e)
+        stop_event.set()
+    finally:
+        close = getattr(items, "close", None)
+        if close:
+            close()
+        _queue_put(out_queue, _PIPELINE_DONE, stop_event)
+
+def run_pipeline(batches, convert, write, queue_depth=0):
+    """
+    Drive source batches through a conversion stage and a writer stage.
+
+    With `queue_depth` > 0 the reader, conversion and writer stages run concurrently,
+    joined by bounded queues holding at most `queue_depth` batches each. The writer
+    stage runs in the calling thread so the MySQL connection is never shared. The first
+    error raised by any stage stops the other stages and is re-raised to the caller.
+    With `queue_depth` <= 0 every batch is fetched, converted and written in sequence.
+
+    Returns:
+        int: The number of batches written.
+    """
+    if queue_depth <= 0:
+        written = 0
+        try:
+            for batch in batches:
+                write(convert(batch))
+                written += 1
+        finally:
+            close = getattr(batches, "close", None)
+            if close:
+                close()
+        return written
+
+    stop_event = threading.Event()
+    errors = []
+    fetched = queue.Queue(maxsize=queue_depth)
+    converted = queue.Queue(maxsize=queue_depth)
+
+    # Stage threads inherit the caller's name so per-table log tags carry through
+    thread_name = threading.current_thread().name
+    reader = threading.Thread(
+        target=_pipeline_stage, args=(batches, None, fetched, stop_event, errors),
+        name=f"{thread_name}-reader", daemon=True
+    )
+    converter = threading.Thread(
+        target=_pipeline_stage, args=(_queue_drain(fetched, stop_event), convert, converted, stop_event, errors),
+        name=f"{thread_name}-converter", daemon=True
+    )
+    reader.start()
+    converter.start()
+
+    written = 0
+    try:
+        for batch in _queue_drain(converted, stop_event):
+            write(batch)
+            written += 1
+    except BaseException as e:
+        errors.append(e)
+    finally:
+        stop_event.set()
+        reader.join()
+        converter.join()
+
+    if errors:
+        raise errors[0]
+    return written
+
+def run_resumable_pipeline(read, convert, write, odbc_conn, mysql_conn, queue_depth=0, retry=None,
+                           resumable=False, progress=None, after_reconnect=None, description="load"):
+    """
+    Run `run_pipeline` over `read(odbc_conn)`, reconnecting and replaying after transient errors.
+
+    Without a `retry` policy (see `retry.RetryPolicy`), or when the load is not
+    `resumable`, errors are raised as before. Otherwise a transient error (see
+    `retry.is_transient_error`) rolls the pipeline back to the last commit: a broken ODBC
+    connection is replaced through `retry.reconnect_odbc`, a dropped MySQL connection is
+    reconnected in place and `after_reconnect` restores its session settings, and `read`
+    is called again. `read` must start after the last committed batch, or from the
+    beginning when the writes are idempotent upserts. The retry count starts over when
+    `progress()` has changed since the previous failure.
+    """
+    failures = 0
+    last_progress = progress() if progress else None
+    replacement = None
+    try:
+        while True:
+            try:
+                run_pipeline(read(replacement or odbc_conn), convert, write, queue_depth)
+                return
+            except Exception as e:
+                if retry is None or not resumable or not is_transient_error(e):
+                    raise
+                if progress and progress() != last_progress:
+                    failures, last_progress = 0, progress()
+                if failures >= retry.attempts:
+                    logging.error(f"Giving up on {description} after {failures} retries.")
+                    raise
+                retry.wait(failures, description, e)
+                failures += 1
+                if isinstance(e, pyodbc.Error):
+                    if replacement is not None:
+                        close_connections(replacement)
+                    replacement = retry.reconnect_odbc()
+                elif not is_connection_usable(mysql_conn):
+                    retry.reconnect_mysql(mysql_conn)
+                    if after_reconnect:
+                        after_reconnect()
+                logging.info(f"Replaying {description} from its last commit.")
+    finally:
+        if replacement is not None:
+            close_connections(replacement)
+
+# Sub-batches queued per writer connection before `PartitionedWriter.submit` blocks
+WRITER_QUEUE_DEPTH = 2
+
+class PartitionedWriter:
+    """
+    Writes one table over several MySQL connections, routing rows by a hash of their key.
+
+    Rows with the same primary key (at `key_indexes`) always go to the same connection, so
+    concurrent upserts never lock each other's rows and cannot deadlock. Every connection
+    has a writer thread with a queue of `queue_depth` sub-batches; `submit` blocks while a
+    queue is full, which holds back the reader. Each writer commits every
+    `commit_interval` sub-batches, writing them with `write_rows(conn, rows, batch_number,
+    commit)` (which returns the rows written, 0 for a failed batch).
+
+    A transient error makes the writer roll back, reconnect through `retry` if needed
+    (calling `after_reconnect(conn)`) and write its uncommitted sub-batches again. When a
+    sub-batch fails for good, the others of its transaction are written again one per
+    transaction, so the failed one can be bisected. With `checkpoint` a sub-batch
+    that was neither written nor quarantined stops the writers, so the watermark never
+    moves past its rows.
+    """
+
+    def __init__(self, connections, key_indexes, write_rows, commit_interval=1, queue_depth=WRITER_QUEUE_DEPTH,
+                 retry=None, after_reconnect=None, fail_fast=False, checkpoint=False, metrics=None):
+        self.connections = connections
+        self.key_indexes = key_indexes
+        self.write_rows = write_rows
+        self.commit_interval = max(1, commit_interval)
+        self.retry = retry
+        self.after_reconnect = after_reconnect
+        self.fail_fast = fail_fast
+        self.checkpoint = checkpoint
+        self.metrics = metrics
+        self.rows_written = 0
+        # Highest batch number each writer has committed, and the caller's state per batch
+        self._committed = [0] * len(connections)
+        self._batch_states = {}
+        self._errors = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._queues = [queue.Queue(maxsize=queue_depth) for _ in connections]
+        thread_name = threading.current_thread().name
+        self._threads = [
+            threading.Thread(target=self._run, args=(index,), name=f"{thread_name}-writer{index + 1}", daemon=True)
+            for index in range(len(connections))
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def partition(self, rows):
+        """Split rows into one list per writer by the CRC32 of their key."""
+        partitions = [[] for _ in self.connections]
+        writers = len(self.connections)
+        for row in rows:
+            key = repr(tuple(row[idx] for idx in self.key_indexes)).encode()
+            partitions[zlib.crc32(key) % writers].append(row)
+        return partitions
+
+    def submit(self, batch_number, rows, state=None):
+        """
+        Hand a converted batch to the writers, blocking while their queues are full.
+
+        `state` (such as the batch's checkpoint key) is returned by `pop_durable_state`
+        once every writer has committed the batch. Raises the first writer error.
+        """
+        with self._lock:
+            self._batch_states[batch_number] = state
+        for writer_queue, rows_part in zip(self._queues, self.partition(rows)):
+            if not _queue_put(writer_queue, (batch_number, rows_part), self._stop):
+                break
+        self._raise_error()
+
+    def pop_durable_state(self):
+        """
+        Return the state of the newest batch committed by every writer, if that moved on.
+
+        Returns:
+            The `state` given to `submit`, or None.
+        """
+        with self._lock:
+            durable = min(self._committed)
+            numbers = [number for number in self._batch_states if number <= durable]
+            if not numbers:
+                return None
+            state = self._batch_states[max(numbers)]
+            for number in numbers:
+                del self._batch_states[number]
+            return state
+
+    def close(self):
+        """Let the writers commit everything queued and stop them; raises the first writer error."""
+        for writer_queue in self._queues:
+            _queue_put(writer_queue, _PIPELINE_DONE, self._stop)
+        for thread in self._threads:
+            thread.join()
+        self._raise_error()
+
+    def abort(self):
+        """Stop the writers without committing what they still hold."""
+        self._stop.set()
+        for thread in self._threads:
+            thread.join()
+
+    def _raise_error(self):
+        if self._errors:
+            raise self._errors[0]
+
+    def _run(self, index):
+        conn = self.connections[index]
+        group = []
+        try:
+            for item in _queue_drain(self._queues[index], self._stop):
+                group.append(item)
+                if len(group) >= self.commit_interval:
+                    self._commit_group(index, conn, group)
+                    group = []
+            if group and not self._stop.is_set():
+                self._commit_group(index, conn, group)
+        except BaseException as e:
+            # Raised as a non-transient error so the loader does not replay around a broken pool
+            error = RuntimeError(f"MySQL writer {index + 1} failed: {str(e)}")
+            error.__cause__ = e
+            self._errors.append(error)
+            self._stop.set()
+
+    def _commit_group(self, index, conn, group):
+        attempt = 0
+        while True:
+            try:
+                written = self._write_group(conn, group)
+                break
+            except Exception as e:
+                rollback_quietly(conn)
+                if self.retry is None or not is_transient_error(e) or attempt >= self.retry.attempts:
+                    raise
+                self.retry.wait(attempt, f"MySQL writer {index + 1}", e)
+                attempt += 1
+                if not is_connection_usable(conn):
+                    self.retry.reconnect_mysql(conn)
+                    if self.after_reconnect:
+                        self.after_reconnect(conn)
+        with self._lock:
+            self.rows_written += written
+            self._committed[index] = group[-1][0]
+
+    def _write_group(self, conn, group):
+        """Write sub-batches in one transaction, or one per transaction if one of them fails."""
+        if len(group) > 1:
+            written = 0
+            for batch_number, rows in group:
+                count = self.write_rows(conn, rows, batch_number, False) if rows else 0
+                if rows and not count:
+                    # The failed sub-batch rolled back the whole transaction
+                    break
+                written += count
+            else:
+                with timed_phase(self.metrics, "commit"):
+                    conn.commit()
+                return written
+        return sum(self._write_committed(conn, batch_number, rows) for batch_number, rows in group)
+
+    def _write_committed(self, conn, batch_number, rows):
+        if not rows:
+            return 0
+        # `before_commit` only runs once the rows are written or the rejected ones quarantined
+        accounted = []
+        written = self.write_rows(conn, rows, batch_number, True, accounted.append)
+        if self.fail_fast and not written:
+            raise RuntimeError(f"Batch {batch_number} could not be written.")
+        if self.checkpoint and not accounted:
+            raise RuntimeError(f"Batch {batch_number} was neither written nor quarantined.")
+        return written
+
+def create_writer_pool(connections, columns, key_columns, write_rows, commit_interval, destination_table,
+                       retry=None, bulk_load=False, fail_fast=False, checkpoint=False, metrics=None):
+    """
+    Start a `PartitionedWriter` for a loader, routing rows by `key_columns`.
+
+    Returns None, so the loader writes over its own connection, without `connections`
+    or when the table has no key to route by.
+    """
+    if not connections:
+        return None
+    if not key_columns:
+        logging.warning(f"`{destination_table}` has no primary or unique key to route rows by; writing over one connection.")
+        return None
+    after_reconnect = None
+    if bulk_load:
+        for conn in connections:
+            set_bulk_load_session(conn, True)
+        after_reconnect = lambda conn: set_bulk_load_session(conn, True)
+    logging.info(f"Writing `{destination_table}` over {len(connections)} MySQL connections.")
+    return PartitionedWriter(
+        connections, column_indexes(columns, key_columns), write_rows, commit_interval,
+        retry=retry, after_reconnect=after_reconnect, fail_fast=fail_fast, checkpoint=checkpoint, metrics=metrics
+    )
+
+def commit_durable_watermark(writer_pool, mysql_conn, state_key):
+    """
+    Store the checkpoint key of the newest batch every writer of `writer_pool` has committed.
+
+    Returns:
+        tuple: The stored key, or None if no further batch became durable.
+    """
+    last_key = writer_pool.pop_durable_state()
+    if last_key is not None:
+        cursor = mysql_conn.cursor()
+        try:
+            save_sync_state(cursor, state_key, "watermark", last_key)
+            mysql_conn.commit()
+        finally:
+            cursor.close()
+    return last_key
+
+# Rough encoded size in bytes of one value of each metadata type, used before any rows are seen
+_TYPE_BYTE_ESTIMATES = {
+    "INT": 8,
+    "FLOAT": 16,
+    "DECIMAL": 12,
+    "BOOLEAN": 1,
+    "DATE": 10,
+    "TIME": 8,
+    "DATETIME": 19,
+    "STRING": 64,
+    "STR": 64,
+    "VARCHAR": 64,
+    "TEXT": 256,
+}
+# Per-value overhead of the SQL text (quotes and separator)
+_VALUE_OVERHEAD_BYTES = 3
+
+def sampled_row_bytes(rows, sample_rows=50):
+    """Average encoded size of the first `sample_rows` converted rows, or None if there are none."""
+    sample = rows[:sample_rows]
+    if not sample:
+        return None
+    sampled_bytes = sum(len(encode_tsv_value(value)) + _VALUE_OVERHEAD_BYTES for row in sample for value in row)
+    return sampled_bytes / len(sample)
+
+class BatchSizer:
+    """
+    Chooses the number of rows per batch from a byte budget instead of a fixed row count.
+
+    The row size starts as an estimate from the column metadata and is refined from the
+    converted rows actually seen. The byte budget itself grows while writes finish well
+    under `target_seconds` and shrinks when they take much longer, and never exceeds
+    `max_bytes` (typically derived from the server's `max_allowed_packet`). `min_rows`
+    only applies while that many rows fit in `max_bytes`.
+    """
+
+    def __init__(self, columns, byte_budget, exceptions=None, max_bytes=None,
+                 min_rows=100, max_rows=100000, target_seconds=2.0, sample_rows=50):
+        self.max_bytes = max_bytes or byte_budget * 8
+        self.byte_budget = min(byte_budget, self.max_bytes)
+        self.min_bytes = max(self.byte_budget // 8, 1)
+        self.min_rows = min_rows
+        self.max_rows = max_rows
+        self.target_seconds = target_seconds
+        self.sample_rows = sample_rows
+        self.row_bytes = self.estimate_row_bytes(columns, exceptions)
+        self.chosen_sizes = []
+
+    @staticmethod
+    def estimate_row_bytes(columns, exceptions=None):
+        """Estimate the encoded size of one row from its metadata types and exception lengths."""
+        row_bytes = 0
+        for col in columns:
+            exception = column_exception(exceptions, col[0])
+            col_type = str(exception.get("type") or col[1]).upper()
+            length = exception.get("length")
+            estimate = int(length) if length else _TYPE_BYTE_ESTIMATES.get(col_type, 64)
+            row_bytes += estimate + _VALUE_OVERHEAD_BYTES
+        # Account for the `created_at`/`updated_at` values appended to every row
+        return row_bytes + 2 * (_TYPE_BYTE_ESTIMATES["DATETIME"] + _VALUE_OVERHEAD_BYTES)
+
+    @property
+    def rows(self):
+        """Rows to fetch and write in the next batch."""
+        row_bytes = max(self.row_bytes, 1)
+        rows = int(self.byte_budget // row_bytes)
+        min_rows = max(1, min(self.min_rows, int(self.max_bytes // row_bytes)))
+        rows = max(min_rows, min(self.max_rows, rows))
+        self.chosen_sizes.append(rows)
+        return rows
+
+    def observe_rows(self, rows):
+        """Refine the row size from a sample of converted rows."""
+        observed = sampled_row_bytes(rows, self.sample_rows)
+        if observed is None:
+            return
+        # Smooth so one unusual batch does not swing the size
+        self.row_bytes = 0.7 * self.row_bytes + 0.3 * observed
+
+    def observe_write(self, row_count, seconds):
+        """Adapt the byte budget from how long a batch of `row_count` rows took to write."""
+        if not row_count:
+            return
+        if seconds < self.target_seconds / 2:
+            self.byte_budget = min(self.max_bytes, int(self.byte_budget * 1.25))
+        elif seconds > self.target_seconds * 1.5:
+            self.byte_budget = max(self.min_bytes, int(self.byte_budget * 0.7))
+        logging.debug(
+            f"Batch of {row_count} rows written in {seconds:.2f}s; "
+            f"row size ~{self.row_bytes:.0f} bytes, budget {self.byte_budget} bytes"
+        )
+
+    def summary(self):
+        """Describe the batch sizes chosen so far, for logging."""
+        if not self.chosen_sizes:
+            return "no batches"
+        return (
+            f"{len(self.chosen_sizes)} batches of {min(self.chosen_sizes)}-{max(self.chosen_sizes)} rows "
+            f"(avg {sum(self.chosen_sizes) // len(self.chosen_sizes)}), "
+            f"row size ~{self.row_bytes:.0f} bytes, final budget {self.byte_budget} bytes"
+        )
+
+def fetch_max_allowed_packet(mysql_conn):
+    """Return the server's `max_allowed_packet` in bytes, or None if it cannot be read."""
+    cursor = mysql_conn.cursor()
+    try:
+        cursor.execute("SELECT @@max_allowed_packet")
+        row = cursor.fetchone()
+        return int(row[0]) if row and row[0] else None
+    except Exception as e:
+        logging.warning(f"Could not read max_allowed_packet: {str(e)}")
+        return None
+    finally:
+        cursor.close()
+
+def create_batch_sizer(mysql_conn, columns, byte_budget, exceptions=None, max_rows=100000):
+    """Build a BatchSizer bounded by half of the server's `max_allowed_packet`."""
+    max_allowed_packet = fetch_max_allowed_packet(mysql_conn)
+    max_bytes = max_allowed_packet // 2 if max_allowed_packet else None
+    if max_bytes and byte_budget > max_bytes:
+        logging.info(f"Capping batch byte budget at {max_bytes} bytes (half of max_allowed_packet).")
+    return BatchSizer(columns, byte_budget, exceptions=exceptions, max_bytes=max_bytes, max_rows=max_rows)
+
+def fetch_batches(cursor, chunk_size, source_table, batch_sizer=None, metrics=None):
+    """
+    Yield chunks of rows from an executed ODBC cursor until it is exhausted.
+
+    With a `batch_sizer`, each fetch asks it for the number of rows instead of using `chunk_size`.
+    Time spent in `fetchmany` is added to `metrics` when given.
+    """
+    try:
+        while True:
+            try:
+                with timed_phase(metrics, "fetchmany"):
+                    chunk = cursor.fetchmany(batch_sizer.rows if batch_sizer else chunk_size)
+            except pyodbc.DataError as e:
+                logging.error(f"DataError while fetching rows from {source_table}: {str(e)}")
+                continue  # Skip the problematic batch
+
+            if not chunk:
+                logging.info(f"No more rows to process for table {source_table}.")
+                return
+            yield chunk
+    finally:
+        cursor.close()
+
 def connect_odbc(dsn):
     """Establish a readonly connection to the ODBC source."""
     try:
@@ -23,7 +658,7 @@ def connect_odbc(dsn):
         logging.error(f"Error connecting to ODBC: {str(e)}", exc_info=True)
         raise
 
-def connect_mysql(host, user, password, database):
+def connect_mysql(host, user, password, database, allow_local_infile=False):
     """
     Connect to the MySQL database.
     
@@ -32,6 +667,7 @@ def connect_mysql(host, user, password, database):
         user (str): The MySQL username.
         password (str): The MySQL password.
         database (str): The database name to connect to.
+        allow_local_infile (bool): Allow `LOAD DATA LOCAL INFILE` (needed for `load_mode: "load_data"`).
 
     Returns:
         mysql.connector.connection_cext.CMySQLConnection: A connection object to interact with MySQL.
@@ -41,7 +677,8 @@ def connect_mysql(host, user, password, database):
             host=host,
             user=user,
             password=password,
-            database=database
+            database=database,
+            allow_local_infile=allow_local_infile
         )
         logging.info(f"Connected to MySQL database at {host}")
         return connection
@@ -49,9 +686,110 @@ def connect_mysql(host, user, password, database):
         logging.error(f"Error connecting to MySQL: {err}", exc_info=True)
         raise
 
-def create_mysql_table_from_odbc_metadata(mysql_conn, destination_table, columns, primary_key, unique_keys, exceptions):
+# Largest CHAR, and largest VARCHAR that still fits a utf8mb4 row (65,535 bytes / 4)
+MAX_CHAR_LENGTH = 255
+MAX_VARCHAR_LENGTH = 16383
+# MySQL DECIMAL limits
+MAX_DECIMAL_PRECISION = 65
+MAX_DECIMAL_SCALE = 30
+
+_CATALOG_FIXED_CHAR_TYPES = (pyodbc.SQL_CHAR, pyodbc.SQL_WCHAR)
+_CATALOG_VARCHAR_TYPES = (pyodbc.SQL_VARCHAR, pyodbc.SQL_WVARCHAR)
+_CATALOG_LONG_CHAR_TYPES = (pyodbc.SQL_LONGVARCHAR, pyodbc.SQL_WLONGVARCHAR)
+_CATALOG_SIMPLE_TYPES = {
+    pyodbc.SQL_BIT: "TINYINT(1)",
+    # ODBC TINYINT may be unsigned (0-255), which a signed MySQL TINYINT cannot hold
+    pyodbc.SQL_TINYINT: "SMALLINT",
+    pyodbc.SQL_SMALLINT: "SMALLINT",
+    pyodbc.SQL_INTEGER: "INT",
+    pyodbc.SQL_BIGINT: "BIGINT",
+    pyodbc.SQL_REAL: "FLOAT",
+    pyodbc.SQL_FLOAT: "DOUBLE",
+    pyodbc.SQL_DOUBLE: "DOUBLE",
+    pyodbc.SQL_TYPE_DATE: "DATE",
+    pyodbc.SQL_TYPE_TIME: "TIME",
+    pyodbc.SQL_GUID: "CHAR(36)",
+    pyodbc.SQL_LONGVARBINARY: "LONGBLOB",
+}
+
+def mysql_type_from_catalog(entry):
+    """
+    Choose a compact MySQL column type from an ODBC catalog entry (see `schema_cache.fetch_odbc_catalog`).
+
+    Character columns keep their declared length (CHAR for short fixed-width columns,
+    VARCHAR otherwise, TEXT only when too long for a row), decimals keep their exact
+    precision and scale, and integers keep their width.
+
+    Returns:
+        str: The MySQL type, or None when the ODBC type is not recognised.
+    """
+    data_type = entry.get("data_type")
+    size = entry.get("column_size") or 0
+    digits = entry.get("decimal_digits") or 0
+
+    if data_type in _CATALOG_SIMPLE_TYPES:
+        return _CATALOG_SIMPLE_TYPES[data_type]
+    if data_type in _CATALOG_FIXED_CHAR_TYPES and 0 < size <= MAX_CHAR_LENGTH:
+        return f"CHAR({size})"
+    if data_type in _CATALOG_FIXED_CHAR_TYPES + _CATALOG_VARCHAR_TYPES and 0 < size <= MAX_VARCHAR_LENGTH:
+        return f"VARCHAR({size})"
+    if data_type in _CATALOG_FIXED_CHAR_TYPES + _CATALOG_VARCHAR_TYPES + _CATALOG_LONG_CHAR_TYPES:
+        if size > 16777215:
+            return "LONGTEXT"
+        return "MEDIUMTEXT" if size > 65535 else "TEXT"
+    if data_type in (pyodbc.SQL_DECIMAL, pyodbc.SQL_NUMERIC) and size:
+        precision = min(size, MAX_DECIMAL_PRECISION)
+        scale = min(digits, MAX_DECIMAL_SCALE, precision)
+        return f"DECIMAL({precision},{scale})"
+    if data_type == pyodbc.SQL_TYPE_TIMESTAMP:
+        return f"DATETIME({min(digits, 6)})" if digits else "DATETIME"
+    if data_type in (pyodbc.SQL_BINARY, pyodbc.SQL_VARBINARY):
+        return f"VARBINARY({size})" if 0 < size <= 65535 else "BLOB"
+    return None
+
+# MySQL's row size limit, and the bytes an inline VARCHAR(n) column may take in utf8mb4
+MAX_ROW_BYTES = 65535
+
+def _inline_column_bytes(col_type):
+    """Upper bound of the row bytes a column type takes (TEXT/BLOB only store a pointer)."""
+    upper = col_type.upper()
+    if upper.startswith(("CHAR(", "VARCHAR(", "VARBINARY(")):
+        length = int(upper[upper.index("(") + 1:upper.index(")")])
+        return length * (1 if upper.startswith("VARBINARY") else 4) + 2
+    if upper.endswith(("TEXT", "BLOB")):
+        return 12
+    return 16
+
+def fit_row_size(destination_table, column_specs):
+    """
+    Turn the widest catalog-typed VARCHARs into TEXT until the row fits MySQL's 64KB limit.
+
+    `column_specs` are [name, type, not_null, may_widen] lists updated in place.
+    """
+    row_bytes = sum(_inline_column_bytes(spec[1]) for spec in column_specs)
+    candidates = sorted(
+        (spec for spec in column_specs if spec[3] and spec[1].upper().startswith(("VARCHAR(", "CHAR("))),
+        key=lambda spec: _inline_column_bytes(spec[1]),
+        reverse=True
+    )
+    for spec in candidates:
+        if row_bytes <= MAX_ROW_BYTES:
+            break
+        logging.info(f"Storing `{destination_table}`.`{spec[0]}` ({spec[1]}) as TEXT to fit the MySQL row size limit.")
+        row_bytes -= _inline_column_bytes(spec[1]) - _inline_column_bytes("TEXT")
+        spec[1] = "TEXT"
+
+def create_mysql_table_from_odbc_metadata(mysql_conn, destination_table, columns, primary_key, unique_keys, exceptions, include_unique_keys=True, catalog=None):
     """
     Create a MySQL table based on ODBC metadata and mapping exceptions.
+
+    With a `catalog` (see `schema_cache.fetch_odbc_catalog`) column types come from the
+    declared source types, lengths, precision and nullability (see `mysql_type_from_catalog`);
+    columns the catalog does not cover fall back to the Python type mapping. Exceptions
+    always take precedence.
+
+    With `include_unique_keys=False` the unique key columns keep their key-compatible
+    types but the UNIQUE KEY itself is left for `swap_staging_table` to build after loading.
     """
     type_mapping = {
         "TEXT": "TEXT",
@@ -66,17 +804,20 @@ def create_mysql_table_from_odbc_metadata(mysql_conn, destination_table, columns
 
     logging.debug(f"ODBC metadata for table `{destination_table}`: {columns}")
     cursor = mysql_conn.cursor()
+    catalog_entries = {entry["name"].strip().upper(): entry for entry in catalog or []}
 
-    column_definitions = []
+    column_specs = []
     for col in columns:
         col_name = col[0]
         odbc_type = col[1]
         custom_type = None
         length = None
+        not_null = False
+        from_catalog = False
 
         # Apply exceptions if provided
         if exceptions and col_name in exceptions:
-            exception = exceptions[col_name]
+            exception = column_exception(exceptions, col_name)
             custom_type = exception.get("type", "").upper()
             length = exception.get("length")
 
@@ -90,17 +831,31 @@ def create_mysql_table_from_odbc_metadata(mysql_conn, destination_table, columns
             else:
                 raise ValueError(f"Invalid MySQL type '{custom_type}' for column '{col_name}' in exceptions.")
         else:
-            # Map ODBC type to MySQL type
-            col_type = type_mapping.get(odbc_type.upper(), "TEXT")
+            catalog_entry = catalog_entries.get(col_name.strip().upper())
+            catalog_type = mysql_type_from_catalog(catalog_entry) if catalog_entry else None
+            if catalog_type:
+                col_type = catalog_type
+                from_catalog = True
+                # Only pass-through columns; exception columns may convert bad values to NULL
+                not_null = catalog_entry.get("nullable") == pyodbc.SQL_NO_NULLS
+            else:
+                # Map ODBC type to MySQL type
+                col_type = type_mapping.get(odbc_type.upper(), "TEXT")
 
         # Handle primary/unique key length for TEXT columns
         if col_name in primary_key or col_name in unique_keys:
-            if col_type.startswith("TEXT"):
-                key_length = exceptions.get(col_name, {}).get("key_length", 100)
+            if col_type.endswith("TEXT"):
+                key_length = column_exception(exceptions, col_name).get("key_length", 100)
                 col_type = f"VARCHAR({key_length})"
 
-        column_definitions.append(f"`{col_name}` {col_type}")
-        
+        is_key = col_name in primary_key or col_name in unique_keys
+        column_specs.append([col_name, col_type, not_null, from_catalog and not is_key])
+
+    fit_row_size(destination_table, column_specs)
+    column_definitions = [
+        f"`{col_name}` {col_type}{' NOT NULL' if not_null else ''}" for col_name, col_type, not_null, _ in column_specs
+    ]
+
     # Add `created_at` and `updated_at` columns
     column_definitions.append("`created_at` DATETIME DEFAULT CURRENT_TIMESTAMP")
     column_definitions.append("`updated_at` DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP")
@@ -111,7 +866,7 @@ def create_mysql_table_from_odbc_metadata(mysql_conn, destination_table, columns
         primary_key_str = ", ".join([f"`{pk}`" for pk in primary_key])
         column_definitions.append(f"PRIMARY KEY ({primary_key_str})")
 
-    if unique_keys:
+    if unique_keys and include_unique_keys:
         unique_key_str = ", ".join([f"`{uk}`" for uk in unique_keys])
         column_definitions.append(f"UNIQUE KEY ({unique_key_str})")
 
@@ -140,6 +895,163 @@ def does_table_exist(mysql_conn, table_name):
         logging.error(f"Error checking existence of table {table_name}: {str(e)}", exc_info=True)
         return False
 
+def build_source_query(source_table, predicates=(), order_by=(), limit=None, limit_syntax="top", select=None):
+    """
+    Build a SELECT against the ODBC source.
+
+    `predicates` are ANDed together (empty entries are ignored). `limit_syntax` selects
+    how `limit` is expressed: "top" (SQL Server, Actian Zen), "limit" (MySQL, PostgreSQL,
+    SQLite) or "fetch" (ANSI `FETCH FIRST n ROWS ONLY`). `select` lists the columns to
+    return; all columns are returned by default.
+    """
+    top_clause = f"TOP {int(limit)} " if limit and limit_syntax == "top" else ""
+    select_list = ", ".join(select) if select else "*"
+    query = f"SELECT {top_clause}{select_list} FROM {source_table}"
+    filters = [f"({predicate})" for predicate in predicates if predicate]
+    if filters:
+        query += f" WHERE {' AND '.join(filters)}"
+    if order_by:
+        query += f" ORDER BY {', '.join(order_by)}"
+    if limit and limit_syntax == "limit":
+        query += f" LIMIT {int(limit)}"
+    elif limit and limit_syntax == "fetch":
+        query += f" FETCH FIRST {int(limit)} ROWS ONLY"
+    return query
+
+def source_filter_predicate(filters=None, date_column=None, days_back=None, placeholder="?"):
+    """
+    Build the WHERE predicate for a mapping's declarative source filters.
+
+    `filters` maps column names to a value (`col = ?`), a list of values (`col IN (...)`)
+    or None (`col IS NULL`). With `date_column` and `days_back` only rows whose
+    `date_column` is later than `days_back` days ago are read. `placeholder` is "%s" to
+    apply the same filters to MySQL.
+
+    Returns:
+        tuple: (predicate or None, params)
+    """
+    terms = []
+    params = []
+    for column, value in (filters or {}).items():
+        if value is None:
+            terms.append(f"{column} IS NULL")
+        elif isinstance(value, (list, tuple)):
+            if not value:
+                raise ValueError(f"Filter on {column} has an empty list of values.")
+            terms.append(f"{column} IN ({', '.join([placeholder] * len(value))})")
+            params.extend(value)
+        else:
+            terms.append(f"{column} = {placeholder}")
+            params.append(value)
+    if date_column and days_back not in (None, "", []):
+        terms.append(f"{date_column} > {placeholder}")
+        params.append(date.today() - timedelta(days=int(days_back)))
+    return (" AND ".join(terms) or None), params
+
+def since_predicate(sort_column, since, skip_null_sort=False):
+    """
+    The `since` look-back window: rows whose `sort_column` is later than `since` days ago.
+
+    With `skip_null_sort` (the upsert loader and checkpointed loads) rows with a NULL
+    `sort_column` are excluded as well, even without `since`.
+
+    Returns:
+        str: The predicate, or None when nothing is filtered.
+    """
+    if not sort_column:
+        return None
+    if since:
+        look_back_date = (datetime.now() - timedelta(days=since)).strftime('%Y-%m-%d')
+        if skip_null_sort:
+            return f"{sort_column} IS NOT NULL AND {sort_column} > '{look_back_date}'"
+        return f"{sort_column} > '{look_back_date}'"
+    return f"{sort_column} IS NOT NULL" if skip_null_sort else None
+
+def keyset_predicate(key_columns, key_values):
+    """
+    Build `(c1, c2, ...) > (v1, v2, ...)` for keyset pagination.
+
+    Row-value comparisons are not supported by every ODBC driver, so the comparison is
+    expanded into `c1 > ? OR (c1 = ? AND c2 > ?) OR ...`.
+
+    Returns:
+        tuple: (predicate, params)
+    """
+    clauses = []
+    params = []
+    for position, column in enumerate(key_columns):
+        terms = [f"{prefix_column} = ?" for prefix_column in key_columns[:position]] + [f"{column} > ?"]
+        clauses.append(f"({' AND '.join(terms)})")
+        params.extend(key_values[:position])
+        params.append(key_values[position])
+    return " OR ".join(clauses), params
+
+def checkpoint_key_columns(sort_column, primary_key):
+    """Columns that order rows for checkpointing: the sort column, then any primary key tie-breakers."""
+    if not sort_column:
+        raise ValueError("Checkpointed sync requires a sort_column.")
+    return [sort_column] + [pk for pk in primary_key if pk != sort_column]
+
+def column_indexes(columns, names):
+    """Positions of `names` in the column metadata, matched case-insensitively."""
+    positions = {col[0].strip().upper(): idx for idx, col in enumerate(columns)}
+    try:
+        return [positions[name.strip().upper()] for name in names]
+    except KeyError as e:
+        raise ValueError(f"Column {e} is not in the source table.") from None
+
+def normalize_key(key):
+    """
+    Key tuple with trailing spaces stripped from text values.
+
+    ODBC drivers return CHAR(n) values padded to their length while MySQL returns them
+    stripped, so keys read from both sides only compare equal in this form.
+    """
+    return tuple(value.rstrip() if isinstance(value, str) else value for value in key)
+
+def read_source_batches(
+    odbc_conn, source_table, chunk_size, predicates=(), params=(), order_by=(),
+    key_columns=None, key_indexes=None, start_key=None, page_size=None, page_syntax="top",
+    batch_sizer=None, metrics=None, select=None
+):
+    """
+    Query the ODBC source and yield chunks of rows.
+
+    Without `key_columns` a single query is streamed. With `key_columns` (and their
+    positions in each row, `key_indexes`) reads use keyset pagination: every query starts
+    after `start_key`, or after the last key read, and when `page_size` is set it is
+    limited to that many rows so no single cursor has to span the whole table. `select`
+    lists the columns to read (see `build_source_query`).
+
+    Query execution and `fetchmany` times are added to `metrics` when given.
+    """
+    last_key = tuple(start_key) if start_key else None
+    while True:
+        page_predicates = list(predicates)
+        page_params = list(params)
+        if key_columns and last_key:
+            predicate, key_params = keyset_predicate(key_columns, last_key)
+            page_predicates.append(predicate)
+            page_params.extend(key_params)
+
+        query = build_source_query(
+            source_table, page_predicates, order_by, page_size if key_columns else None, page_syntax, select
+        )
+        logging.info(f"Executing query: {query}")
+        cursor = odbc_conn.cursor()
+        with timed_phase(metrics, "query"):
+            cursor.execute(query, *page_params)
+
+        page_rows = 0
+        for chunk in fetch_batches(cursor, chunk_size, source_table, batch_sizer, metrics):
+            page_rows += len(chunk)
+            if key_columns:
+                last_key = tuple(chunk[-1][idx] for idx in key_indexes)
+            yield chunk
+
+        if not key_columns or not page_size or page_rows < page_size:
+            return
+
 def drop_mysql_table_if_exists(mysql_conn, table_name):
     """
     Drop a MySQL table if it exists.
@@ -163,202 +1075,707 @@ def drop_mysql_table_if_exists(mysql_conn, table_name):
     finally:
         cursor.close()
 
+def set_bulk_load_session(mysql_conn, enabled):
+    """Turn unique and foreign key checks off (or back on) for this MySQL session."""
+    value = 0 if enabled else 1
+    cursor = mysql_conn.cursor()
+    try:
+        cursor.execute(f"SET SESSION unique_checks = {value}, foreign_key_checks = {value}")
+    finally:
+        cursor.close()
+
+def swap_staging_table(mysql_conn, staging_table, destination_table, unique_keys):
+    """
+    Finish a staging load and swap it in for the live table.
+
+    Deferred unique keys are built in a single ALTER, then one atomic RENAME TABLE
+    replaces the destination, so readers never see a half-loaded table.
+    """
+    cursor = mysql_conn.cursor()
+    try:
+        if unique_keys:
+            unique_key_str = ", ".join([f"`{uk}`" for uk in unique_keys])
+            logging.info(f"Building deferred indexes on `{staging_table}`.")
+            cursor.execute(f"ALTER TABLE `{staging_table}` ADD UNIQUE KEY ({unique_key_str})")
+
+        retired_table = f"{destination_table}_old"
+        cursor.execute(f"DROP TABLE IF EXISTS `{retired_table}`")
+        if does_table_exist(mysql_conn, destination_table):
+            cursor.execute(
+                f"RENAME TABLE `{destination_table}` TO `{retired_table}`, `{staging_table}` TO `{destination_table}`"
+            )
+            cursor.execute(f"DROP TABLE `{retired_table}`")
+        else:
+            cursor.execute(f"RENAME TABLE `{staging_table}` TO `{destination_table}`")
+        mysql_conn.commit()
+        logging.info(f"Swapped `{staging_table}` in as `{destination_table}`.")
+    finally:
+        cursor.close()
+
+def batch_stats(metrics, chunk, converted_chunk, bad_records, convert_started):
+    """
+    Measure a converted batch for `TableMetrics.record_batch`, timing the conversion as a phase.
+
+    Returns None when no metrics are collected, so the byte estimate is skipped.
+    """
+    if metrics is None:
+        return None
+    convert_seconds = time.perf_counter() - convert_started
+    metrics.add_phase("convert", convert_seconds)
+    row_bytes = sampled_row_bytes(converted_chunk) or 0
+    return {
+        "source_rows": len(chunk),
+        "bad_rows": len(bad_records),
+        "bytes_processed": int(row_bytes * len(converted_chunk)),
+        "convert_seconds": convert_seconds,
+    }
+
 def fetch_and_insert_rows(
     chunk_size,
     odbc_conn, mysql_conn, source_table, destination_table, columns, primary_key, unique_keys,
-    sort_column, exceptions=None, since=None, trim_trailing_spaces=False, insert_columns=None
+    sort_column, exceptions=None, since=None, trim_trailing_spaces=False, insert_columns=None,
+    queue_depth=0, range_filter=None, load_mode="executemany",
+    checkpoint=False, page_size=None, page_syntax="top",
+    bulk_load=False, commit_interval=1, fail_fast=False, batch_bytes=None,
+    metrics=None, quarantine=None, retry=None, conversion_workers=0,
+    writer_connections=None, writer_commit_interval=1, source_filter=None, select_columns=None
 ):
     """
     Fetch ODBC data starting from an offset and insert it into MySQL with `created_at` and `updated_at`.
-    """
-    cursor = odbc_conn.cursor()
 
+    With `queue_depth` > 0 fetching, conversion and inserting run as pipelined stages
+    (see `run_pipeline`). `range_filter` is an optional (predicate, params) pair from
+    `partition_ranges` restricting the source query to one partition. With
+    `load_mode="load_data"` batches are written with `LOAD DATA LOCAL INFILE`
+    (see `load_data_to_mysql`) instead of `executemany`. With `checkpoint` the last
+    committed (sort_column, primary key) tuple is stored with every batch and the next
+    run resumes after it using keyset pagination (see `read_source_batches`).
+
+    For loads into a staging table, `bulk_load` disables unique and foreign key checks
+    for the session, `commit_interval` commits only every that many batches, and
+    `fail_fast` raises on the first failed batch instead of logging and moving on. With
+    `commit_interval` > 1 a batch that is not written in full always raises, because its
+    rollback discards the uncommitted batches before it as well.
+
+    With `batch_bytes` the rows per batch are chosen by a `BatchSizer` from that byte
+    budget instead of the fixed `chunk_size`. Phase timings and one record per batch are
+    added to `metrics` (a `metrics.TableMetrics`) when given. A failed batch is bisected
+    so its good rows still commit, and the rejected ones go to the `quarantine` sink or
+    the log (see `recover_failed_batch`). Batches of a `bulk_load` or sharing a
+    transaction (`commit_interval` > 1) are never bisected: committing part of a batch
+    would commit nothing of the batches rolled back with it.
+
+    With a `retry` policy (see `retry.RetryPolicy`) transient errors reconnect and replay
+    the load from the last commit (see `run_resumable_pipeline`): after the last committed
+    key with `checkpoint`, otherwise from the start, which requires a `primary_key` so
+    replayed rows are not duplicated.
+
+    With `conversion_workers` > 1 rows are converted in that many worker processes
+    (see `ProcessConverter`); batches are still written in source order.
+
+    With `writer_connections` rows are written over those MySQL connections in parallel,
+    routed by a hash of the primary key (see `PartitionedWriter`); each commits every
+    `writer_commit_interval` sub-batches, and the watermark follows what all of them
+    have committed.
+
+    `source_filter` is a (predicate, params) pair from `source_filter_predicate` pushed
+    into every source query. With `select_columns` only those columns are read, in the
+    order of `columns`, instead of `SELECT *`.
+
+    Returns:
+        int: The number of rows committed to MySQL.
+    """
     normalized_columns = [col[0].strip().upper() for col in columns]
     normalized_primary_keys = [pk.strip().upper() for pk in primary_key]
 
-    if since and sort_column:
-        look_back_date = (datetime.now() - timedelta(days=since)).strftime('%Y-%m-%d')
-        date_filter = f"{sort_column} > '{look_back_date}'"
-    else:
-        date_filter = None
-
-    where_clause = f"WHERE {date_filter}" if date_filter else ""
-    query = f"""
-        SELECT * FROM {source_table}
-        {where_clause}
-        ORDER BY {sort_column}
-    """
+    # A NULL sort value can never be resumed after, so checkpointed loads skip those rows
+    date_filter = since_predicate(sort_column, since, skip_null_sort=checkpoint)
+
+    filter_predicate, filter_params = source_filter or (None, [])
+    range_predicate, range_params = range_filter or (None, [])
+    query_params = list(filter_params) + list(range_params)
+    key_columns, key_indexes, start_key, state_key = None, None, None, None
+    if checkpoint:
+        key_columns = checkpoint_key_columns(sort_column, primary_key)
+        key_indexes = column_indexes(columns, key_columns)
+        state_key = mapping_key(source_table, destination_table)
+        ensure_sync_state_table(mysql_conn)
+        start_key = load_sync_state(mysql_conn, state_key, "watermark")
+        if start_key and start_key[0] is None:
+            logging.warning(f"Ignoring the stored watermark of `{source_table}`, its `{sort_column}` is NULL.")
+            start_key = None
+        if start_key:
+            # The watermark supersedes the `since` look-back window
+            date_filter = None
+            logging.info(f"Resuming `{source_table}` after {key_columns} = {start_key}")
+    order_by = key_columns or ([sort_column] if sort_column else [])
 
-    logging.debug(f"Executing query: {query}")
     batch_number = 1
+    rows_written = 0
+    # Where a replay after a transient error starts: the last committed key and row count
+    committed_key, committed_rows = start_key, 0
+    # Rows written in the open transaction, lost if any batch before the next commit fails
+    uncommitted_rows = 0
 
     # Add `created_at` and `updated_at` columns for insertion only
     additional_columns = [("created_at", "DATETIME"), ("updated_at", "DATETIME")]
     insert_columns = columns + additional_columns
 
-    try:
-        cursor.execute(query)
-        while True:
-            try:
-                chunk = cursor.fetchmany(chunk_size)
-            except pyodbc.DataError as e:
-                logging.error(f"DataError while fetching rows from {source_table}: {str(e)}")
-                continue  # Skip invalid row
-
-            if not chunk:
-                logging.info(f"No more rows to process for table {source_table}.")
-                break
-
-            converted_chunk = []
-            for row in chunk:
-                try:
-                    # Process the row based on original columns
-                    processed_row = process_row(row, columns, exceptions, trim_trailing_spaces)
-
-                    # Append `created_at` and `updated_at` timestamps for insertion
-                    now = datetime.now()
-                    processed_row = list(processed_row)
-                    processed_row.append(now)  # created_at
-                    processed_row.append(now)  # updated_at
-
-                    converted_chunk.append(tuple(processed_row))
-                except Exception as e:
-                    logging.warning(f"Error processing row {row}: {str(e)}")
-                    continue  # Skip invalid row
-
-            logging.info(f"Inserting batch {batch_number} into `{destination_table}`.")
-            insert_data_to_mysql(
-                mysql_conn,
+    # Compile the per-column conversion once for the whole table
+    row_converter = compile_row_converter(columns, exceptions, trim_trailing_spaces)
+    batch_sizer = create_batch_sizer(mysql_conn, columns, batch_bytes, exceptions) if batch_bytes else None
+    process_converter = (
+        ProcessConverter(columns, exceptions, trim_trailing_spaces, conversion_workers)
+        if conversion_workers > 1 else None
+    )
+    # A failed batch of a staging load must fail the load, never be salvaged in part
+    bisect = not bulk_load and commit_interval == 1
+
+    def convert(chunk):
+        # Invalid rows are skipped; `created_at`/`updated_at` are appended for insertion
+        started = time.perf_counter()
+        if process_converter:
+            # Already converted by a worker process; count its time as conversion time
+            chunk, converted_chunk, bad_records, worker_seconds = chunk
+            started -= worker_seconds
+        else:
+            converted_chunk, bad_records = convert_chunk(chunk, row_converter)
+        if batch_sizer:
+            batch_sizer.observe_rows(converted_chunk)
+        last_key = tuple(chunk[-1][idx] for idx in key_indexes) if checkpoint else None
+        stats = batch_stats(metrics, chunk, converted_chunk, bad_records, started)
+        return converted_chunk, last_key, stats
+
+    def write_rows(conn, rows, number, commit, before_commit=None):
+        batch_info = {"source": source_table, "batch": number}
+        if load_mode == "load_data":
+            return load_data_to_mysql(
+                conn,
                 destination_table,
-                insert_columns,  # Use updated columns list with timestamps
-                converted_chunk,
+                insert_columns,
+                rows,
                 primary_key,
-                batch_size=chunk_size,
-                exceptions=exceptions
+                before_commit=before_commit,
+                commit=commit,
+                metrics=metrics,
+                quarantine=quarantine,
+                batch_info=batch_info,
+                bisect=bisect
             )
-            batch_number += 1
+        return insert_data_to_mysql(
+            conn,
+            destination_table,
+            insert_columns,  # Use updated columns list with timestamps
+            rows,
+            primary_key,
+            batch_size=chunk_size,
+            exceptions=exceptions,
+            before_commit=before_commit,
+            commit=commit,
+            metrics=metrics,
+            quarantine=quarantine,
+            batch_info=batch_info,
+            bisect=bisect
+        )
 
-    except pyodbc.Error as e:
-        logging.error(f"Error fetching data from ODBC table {source_table}: {str(e)}", exc_info=True)
+    writer_pool = create_writer_pool(
+        writer_connections, insert_columns, primary_key or unique_keys, write_rows, writer_commit_interval,
+        destination_table, retry=retry, bulk_load=bulk_load, fail_fast=fail_fast, checkpoint=checkpoint, metrics=metrics
+    )
+
+    def write(batch):
+        nonlocal batch_number, rows_written, committed_key, committed_rows, uncommitted_rows
+        converted_chunk, last_key, stats = batch
+        logging.info(f"Inserting batch {batch_number} into `{destination_table}`.")
+        started = time.perf_counter()
+        if writer_pool:
+            # Written asynchronously; the watermark follows what every writer has committed
+            writer_pool.submit(batch_number, converted_chunk, last_key)
+            written = len(converted_chunk)
+            if checkpoint:
+                committed_key = commit_durable_watermark(writer_pool, mysql_conn, state_key) or committed_key
+        else:
+            # The watermark is written in the same transaction as the batch it covers
+            saved = []
+            def before_commit(cursor):
+                save_sync_state(cursor, state_key, "watermark", last_key)
+                saved.append(last_key)
+            commit = batch_number % commit_interval == 0
+            written = write_rows(mysql_conn, converted_chunk, batch_number, commit, before_commit if checkpoint else None)
+            if fail_fast and converted_chunk and not written:
+                raise RuntimeError(f"Batch {batch_number} could not be written to `{destination_table}`.")
+            if (bulk_load or commit_interval > 1) and written < len(converted_chunk):
+                # The rollback also discarded every batch written since the last commit
+                raise RuntimeError(
+                    f"Batch {batch_number} could not be written to `{destination_table}` in full; "
+                    f"the {uncommitted_rows} rows written since the last commit were rolled back with it."
+                )
+            uncommitted_rows = 0 if commit else uncommitted_rows + written
+            if checkpoint and not saved:
+                # Moving on would store the next batch's watermark past these rows
+                raise RuntimeError(f"Batch {batch_number} of `{destination_table}` was neither written nor quarantined.")
+            if commit and checkpoint:
+                committed_key, committed_rows = last_key, rows_written + written
+        write_seconds = time.perf_counter() - started
+        if batch_sizer and not writer_pool:
+            batch_sizer.observe_write(len(converted_chunk), write_seconds)
+        if metrics:
+            metrics.record_batch(written, write_seconds=write_seconds, **stats)
+        rows_written += written
+        batch_number += 1
+
+    def read(conn):
+        nonlocal rows_written, uncommitted_rows
+        # Batches written after the last commit were rolled back and are read again
+        rows_written, uncommitted_rows = committed_rows, 0
+        batches = read_source_batches(
+            conn, source_table, chunk_size, [date_filter, filter_predicate, range_predicate], query_params, order_by,
+            key_columns=key_columns, key_indexes=key_indexes, start_key=committed_key,
+            page_size=page_size, page_syntax=page_syntax, batch_sizer=batch_sizer, metrics=metrics,
+            select=select_columns
+        )
+        return process_converter.map(batches) if process_converter else batches
+
+    if bulk_load:
+        set_bulk_load_session(mysql_conn, True)
+    try:
+        run_resumable_pipeline(
+            read, convert, write, odbc_conn, mysql_conn, queue_depth, retry,
+            resumable=checkpoint or bool(primary_key), progress=lambda: committed_key,
+            after_reconnect=(lambda: set_bulk_load_session(mysql_conn, True)) if bulk_load else None,
+            description=f"load of `{destination_table}`"
+        )
+        if writer_pool:
+            writer_pool.close()
+            if checkpoint:
+                commit_durable_watermark(writer_pool, mysql_conn, state_key)
+        if commit_interval > 1:
+            with timed_phase(metrics, "commit"):
+                mysql_conn.commit()
+    except (pyodbc.Error, MySQLError) as e:
+        logging.error(f"Error loading data from ODBC table {source_table}: {str(e)}", exc_info=True)
+        if fail_fast:
+            raise
+    finally:
+        if process_converter:
+            process_converter.close()
+        if writer_pool:
+            writer_pool.abort()
+            rows_written = writer_pool.rows_written
+            for conn in writer_connections if bulk_load else ():
+                if is_connection_usable(conn):
+                    set_bulk_load_session(conn, False)
+        if bulk_load and is_connection_usable(mysql_conn):
+            set_bulk_load_session(mysql_conn, False)
+        if batch_sizer:
+            logging.info(f"Batch sizes for `{destination_table}`: {batch_sizer.summary()}")
+    return rows_written
 
 def fetch_and_update_rows(
     odbc_conn, mysql_conn, source_table, destination_table, columns, primary_key, unique_keys,
-    sort_column, update_columns, chunk_size, exceptions=None, trim_trailing_spaces=False, since=None
+    sort_column, update_columns, chunk_size, exceptions=None, trim_trailing_spaces=False, since=None,
+    queue_depth=0, range_filter=None, load_mode="executemany",
+    checkpoint=False, page_size=None, page_syntax="top", use_row_hash=False, counters=None,
+    batch_bytes=None, metrics=None, quarantine=None, retry=None, conversion_workers=0,
+    writer_connections=None, writer_commit_interval=1, source_filter=None, select_columns=None, fail_fast=False
 ):
     """
     Fetch rows from ODBC and update them in the MySQL table with error handling for bad records.
-    """
-    cursor = odbc_conn.cursor()
 
+    With `queue_depth` > 0 fetching, conversion and updating run as pipelined stages
+    (see `run_pipeline`). `range_filter` is an optional (predicate, params) pair from
+    `partition_ranges` restricting the source query to one partition. With
+    `load_mode="load_data"` batches are written with `LOAD DATA LOCAL INFILE`
+    (see `load_data_to_mysql`) instead of `executemany`. With `checkpoint` the last
+    committed (sort_column, primary key) tuple is stored with every batch and the next
+    run resumes after it using keyset pagination (see `read_source_batches`).
+
+    With `use_row_hash` a hash of `update_columns` is kept in the `_row_hash` column and
+    rows whose stored hash already matches are skipped before the write. Inserted,
+    updated and skipped row counts are added to the `counters` dict when one is given.
+
+    With `batch_bytes` the rows per batch are chosen by a `BatchSizer` from that byte
+    budget instead of the fixed `chunk_size`. Phase timings and one record per batch are
+    added to `metrics` (a `metrics.TableMetrics`) when given. A failed batch is bisected
+    so its good rows still commit, and the rejected ones go to the `quarantine` sink or
+    the log (see `recover_failed_batch`). Rows that fail conversion are appended to
+    `bad_records_<destination>.log`. With `fail_fast` a batch that could not be written
+    stops the load, and an error that stops the load is raised instead of only being logged.
+
+    With a `retry` policy (see `retry.RetryPolicy`) transient errors reconnect and replay
+    the load from the last commit (see `run_resumable_pipeline`): after the last committed
+    key with `checkpoint`, otherwise from the start, as the upserts are idempotent.
+
+    With `conversion_workers` > 1 rows are converted in that many worker processes
+    (see `ProcessConverter`); batches are still written in source order.
+
+    With `writer_connections` rows are upserted over those MySQL connections in
+    parallel, routed by a hash of the primary key (see `PartitionedWriter`); each
+    commits every `writer_commit_interval` sub-batches, and the watermark follows what
+    all of them have committed.
+
+    `source_filter` is a (predicate, params) pair from `source_filter_predicate` pushed
+    into every source query. With `select_columns` only those columns are read, in the
+    order of `columns`, instead of `SELECT *`.
+
+    Returns:
+        int: The number of rows committed to MySQL.
+    """
     # Add `created_at` and `updated_at` columns dynamically for updates
     additional_columns = [("created_at", "DATETIME"), ("updated_at", "DATETIME")]
     final_columns = columns + additional_columns
+    write_update_columns = update_columns
+
+    counts = {"inserted": 0, "updated": 0, "skipped": 0}
+    if use_row_hash:
+        if not primary_key:
+            raise ValueError(f"row_hash on `{destination_table}` requires a primary_key.")
+        ensure_row_hash_column(mysql_conn, destination_table)
+        final_columns = final_columns + [(ROW_HASH_COLUMN, "CHAR")]
+        write_update_columns = update_columns + [ROW_HASH_COLUMN]
+        hash_indexes = column_indexes(columns, update_columns)
+        pk_indexes = column_indexes(columns, primary_key)
+
+    # Apply `since` filter if provided; rows with a NULL sort_column are ignored
+    date_filter = since_predicate(sort_column, since, skip_null_sort=True)
+
+    filter_predicate, filter_params = source_filter or (None, [])
+    range_predicate, range_params = range_filter or (None, [])
+    query_params = list(filter_params) + list(range_params)
+    key_columns, key_indexes, start_key, state_key = None, None, None, None
+    if checkpoint:
+        key_columns = checkpoint_key_columns(sort_column, primary_key)
+        key_indexes = column_indexes(columns, key_columns)
+        state_key = mapping_key(source_table, destination_table)
+        ensure_sync_state_table(mysql_conn)
+        start_key = load_sync_state(mysql_conn, state_key, "watermark")
+        if start_key and start_key[0] is None:
+            logging.warning(f"Ignoring the stored watermark of `{source_table}`, its `{sort_column}` is NULL.")
+            start_key = None
+        if start_key:
+            # The watermark supersedes the `since` look-back window
+            date_filter = None
+            logging.info(f"Resuming `{source_table}` after {key_columns} = {start_key}")
+    order_by = key_columns or ([sort_column] if sort_column else [])
+
+    rows_written = 0
+    batch_number = 1
+    bad_log = None
+    # Where a replay after a transient error starts: the last committed key and row count
+    committed_key, committed_rows = start_key, 0
+
+    # Compile the per-column conversion once for the whole table
+    row_converter = compile_row_converter(columns, exceptions, trim_trailing_spaces)
+    batch_sizer = create_batch_sizer(mysql_conn, columns, batch_bytes, exceptions) if batch_bytes else None
+    process_converter = (
+        ProcessConverter(columns, exceptions, trim_trailing_spaces, conversion_workers)
+        if conversion_workers > 1 else None
+    )
+
+    def convert(chunk):
+        nonlocal bad_log
+        # `created_at`/`updated_at` are appended; bad rows are collected for debugging
+        started = time.perf_counter()
+        if process_converter:
+            # Already converted by a worker process; count its time as conversion time
+            chunk, converted_chunk, bad_records, worker_seconds = chunk
+            started -= worker_seconds
+        else:
+            converted_chunk, bad_records = convert_chunk(chunk, row_converter)
+        if batch_sizer:
+            batch_sizer.observe_rows(converted_chunk)
+        if use_row_hash:
+            converted_chunk = [row + (row_hash([row[idx] for idx in hash_indexes]),) for row in converted_chunk]
+
+        # Log bad records to a file, opened once for the whole table
+        if bad_records:
+            if bad_log is None:
+                bad_log = open(f"bad_records_{destination_table}.log", "a")
+            for bad_row in bad_records:
+                bad_log.write(f"{bad_row}\n")
+            bad_log.flush()
+            logging.warning(f"{len(bad_records)} bad rows logged to {bad_log.name}")
+        last_key = tuple(chunk[-1][idx] for idx in key_indexes) if checkpoint else None
+        stats = batch_stats(metrics, chunk, converted_chunk, bad_records, started)
+        return converted_chunk, last_key, stats
+
+    def write_rows(conn, rows, number, commit, before_commit=None):
+        batch_info = {"source": source_table, "batch": number}
+        if load_mode == "load_data":
+            return load_data_to_mysql(
+                conn,
+                destination_table,
+                final_columns,
+                rows,
+                primary_key,
+                update_columns=write_update_columns,
+                before_commit=before_commit,
+                commit=commit,
+                metrics=metrics,
+                quarantine=quarantine,
+                batch_info=batch_info
+            )
+        # Execute the update query for valid rows
+        return upsert_data_to_mysql(
+            conn,
+            destination_table,
+            final_columns,
+            rows,
+            write_update_columns,
+            before_commit=before_commit,
+            metrics=metrics,
+            quarantine=quarantine,
+            batch_info=batch_info,
+            commit=commit
+        )
 
-    # Prepare the base query
-    base_query = f"SELECT * FROM {source_table}"
+    writer_pool = create_writer_pool(
+        writer_connections, final_columns, primary_key or unique_keys, write_rows, writer_commit_interval,
+        destination_table, retry=retry, fail_fast=fail_fast, checkpoint=checkpoint, metrics=metrics
+    )
+
+    def write(batch):
+        nonlocal rows_written, batch_number, committed_key, committed_rows
+        converted_chunk, last_key, stats = batch
+        number = batch_number
+        batch_number += 1
+        batch_rows = len(converted_chunk)
+        started = time.perf_counter()
+
+        if use_row_hash:
+            with timed_phase(metrics, "hash_lookup"):
+                converted_chunk, inserted, updated, skipped = split_changed_rows(
+                    mysql_conn, destination_table, primary_key, pk_indexes, len(final_columns) - 1, converted_chunk
+                )
+            logging.info(f"`{destination_table}` batch: {inserted} new, {updated} changed, {skipped} unchanged rows skipped.")
+
+        if writer_pool:
+            # Written asynchronously; the watermark follows what every writer has committed
+            writer_pool.submit(number, converted_chunk, last_key)
+            written = len(converted_chunk)
+            if checkpoint:
+                committed_key = commit_durable_watermark(writer_pool, mysql_conn, state_key) or committed_key
+        else:
+            # The watermark is written in the same transaction as the batch it covers
+            saved = []
+            def before_commit(cursor):
+                save_sync_state(cursor, state_key, "watermark", last_key)
+                saved.append(last_key)
+            written = write_rows(mysql_conn, converted_chunk, number, True, before_commit if checkpoint else None)
+            if fail_fast and converted_chunk and not written:
+                raise RuntimeError(f"Batch {number} could not be written to `{destination_table}`.")
+            if checkpoint and not saved:
+                # Moving on would store the next batch's watermark past these rows
+                raise RuntimeError(f"Batch {number} of `{destination_table}` was neither written nor quarantined.")
+            if checkpoint:
+                committed_key, committed_rows = last_key, rows_written + written
+        rows_written += written
+        write_seconds = time.perf_counter() - started
+        if batch_sizer and not writer_pool:
+            batch_sizer.observe_write(batch_rows, write_seconds)
+        if metrics:
+            metrics.record_batch(written, write_seconds=write_seconds, **stats)
+
+        if use_row_hash and (written or not converted_chunk):
+            counts["inserted"] += inserted
+            counts["updated"] += updated
+            counts["skipped"] += skipped
+
+    def read(conn):
+        nonlocal rows_written
+        # A batch that failed transiently was rolled back and is read again
+        rows_written = committed_rows
+        batches = read_source_batches(
+            conn, source_table, chunk_size, [date_filter, filter_predicate, range_predicate], query_params, order_by,
+            key_columns=key_columns, key_indexes=key_indexes, start_key=committed_key,
+            page_size=page_size, page_syntax=page_syntax, batch_sizer=batch_sizer, metrics=metrics,
+            select=select_columns
+        )
+        return process_converter.map(batches) if process_converter else batches
 
-    # Apply `since` filter if provided
-    date_filter = None
-    if since and sort_column:
-        look_back_date = (datetime.now() - timedelta(days=since)).strftime('%Y-%m-%d')
-        date_filter = f"{sort_column} IS NOT NULL AND {sort_column} > '{look_back_date}'"
-    else:
-        date_filter = f"{sort_column} IS NOT NULL"  # Ignore rows with NULL sort_column
+    try:
+        run_resumable_pipeline(
+            read, convert, write, odbc_conn, mysql_conn, queue_depth, retry,
+            resumable=True, progress=lambda: committed_key, description=f"update of `{destination_table}`"
+        )
+        if writer_pool:
+            writer_pool.close()
+            if checkpoint:
+                commit_durable_watermark(writer_pool, mysql_conn, state_key)
+    except Exception as e:
+        logging.error(f"Error fetching data from ODBC table {source_table}: {str(e)}", exc_info=True)
+        if fail_fast:
+            raise
+    finally:
+        if process_converter:
+            process_converter.close()
+        if writer_pool:
+            writer_pool.abort()
+            rows_written = writer_pool.rows_written
+        if bad_log is not None:
+            bad_log.close()
+
+    if batch_sizer:
+        logging.info(f"Batch sizes for `{destination_table}`: {batch_sizer.summary()}")
+    if use_row_hash:
+        logging.info(
+            f"`{destination_table}`: {counts['inserted']} rows inserted, {counts['updated']} updated, "
+            f"{counts['skipped']} unchanged rows skipped."
+        )
+    if use_row_hash and counters is not None:
+        for name, count in counts.items():
+            counters[name] = counters.get(name, 0) + count
+    return rows_written
 
-    # Finalize the query with filters and sorting
-    where_clause = f"WHERE {date_filter}" if date_filter else ""
-    query = f"{base_query} {where_clause} ORDER BY {sort_column}"
-    logging.info(f"Executing query: {query}")
+def probe_source_table(odbc_conn, source_table, sort_column=None, source_filter=None, query=None):
+    """
+    Run a cheap change probe against a source table.
 
-    # Prepare the update query for MySQL
-    update_query = f"""
-        INSERT INTO `{destination_table}` ({', '.join([f"`{col[0]}`" for col in final_columns])})
-        VALUES ({', '.join(['%s'] * len(final_columns))})
-        ON DUPLICATE KEY UPDATE
-        {', '.join([f"`{col}`=VALUES(`{col}`)" for col in update_columns])},
-        `updated_at`=VALUES(`updated_at`)
+    By default the probe is `COUNT(*)` plus `MAX(sort_column)` when the mapping has a
+    sort column, restricted by `source_filter`; `query` replaces it with any SQL whose
+    first row fingerprints the table (e.g. a checksum aggregate or a change counter).
+
+    Returns:
+        list: The values of the probe's first row.
     """
+    if query:
+        params = []
+    else:
+        predicate, params = source_filter or (None, [])
+        aggregates = ["COUNT(*)"] + ([f"MAX({sort_column})"] if sort_column else [])
+        query = build_source_query(source_table, [predicate], select=aggregates)
+    cursor = odbc_conn.cursor()
+    try:
+        cursor.execute(query, *params)
+        row = cursor.fetchone()
+    finally:
+        cursor.close()
+    return list(row) if row else []
+
+def partition_ranges(odbc_conn, source_table, column, partitions):
+    """
+    Split a source table into up to `partitions` contiguous ranges of `column`.
+
+    Numeric and date/datetime columns are split evenly between their MIN and MAX; any
+    other column is split at quantiles sampled from the ordered column, so boundaries
+    always follow the source's own ordering. NULLs are assigned to the first range.
 
+    Returns:
+        list: (predicate, params) pairs, one per range, for the source query WHERE clause.
+    """
+    cursor = odbc_conn.cursor()
     try:
-        cursor.execute(query)
-        while True:
-            try:
-                chunk = cursor.fetchmany(chunk_size)
+        cursor.execute(f"SELECT MIN({column}), MAX({column}), COUNT({column}) FROM {source_table}")
+        low, high, row_count = cursor.fetchone()
+        if partitions <= 1 or low is None or low == high:
+            return [(None, [])]
+
+        if isinstance(low, (int, float, Decimal)) and not isinstance(low, bool):
+            step = (high - low) / partitions
+            bounds = [low + step * i for i in range(1, partitions)]
+            if isinstance(low, int):
+                bounds = [int(bound) for bound in bounds]
+        elif isinstance(low, (datetime, date)):
+            step = (high - low) / partitions
+            bounds = [low + step * i for i in range(1, partitions)]
+        else:
+            # Walk the ordered column once and keep the value at every quantile position
+            positions = [row_count * i // partitions for i in range(1, partitions)]
+            cursor.execute(f"SELECT {column} FROM {source_table} WHERE {column} IS NOT NULL ORDER BY {column}")
+            bounds = []
+            offset = 0
+            while positions:
+                chunk = cursor.fetchmany(10000)
                 if not chunk:
-                    logging.info(f"No more rows to process for table {source_table}.")
                     break
-            except pyodbc.DataError as e:
-                logging.error(f"DataError while fetching rows from {source_table}: {str(e)}")
-                continue  # Skip the problematic batch
+                while positions and positions[0] < offset + len(chunk):
+                    bounds.append(chunk[positions.pop(0) - offset][0])
+                offset += len(chunk)
+    finally:
+        cursor.close()
 
-            converted_chunk = []
-            bad_records = []  # Collect bad rows in this batch
-
-            for row in chunk:
-                try:
-                    # Process the row based on the original ODBC columns
-                    processed_row = process_row(row, columns, exceptions, trim_trailing_spaces)
-
-                    # Append `created_at` and `updated_at` timestamps for insertion
-                    now = datetime.now()
-                    processed_row = list(processed_row)
-                    processed_row.append(now)  # created_at
-                    processed_row.append(now)  # updated_at
-
-                    converted_chunk.append(tuple(processed_row))
-                except Exception as e:
-                    logging.warning(f"Error processing row {row}: {str(e)}")
-                    bad_records.append(row)  # Log the bad record for debugging
-
-            # Log bad records to a file
-            if bad_records:
-                bad_log_file = f"bad_records_{destination_table}.log"
-                with open(bad_log_file, "a") as f:
-                    for bad_row in bad_records:
-                        f.write(f"{bad_row}\n")
-                logging.warning(f"{len(bad_records)} bad rows logged to {bad_log_file}")
-
-            # Execute the update query for valid rows
-            try:
-                mysql_cursor = mysql_conn.cursor()
-                mysql_cursor.executemany(update_query, converted_chunk)
-                mysql_conn.commit()
-                logging.info(f"Batch of {len(converted_chunk)} rows updated in `{destination_table}`.")
-            except Exception as e:
-                logging.error(f"Error updating batch in table {destination_table}: {str(e)}", exc_info=True)
+    # Drop duplicate boundaries so no range is empty by construction
+    distinct_bounds = []
+    for bound in bounds:
+        if bound != low and (not distinct_bounds or bound != distinct_bounds[-1]):
+            distinct_bounds.append(bound)
+    if not distinct_bounds:
+        return [(None, [])]
+
+    ranges = [(f"{column} < ? OR {column} IS NULL", [distinct_bounds[0]])]
+    for lower, upper in zip(distinct_bounds, distinct_bounds[1:]):
+        ranges.append((f"{column} >= ? AND {column} < ?", [lower, upper]))
+    ranges.append((f"{column} >= ?", [distinct_bounds[-1]]))
+    logging.info(f"Split {source_table} into {len(ranges)} ranges on {column}: {distinct_bounds}")
+    return ranges
+
+def probe_odbc_columns(odbc_conn, source_table):
+    """
+    Read a source table's columns with an empty `SELECT`.
 
-    except Exception as e:
-        logging.error(f"Error fetching data from ODBC table {source_table}: {str(e)}", exc_info=True)
+    Returns:
+        list: (column name, Python type name) tuples.
+    """
+    cursor = odbc_conn.cursor()
+    try:
+        cursor.execute(f"SELECT * FROM {source_table} WHERE 1=0")  # Fetch only metadata
+        # pyodbc reports the Python type each column is returned as
+        return [(column[0], column[1].__name__) for column in cursor.description]
+    finally:
+        cursor.close()
+
+def apply_column_exceptions(columns, exceptions):
+    """Override column types with the `type` of their exception, if any."""
+    return [
+        (column_name, column_exception(exceptions, column_name).get("type", column_type))
+        for column_name, column_type in columns
+    ]
 
-def fetch_odbc_metadata(odbc_conn, source_table, exceptions=None):
+def fetch_odbc_metadata(odbc_conn, source_table, exceptions=None, cache=None):
     """
     Fetch metadata (columns and types) for a table from the ODBC source.
+
+    With a `cache` (`schema_cache.MetadataCache`) the probe query is skipped while the
+    table's catalog fingerprint is unchanged. Exception types are applied after the
+    cache, so editing `exceptions` never requires invalidating it.
     """
     try:
-        cursor = odbc_conn.cursor()
-        query = f"SELECT * FROM {source_table} WHERE 1=0"  # Fetch only metadata
-        cursor.execute(query)
-        metadata = cursor.description
-        cursor.close()
-
-        columns_metadata = []
-        for column in metadata:
-            column_name = column[0]
-            column_type = column[1].__name__  # Assuming the type is a Python type
-            if exceptions and column_name in exceptions:
-                column_type = exceptions[column_name].get("type", column_type)
-            columns_metadata.append((column_name, column_type))
+        if cache is not None:
+            columns = cache.get_or_probe(odbc_conn, source_table, probe_odbc_columns)
+        else:
+            columns = probe_odbc_columns(odbc_conn, source_table)
 
-        return columns_metadata
+        return apply_column_exceptions(columns, exceptions)
     except Exception as e:
         logging.error(f"Failed to fetch metadata for table {source_table}: {str(e)}")
         raise
 
-def insert_data_to_mysql(mysql_conn,destination_table,columns,chunk,primary_key,batch_size,exceptions=None,trim_trailing_spaces=False):
+def fetch_mysql_table_layouts(mysql_conn, table_names):
     """
-    Insert processed rows into a MySQL table.
+    Load which of `table_names` exist in the MySQL database, with their columns, in one query.
+
+    Returns:
+        dict: Lower-cased table name -> list of (column name, column type) in table order.
     """
+    if not table_names:
+        return {}
     cursor = mysql_conn.cursor()
+    try:
+        cursor.execute(
+            "SELECT TABLE_NAME, COLUMN_NAME, COLUMN_TYPE FROM information_schema.COLUMNS "
+            f"WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME IN ({', '.join(['%s'] * len(table_names))}) "
+            "ORDER BY TABLE_NAME, ORDINAL_POSITION",
+            tuple(table_names)
+        )
+        layouts = {}
+        for table_name, column_name, column_type in cursor.fetchall():
+            layouts.setdefault(table_name.lower(), []).append((column_name, column_type))
+        return layouts
+    finally:
+        cursor.close()
+
+def build_insert_query(destination_table, columns, primary_key):
+    """INSERT for converted rows; duplicate keys are left as they are."""
     column_names = ', '.join([f"`{col[0]}`" for col in columns])
     placeholders = ', '.join(['%s'] * len(columns))
     insert_query = f"INSERT INTO `{destination_table}` ({column_names}) VALUES ({placeholders})"
@@ -367,23 +1784,405 @@ def insert_data_to_mysql(mysql_conn,destination_table,columns,chunk,primary_key,
     if primary_key:
         update_columns = ', '.join([f"`{col}`=VALUES(`{col}`)" for col in primary_key])
         insert_query += f" ON DUPLICATE KEY UPDATE {update_columns}"
+    return insert_query
 
-    logging.info(f"Preparing to insert {len(chunk)} rows into `{destination_table}`.")
+def build_upsert_query(destination_table, columns, update_columns):
+    """INSERT ... ON DUPLICATE KEY UPDATE of `update_columns` and `updated_at`."""
+    return f"""
+        INSERT INTO `{destination_table}` ({', '.join([f"`{col[0]}`" for col in columns])})
+        VALUES ({', '.join(['%s'] * len(columns))})
+        ON DUPLICATE KEY UPDATE
+        {', '.join([f"`{col}`=VALUES(`{col}`)" for col in update_columns])},
+        `updated_at`=VALUES(`updated_at`)
+    """
 
-    processed_chunk = []
-    for row in chunk:
+def write_rows_bisecting(mysql_conn, query, rows, error):
+    """
+    Write a batch that failed as a whole by recursively splitting it in halves.
+
+    Every half that succeeds is committed on its own, so each bad row costs a logarithmic
+    number of extra round trips and the good rows are kept. A lost connection stops the
+    bisection; rows not committed by then are reported as failed with that error.
+
+    Returns:
+        tuple: (rows committed, [(row index, error message)] for the rejected rows)
+    """
+    # 0 = pending, 1 = committed, 2 = rejected
+    state = bytearray(len(rows))
+    failures = []
+    cursor = mysql_conn.cursor()
+
+    def split(start, end, message):
+        if end - start == 1:
+            state[start] = 2
+            failures.append((start, message))
+            return
+        middle = (start + end) // 2
+        for half_start, half_end in ((start, middle), (middle, end)):
+            try:
+                cursor.executemany(query, rows[half_start:half_end])
+                mysql_conn.commit()
+                state[half_start:half_end] = b"\x01" * (half_end - half_start)
+            except (InterfaceError, OperationalError):
+                raise
+            except Exception as e:
+                mysql_conn.rollback()
+                split(half_start, half_end, str(e))
+
+    try:
+        split(0, len(rows), str(error))
+    except (InterfaceError, OperationalError) as e:
+        logging.error(f"Connection error while bisecting a failed batch: {str(e)}")
+        failures.extend((index, str(e)) for index, flag in enumerate(state) if flag == 0)
+    finally:
         try:
-            processed_row = process_row(row, columns, exceptions, trim_trailing_spaces)
-            processed_chunk.append(processed_row)
+            cursor.close()
+        except Exception:
+            pass
+    return state.count(1), failures
+
+def recover_failed_batch(mysql_conn, query, destination_table, columns, chunk, error,
+                         before_commit=None, commit=True, quarantine=None, batch_info=None, bisect=True):
+    """
+    Salvage a batch that failed as a whole: bisect it so its good rows still commit.
+
+    The rows MySQL rejects go to the `quarantine` sink, or are logged and dropped without
+    one. Only done with `bisect` and when the batch is its own transaction
+    (`commit=True`); connection errors are not bisected. `before_commit` runs once the
+    rejected rows are safely quarantined, so a sync watermark never skips rows that were
+    only logged.
+
+    Returns:
+        int: The number of rows committed.
+    """
+    if not bisect or not commit or not chunk or isinstance(error, (InterfaceError, OperationalError)):
+        return 0
+    logging.info(f"Bisecting failed batch of {len(chunk)} rows for `{destination_table}`.")
+    written, failures = write_rows_bisecting(mysql_conn, query, chunk, error)
+    if failures and quarantine is None:
+        for index, message in failures:
+            logging.error(f"Row rejected by `{destination_table}` ({batch_info or {}}): {message} - {chunk[index]}")
+        logging.warning(
+            f"{len(failures)} rows rejected by `{destination_table}` were dropped; {written} rows of the batch committed. "
+            f"Set QUARANTINE to keep rejected rows for replay."
+        )
+        return written
+    if failures:
+        try:
+            quarantine.add(mysql_conn, destination_table, columns, [(chunk[index], message) for index, message in failures], batch_info)
+        except Exception as e:
+            logging.error(f"Could not quarantine {len(failures)} rejected rows of `{destination_table}`: {str(e)}", exc_info=True)
+            return written
+        logging.warning(f"{len(failures)} rows rejected by `{destination_table}` were quarantined; {written} rows of the batch committed.")
+    if before_commit:
+        cursor = mysql_conn.cursor()
+        try:
+            before_commit(cursor)
+            mysql_conn.commit()
         except Exception as e:
-            logging.error(f"Error processing row: {row} - {str(e)}")
+            mysql_conn.rollback()
+            logging.error(f"Error committing batch state for `{destination_table}`: {str(e)}", exc_info=True)
+        finally:
+            cursor.close()
+    return written
+
+def insert_data_to_mysql(mysql_conn,destination_table,columns,chunk,primary_key,batch_size,exceptions=None,trim_trailing_spaces=False,before_commit=None,commit=True,metrics=None,quarantine=None,batch_info=None,bisect=True):
+    """
+    Insert already converted rows into a MySQL table.
+
+    Rows must come from the loader's row converter; they are not processed again here.
+    `exceptions` and `trim_trailing_spaces` are accepted for backwards compatibility only.
+    `before_commit`, if given, is called with the cursor after the rows are written so
+    extra statements (such as a sync watermark) commit in the same transaction. With
+    `commit=False` the transaction is left open for the caller to commit later.
+    `executemany` and `commit` times are added to `metrics` when given. With `bisect` a
+    failed batch is bisected and its rejected rows go to `quarantine` (see
+    `recover_failed_batch`). Transient errors (see `retry.is_transient_error`) are
+    raised after rolling back.
+
+    Returns:
+        int: The number of rows committed, or 0 if the batch failed.
+    """
+    cursor = mysql_conn.cursor()
+    insert_query = build_insert_query(destination_table, columns, primary_key)
+
+    logging.info(f"Preparing to insert {len(chunk)} rows into `{destination_table}`.")
 
     try:
-        cursor.executemany(insert_query, processed_chunk)
-        mysql_conn.commit()
-        logging.info(f"Batch of {len(processed_chunk)} rows committed to `{destination_table}`.")
+        with timed_phase(metrics, "executemany"):
+            cursor.executemany(insert_query, chunk)
+        if before_commit:
+            before_commit(cursor)
+        if commit:
+            with timed_phase(metrics, "commit"):
+                mysql_conn.commit()
+        logging.info(f"Batch of {len(chunk)} rows {'committed' if commit else 'written'} to `{destination_table}`.")
+        return len(chunk)
     except Exception as e:
+        rollback_quietly(mysql_conn)
+        if is_transient_error(e):
+            # Nothing of the batch was committed; the loader reconnects and replays it
+            raise
         logging.error(f"Error inserting batch into `{destination_table}`: {str(e)}", exc_info=True)
+        return recover_failed_batch(
+            mysql_conn, insert_query, destination_table, columns, chunk, e, before_commit, commit, quarantine, batch_info,
+            bisect
+        )
+
+def upsert_data_to_mysql(mysql_conn, destination_table, columns, chunk, update_columns, before_commit=None, metrics=None, quarantine=None, batch_info=None, commit=True, bisect=True):
+    """
+    Upsert converted rows with `INSERT ... ON DUPLICATE KEY UPDATE` of `update_columns`.
+
+    `before_commit`, if given, is called with the cursor after the rows are written so
+    extra statements commit in the same transaction. With `commit=False` the transaction
+    is left open for the caller to commit later. `executemany` and `commit` times
+    are added to `metrics` when given. With `bisect` a failed batch is bisected and its
+    rejected rows go to `quarantine` (see `recover_failed_batch`). Transient errors are
+    raised after rolling back.
+
+    Returns:
+        int: The number of rows committed, or 0 if the batch failed.
+    """
+    update_query = build_upsert_query(destination_table, columns, update_columns)
+    try:
+        mysql_cursor = mysql_conn.cursor()
+        with timed_phase(metrics, "executemany"):
+            mysql_cursor.executemany(update_query, chunk)
+        if before_commit:
+            before_commit(mysql_cursor)
+        if commit:
+            with timed_phase(metrics, "commit"):
+                mysql_conn.commit()
+        logging.info(f"Batch of {len(chunk)} rows {'updated' if commit else 'written'} in `{destination_table}`.")
+        return len(chunk)
+    except Exception as e:
+        rollback_quietly(mysql_conn)
+        if is_transient_error(e):
+            # Nothing of the batch was committed; the loader reconnects and replays it
+            raise
+        logging.error(f"Error updating batch in table {destination_table}: {str(e)}", exc_info=True)
+        return recover_failed_batch(
+            mysql_conn, update_query, destination_table, columns, chunk, e, before_commit, commit, quarantine, batch_info,
+            bisect
+        )
+
+# Escapes for LOAD DATA fields (FIELDS ESCAPED BY '\\')
+_TSV_ESCAPES = {
+    ord("\\"): "\\\\",
+    ord("\t"): "\\t",
+    ord("\n"): "\\n",
+    ord("\r"): "\\r",
+    ord("\0"): "\\0",
+    ord("\x1a"): "\\Z",
+}
+_TSV_BYTE_ESCAPES = {byte: escaped.encode() for byte, escaped in _TSV_ESCAPES.items()}
+
+def encode_tsv_value(value):
+    """
+    Encode one converted value as a LOAD DATA field (bytes).
+
+    NULL becomes `\\N`; dates, times and datetimes use the same text forms the
+    connector sends for `%s` parameters, so both load modes store identical values.
+    """
+    if value is None:
+        return b"\\N"
+    if isinstance(value, bool):
+        return b"1" if value else b"0"
+    if isinstance(value, datetime):
+        return value.isoformat(" ").encode()
+    if isinstance(value, (date, datetime_time, int, float, Decimal)):
+        return str(value).encode()
+    if isinstance(value, timedelta):
+        seconds = int(value.total_seconds())
+        sign = "-" if seconds < 0 else ""
+        hours, remainder = divmod(abs(seconds), 3600)
+        return f"{sign}{hours:02d}:{remainder // 60:02d}:{remainder % 60:02d}".encode()
+    if isinstance(value, (bytes, bytearray)):
+        return b"".join(_TSV_BYTE_ESCAPES.get(byte, bytes((byte,))) for byte in value)
+    return str(value).translate(_TSV_ESCAPES).encode("utf-8")
+
+def write_tsv_rows(file, rows):
+    """Write converted rows to a binary file in LOAD DATA's default tab-separated format."""
+    for row in rows:
+        file.write(b"\t".join(encode_tsv_value(value) for value in row))
+        file.write(b"\n")
+
+def load_data_to_mysql(mysql_conn, destination_table, columns, chunk, primary_key, update_columns=None, before_commit=None, commit=True, metrics=None, quarantine=None, batch_info=None, bisect=True):
+    """
+    Bulk-load converted rows with `LOAD DATA LOCAL INFILE` instead of `executemany`.
+
+    Rows are streamed as escaped TSV into a temporary file. Without `update_columns`
+    the file is loaded straight into the destination, skipping duplicate keys like the
+    `executemany` insert does. With `update_columns` it is loaded into a per-connection
+    staging table and merged with `INSERT ... SELECT ... ON DUPLICATE KEY UPDATE`.
+    The connection must be opened with `allow_local_infile=True`. `before_commit`, if
+    given, is called with the cursor so extra statements commit in the same transaction.
+    With `commit=False` the transaction is left open for the caller to commit later.
+    Time spent writing the file, loading it and committing is added to `metrics` when given.
+    With `bisect` a failed batch is bisected with the equivalent `executemany` statement
+    and its rejected rows go to `quarantine` (see `recover_failed_batch`). Transient errors are raised after rolling back.
+
+    Returns:
+        int: The number of rows committed, or 0 if the batch failed.
+    """
+    if not chunk:
+        if before_commit:
+            # Nothing to load, but state tied to this batch must still be committed
+            cursor = mysql_conn.cursor()
+            try:
+                before_commit(cursor)
+                if commit:
+                    mysql_conn.commit()
+            finally:
+                cursor.close()
+        return 0
+
+    column_names = ', '.join([f"`{col[0]}`" for col in columns])
+    staging_table = f"{destination_table}_load"
+    target_table = staging_table if update_columns else destination_table
+    duplicate_handling = "IGNORE" if primary_key and not update_columns else ""
+
+    tsv_file = tempfile.NamedTemporaryFile(prefix=f"{destination_table}_", suffix=".tsv", delete=False)
+    cursor = mysql_conn.cursor()
+    try:
+        with timed_phase(metrics, "tsv_encode"):
+            with tsv_file:
+                write_tsv_rows(tsv_file, chunk)
+        tsv_path = tsv_file.name.replace("\\", "/")
+
+        with timed_phase(metrics, "load_data"):
+            if update_columns:
+                cursor.execute(
+                    f"CREATE TEMPORARY TABLE IF NOT EXISTS `{staging_table}` "
+                    f"AS SELECT {column_names} FROM `{destination_table}` LIMIT 0"
+                )
+                cursor.execute(f"DELETE FROM `{staging_table}`")
+
+            cursor.execute(
+                f"LOAD DATA LOCAL INFILE '{tsv_path}' {duplicate_handling} INTO TABLE `{target_table}` "
+                f"CHARACTER SET utf8mb4 "
+                f"FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\' LINES TERMINATED BY '\\n' "
+                f"({column_names})"
+            )
+
+            if update_columns:
+                cursor.execute(f"""
+                    INSERT INTO `{destination_table}` ({column_names})
+                    SELECT {column_names} FROM `{staging_table}`
+                    ON DUPLICATE KEY UPDATE
+                    {', '.join([f"`{col}`=VALUES(`{col}`)" for col in update_columns])},
+                    `updated_at`=VALUES(`updated_at`)
+                """)
+                cursor.execute(f"DELETE FROM `{staging_table}`")
+
+        if before_commit:
+            before_commit(cursor)
+        if commit:
+            with timed_phase(metrics, "commit"):
+                mysql_conn.commit()
+        logging.info(f"Batch of {len(chunk)} rows loaded into `{destination_table}` with LOAD DATA.")
+        return len(chunk)
+    except Exception as e:
+        rollback_quietly(mysql_conn)
+        if is_transient_error(e):
+            # Nothing of the batch was committed; the loader reconnects and replays it
+            raise
+        logging.error(f"Error loading batch into `{destination_table}` with LOAD DATA: {str(e)}", exc_info=True)
+        if update_columns:
+            fallback_query = build_upsert_query(destination_table, columns, update_columns)
+        else:
+            fallback_query = build_insert_query(destination_table, columns, primary_key)
+        return recover_failed_batch(
+            mysql_conn, fallback_query, destination_table, columns, chunk, e, before_commit, commit, quarantine, batch_info,
+            bisect
+        )
+    finally:
+        cursor.close()
+        os.remove(tsv_file.name)
+
+# Column maintained by the tool when a mapping enables `row_hash`
+ROW_HASH_COLUMN = "_row_hash"
+
+def row_hash(values):
+    """MD5 hex digest of converted values, encoded the same way LOAD DATA fields are."""
+    return hashlib.md5(b"\t".join(encode_tsv_value(value) for value in values)).hexdigest()
+
+def ensure_row_hash_column(mysql_conn, destination_table):
+    """Add the `_row_hash` column to the destination table if it is missing."""
+    cursor = mysql_conn.cursor()
+    try:
+        cursor.execute(
+            "SELECT COUNT(*) FROM information_schema.COLUMNS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = %s",
+            (destination_table, ROW_HASH_COLUMN)
+        )
+        if cursor.fetchone()[0] == 0:
+            logging.info(f"Adding `{ROW_HASH_COLUMN}` column to `{destination_table}`.")
+            cursor.execute(f"ALTER TABLE `{destination_table}` ADD COLUMN `{ROW_HASH_COLUMN}` CHAR(32) NULL")
+            mysql_conn.commit()
+    finally:
+        cursor.close()
+
+def _hash_lookup_key(key):
+    # Compare keys as text so source and MySQL value types (int vs Decimal, etc.) still match,
+    # and without the padding ODBC leaves on CHAR values and MySQL strips
+    return tuple(str(value) for value in normalize_key(key))
+
+def fetch_row_hashes(mysql_conn, destination_table, primary_key, keys):
+    """
+    Fetch the stored row hashes for a batch of primary keys.
+
+    Returns:
+        dict: Stored hash keyed by the text form of each existing primary key, without
+        trailing spaces.
+    """
+    if not keys:
+        return {}
+    # Padded keys are looked up stripped as well, since NO PAD collations tell them apart
+    keys = list(dict.fromkeys([*keys, *map(normalize_key, keys)]))
+    key_columns = ", ".join(f"`{pk}`" for pk in primary_key)
+    if len(primary_key) == 1:
+        condition = f"`{primary_key[0]}` IN ({', '.join(['%s'] * len(keys))})"
+        params = [key[0] for key in keys]
+    else:
+        row_placeholder = f"({', '.join(['%s'] * len(primary_key))})"
+        condition = f"({key_columns}) IN ({', '.join([row_placeholder] * len(keys))})"
+        params = [value for key in keys for value in key]
+
+    cursor = mysql_conn.cursor()
+    try:
+        cursor.execute(
+            f"SELECT {key_columns}, `{ROW_HASH_COLUMN}` FROM `{destination_table}` WHERE {condition}",
+            params
+        )
+        return {_hash_lookup_key(row[:-1]): row[-1] for row in cursor.fetchall()}
+    finally:
+        cursor.close()
+
+def split_changed_rows(mysql_conn, destination_table, primary_key, key_indexes, hash_index, chunk):
+    """
+    Drop rows whose stored `_row_hash` already matches, before they are written.
+
+    Returns:
+        tuple: (rows to write, inserted count, updated count, skipped count)
+    """
+    stored_hashes = fetch_row_hashes(
+        mysql_conn, destination_table, primary_key,
+        [tuple(row[idx] for idx in key_indexes) for row in chunk]
+    )
+    changed_rows = []
+    inserted = updated = skipped = 0
+    for row in chunk:
+        stored_hash = stored_hashes.get(_hash_lookup_key(row[idx] for idx in key_indexes), False)
+        if stored_hash is False:
+            inserted += 1
+        elif stored_hash == row[hash_index]:
+            skipped += 1
+            continue
+        else:
+            updated += 1
+        changed_rows.append(row)
+    return changed_rows, inserted, updated, skipped
 
 def migrate_table_with_difference(chunk_size,
     mysql_conn, odbc_conn, source_table, destination_table, primary_key, unique_keys,
@@ -427,9 +2226,218 @@ def migrate_table_with_difference(chunk_size,
     except Exception as e:
         logging.error(f"Failed to migrate table `{source_table}` to `{destination_table}`: {e}", exc_info=True)
 
+# Distinct TIME/DATE strings remembered per column by compiled row converters
+CONVERSION_CACHE_SIZE = 4096
+
+def column_exception(exceptions, col_name):
+    """Return the exception settings for a column as a dict, accepting the `"COL": "TIME"` shorthand."""
+    exception = (exceptions or {}).get(col_name)
+    if isinstance(exception, str):
+        return {"type": exception}
+    return exception or {}
+
+def parse_time_string(value, col_name, time_format="%I:%M %p"):
+    """Parse a 12-hour (or 24-hour fallback) time string into MySQL `HH:MM:SS`, or None."""
+    try:
+        # Normalize the input
+        value = value.strip().upper()
+        if not value.endswith("AM") and not value.endswith("PM"):
+            value = value.replace("P", "PM").replace("A", "AM")
+
+        return datetime.strptime(value, time_format).strftime('%H:%M:%S')
+    except ValueError:
+        # Handle valid 24-hour time format
+        try:
+            return datetime.strptime(value.strip(), "%H:%M:%S").strftime('%H:%M:%S')
+        except ValueError:
+            logging.warning(f"Unrecognized TIME value for column {col_name}: {value}")
+            return None
+
+def parse_date_string(value, col_name):
+    """Parse a `YYYY-MM-DD` or `mm/dd/yyyy` date string into a date, or None."""
+    try:
+        # Try parsing as standard MySQL date
+        return datetime.strptime(value.strip(), "%Y-%m-%d").date()
+    except ValueError:
+        try:
+            # Fallback to parsing as mm/dd/yyyy
+            return datetime.strptime(value.strip(), "%m/%d/%Y").date()
+        except ValueError as e:
+            logging.error(f"Unexpected error while processing DATE for column {col_name}: {value} - {str(e)}")
+            return None
+
+def convert_time_value(value, col_name, time_format="%I:%M %p", parse_string=None):
+    """Convert a source value for a TIME exception column into MySQL `HH:MM:SS`."""
+    if value is None or (isinstance(value, str) and not value.strip()):
+        return None
+    if isinstance(value, str):
+        if parse_string:
+            return parse_string(value)
+        return parse_time_string(value, col_name, time_format)
+    if isinstance(value, (datetime, datetime_time)):
+        return value.strftime('%H:%M:%S')
+    logging.warning(f"Unexpected TIME value for column {col_name}: {value} (type: {type(value)})")
+    return None
+
+def convert_date_value(value, col_name, parse_string=None):
+    """Convert a source value for a DATE exception column into a date."""
+    if value is None or (isinstance(value, str) and not value.strip()):
+        return None
+    if isinstance(value, str):
+        if parse_string:
+            return parse_string(value)
+        return parse_date_string(value, col_name)
+    if isinstance(value, datetime):
+        # Convert datetime to MySQL-compatible format
+        return value.date()
+    if isinstance(value, date):
+        return value
+    logging.warning(f"Unexpected DATE value for column {col_name}: {value} (type: {type(value)})")
+    return None
+
+def _strip_if_str(value):
+    return value.strip() if isinstance(value, str) else value
+
+def _compile_column_converter(col_name, exception, trim_trailing_spaces, cache_size):
+    """Build the conversion function for one column, or None if values pass through unchanged."""
+    exception_type = str(exception.get("type", "")).upper()
+
+    if exception_type == "TIME":
+        time_format = exception.get("format", "%I:%M %p")
+        parse_string = lru_cache(maxsize=cache_size)(
+            lambda value: parse_time_string(value, col_name, time_format)
+        )
+        return lambda value: convert_time_value(value, col_name, time_format, parse_string)
+
+    if exception_type == "DATE":
+        parse_string = lru_cache(maxsize=cache_size)(lambda value: parse_date_string(value, col_name))
+        return lambda value: convert_date_value(value, col_name, parse_string)
+
+    if trim_trailing_spaces:
+        return _strip_if_str
+    return None
+
+def compile_row_converter(columns, exceptions, trim_trailing_spaces, cache_size=CONVERSION_CACHE_SIZE):
+    """
+    Compile a row converter for a table once, instead of re-inspecting `exceptions` per row.
+
+    Each TIME/DATE exception column gets a specialised function whose string parses are
+    memoised in a bounded LRU cache; other columns are only touched when
+    `trim_trailing_spaces` is set. The result produces the same values as `process_row`.
+
+    Returns:
+        callable: Function mapping a source row to a tuple of converted values.
+    """
+    column_converters = []
+    for idx, col in enumerate(columns):
+        col_name = col[0]
+        convert_value = _compile_column_converter(
+            col_name, column_exception(exceptions, col_name), trim_trailing_spaces, cache_size
+        )
+        if convert_value:
+            column_converters.append((idx, col_name, convert_value))
+
+    if not column_converters:
+        return tuple
+
+    def convert_row(row):
+        values = list(row)
+        for idx, col_name, convert_value in column_converters:
+            try:
+                values[idx] = convert_value(values[idx])
+            except Exception as e:
+                logging.error(f"Unexpected error while processing column {col_name}: {values[idx]} - {str(e)}")
+                values[idx] = None
+        return tuple(values)
+
+    return convert_row
+
+def convert_chunk(chunk, row_converter):
+    """
+    Convert one fetched chunk, appending a single batch timestamp for `created_at`/`updated_at`.
+
+    Returns:
+        tuple: (converted rows, source rows that failed conversion)
+    """
+    now = datetime.now()
+    converted_chunk = []
+    bad_records = []
+    for row in chunk:
+        try:
+            converted_chunk.append(row_converter(row) + (now, now))
+        except Exception as e:
+            logging.warning(f"Error processing row {row}: {str(e)}")
+            bad_records.append(row)
+    return converted_chunk, bad_records
+
+# Row converter of a conversion worker process, compiled once by its initializer
+_worker_row_converter = None
+
+def _init_conversion_worker(columns, exceptions, trim_trailing_spaces):
+    global _worker_row_converter
+    _worker_row_converter = compile_row_converter(columns, exceptions, trim_trailing_spaces)
+
+def _convert_columns_in_worker(column_values):
+    """Convert a batch sent as one tuple per column and return the converted rows the same way."""
+    started = time.perf_counter()
+    converted_chunk, bad_records = convert_chunk(zip(*column_values), _worker_row_converter)
+    return tuple(zip(*converted_chunk)), bad_records, time.perf_counter() - started
+
+class ProcessConverter:
+    """
+    Converts fetched batches in a pool of worker processes, so conversion is not bound by the GIL.
+
+    Each worker compiles the table's row converter once. Batches travel as one tuple per
+    column, which pickles smaller and faster than a list of row objects. `map` keeps up to
+    two batches per worker in flight and yields the results in source order.
+
+    Workers are spawned rather than forked: the loader runs reader, writer and table
+    threads, and a child forked while one of them holds a lock can deadlock.
+    """
+
+    def __init__(self, columns, exceptions, trim_trailing_spaces, workers):
+        self.workers = workers
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_conversion_worker, initargs=(list(columns), exceptions or {}, trim_trailing_spaces)
+        )
+
+    def map(self, batches):
+        """
+        Convert `batches` in the workers.
+
+        Returns:
+            generator: (source chunk, converted rows, bad records, worker seconds) per batch.
+        """
+        pending = deque()
+        try:
+            for chunk in batches:
+                pending.append((chunk, self._executor.submit(_convert_columns_in_worker, tuple(zip(*chunk)))))
+                if len(pending) >= 2 * self.workers:
+                    yield self._result(*pending.popleft())
+            while pending:
+                yield self._result(*pending.popleft())
+        finally:
+            for _, future in pending:
+                future.cancel()
+            close = getattr(batches, "close", None)
+            if close:
+                close()
+
+    @staticmethod
+    def _result(chunk, future):
+        converted_columns, bad_records, seconds = future.result()
+        return chunk, list(zip(*converted_columns)), bad_records, seconds
+
+    def close(self):
+        self._executor.shutdown(cancel_futures=True)
+
 def process_row(row, columns, exceptions, trim_trailing_spaces):
     """
     Process a single row by applying exceptions, validating and formatting dates/times, and trimming values.
+
+    Loaders use `compile_row_converter`, which produces the same result without
+    re-inspecting `exceptions` for every row.
     """
     processed_row = []
     for idx, col in enumerate(columns):
@@ -438,56 +2446,13 @@ def process_row(row, columns, exceptions, trim_trailing_spaces):
 
         try:
             # Handle exceptions for specific column types
-            if exceptions and col_name in exceptions:
-                exception = exceptions[col_name]
-
-                if exception.get("type") == "TIME":
-                    time_format = exception.get("format", "%I:%M %p")
-                    if value is None or (isinstance(value, str) and not value.strip()):
-                        value = None
-                    elif isinstance(value, str):
-                        try:
-                            # Normalize the input
-                            value = value.strip().upper()
-                            if not value.endswith("AM") and not value.endswith("PM"):
-                                value = value.replace("P", "PM").replace("A", "AM")
-                            
-                            value = datetime.strptime(value, time_format).strftime('%H:%M:%S')
-                        except ValueError:
-                            # Handle valid 24-hour time format
-                            try:
-                                value = datetime.strptime(value.strip(), "%H:%M:%S").strftime('%H:%M:%S')
-                            except ValueError:
-                                logging.warning(f"Unrecognized TIME value for column {col_name}: {value}")
-                                value = None
-                    elif isinstance(value, datetime):
-                        value = value.strftime('%H:%M:%S')
-                    else:
-                        logging.warning(f"Unexpected TIME value for column {col_name}: {value} (type: {type(value)})")
-                        value = None
-
-                # Updated DATE logic
-                if exception.get("type") == "DATE":
-                    try:
-                        if value is None or (isinstance(value, str) and not value.strip()):
-                            value = None
-                        elif isinstance(value, str):
-                            try:
-                                # Try parsing as standard MySQL date
-                                value = datetime.strptime(value.strip(), "%Y-%m-%d").date()
-                            except ValueError:
-                                # Fallback to parsing as mm/dd/yyyy
-                                value = datetime.strptime(value.strip(), "%m/%d/%Y").date()
-                        elif isinstance(value, (datetime, date)):
-                            # Convert datetime or date to MySQL-compatible format
-                            value = value.date()
-                        else:
-                            logging.warning(f"Unexpected DATE value for column {col_name}: {value} (type: {type(value)})")
-                            value = None
-                    except Exception as e:
-                        logging.error(f"Unexpected error while processing DATE for column {col_name}: {value} - {str(e)}")
-                        value = None
+            exception = column_exception(exceptions, col_name)
+            exception_type = str(exception.get("type", "")).upper()
 
+            if exception_type == "TIME":
+                value = convert_time_value(value, col_name, exception.get("format", "%I:%M %p"))
+            elif exception_type == "DATE":
+                value = convert_date_value(value, col_name)
 
             # General trimming for text values
             if trim_trailing_spaces and isinstance(value, str):
@@ -0,0 +1,290 @@
+"""
+One source read fanned out to several destination tables.
+
+Mappings of the same source table can be loaded together by `fan_out_rows`. The source
+is queried once through a single cursor, for the rows any of them needs, and every
+fetched batch is filtered, converted and written for each destination in turn, each with
+its own filters, columns, `exceptions`, keys and load mode.
+"""
+import time
+import logging
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from operator import itemgetter
+from db_operations import (
+    ROW_HASH_COLUMN,
+    batch_stats,
+    column_indexes,
+    compile_row_converter,
+    convert_chunk,
+    ensure_row_hash_column,
+    insert_data_to_mysql,
+    load_data_to_mysql,
+    read_source_batches,
+    row_hash,
+    run_resumable_pipeline,
+    split_changed_rows,
+    upsert_data_to_mysql
+)
+from metrics import TableMetrics, timed_phase
+from retry import is_transient_error
+
+# Values a filter compares by numeric value when their types differ
+NUMERIC_TYPES = (str, int, float, Decimal)
+
+
+def _same_value(value, wanted):
+    """
+    Compare a fetched value with a filter value the way the source's `=` would.
+
+    Trailing spaces of CHAR values are ignored, text is compared with numbers (or floats
+    with decimals) by numeric value and with dates as an ISO date or timestamp.
+    """
+    if isinstance(value, str) and isinstance(wanted, str):
+        return value.rstrip() == wanted.rstrip()
+    if isinstance(value, date) and isinstance(wanted, str):
+        try:
+            wanted = datetime.fromisoformat(wanted.strip())
+        except ValueError:
+            return False
+        if not isinstance(value, datetime):
+            value = datetime.combine(value, datetime.min.time())
+        return value.replace(tzinfo=None) == wanted.replace(tzinfo=None)
+    if isinstance(value, NUMERIC_TYPES) and isinstance(wanted, NUMERIC_TYPES) and type(value) is not type(wanted):
+        try:
+            return Decimal(str(value).strip()) == Decimal(str(wanted).strip())
+        except InvalidOperation:
+            return str(value).rstrip() == str(wanted).rstrip()
+    return value == wanted
+
+
+def _is_newer(value, bound):
+    """`value > bound` for a date bound, whether the value is a date, a datetime or ISO text."""
+    if value is None:
+        return False
+    if isinstance(value, str):
+        return value > bound.isoformat()
+    if isinstance(value, datetime) and not isinstance(bound, datetime):
+        bound = datetime.combine(bound, datetime.min.time())
+    elif isinstance(bound, datetime) and not isinstance(value, datetime) and isinstance(value, date):
+        value = datetime.combine(value, datetime.min.time())
+    return value > bound
+
+
+def compile_row_filter(read_columns, filters=None, newer_than=(), not_null=()):
+    """
+    Build a client-side test for the rows one target of a shared read keeps.
+
+    `filters` has the format of a mapping's `filters` (see
+    `db_operations.source_filter_predicate`), `newer_than` holds (column, date) pairs for
+    `date_column`/`days_back` and `since` windows, and `not_null` the columns that must
+    not be NULL.
+
+    Returns:
+        callable: A function of one row returning True to keep it, or None when every row is kept.
+    """
+    tests = []
+    for column, wanted in (filters or {}).items():
+        if wanted is None:
+            test = lambda value: value is None
+        elif isinstance(wanted, (list, tuple)):
+            test = lambda value, wanted=tuple(wanted): value is not None and any(_same_value(value, w) for w in wanted)
+        else:
+            test = lambda value, wanted=wanted: value is not None and _same_value(value, wanted)
+        tests.append((column, test))
+    for column, bound in newer_than:
+        tests.append((column, lambda value, bound=bound: _is_newer(value, bound)))
+    for column in not_null:
+        tests.append((column, lambda value: value is not None))
+    if not tests:
+        return None
+    indexes = column_indexes(read_columns, [column for column, _ in tests])
+    checks = [(idx, test) for idx, (_, test) in zip(indexes, tests)]
+    return lambda row: all(test(row[idx]) for idx, test in checks)
+
+
+class FanOutTarget:
+    """
+    One destination of a fanned-out read, with its own converter, writer and outcome.
+
+    `columns` are the destination's columns; they are picked out of each source row by
+    name. When the shared read returns rows other targets need, `filters`, `newer_than`
+    and `not_null` pick this target's rows (see `compile_row_filter`). A target whose
+    write raises is marked failed with `error` and gets no further batches, while the
+    other targets carry on. With `fail_fast` a batch that could not be written at all
+    counts as such an error.
+    """
+
+    def __init__(
+        self, destination_table, columns, primary_key, update_columns=None, exceptions=None,
+        trim_trailing_spaces=False, use_row_hash=False, load_mode="executemany",
+        fail_fast=False, metrics=None, quarantine=None, filters=None, newer_than=(), not_null=()
+    ):
+        self.destination_table = destination_table
+        self.columns = columns
+        self.primary_key = primary_key
+        self.update_columns = update_columns or []
+        self.use_row_hash = use_row_hash
+        self.load_mode = load_mode
+        self.fail_fast = fail_fast
+        self.metrics = metrics
+        self.quarantine = quarantine
+        self.filters = filters
+        self.newer_than = newer_than
+        self.not_null = not_null
+        self.row_converter = compile_row_converter(columns, exceptions, trim_trailing_spaces)
+        self.final_columns = columns + [("created_at", "DATETIME"), ("updated_at", "DATETIME")]
+        self.write_update_columns = self.update_columns
+        if use_row_hash:
+            self.final_columns = self.final_columns + [(ROW_HASH_COLUMN, "CHAR")]
+            self.write_update_columns = self.update_columns + [ROW_HASH_COLUMN]
+            self.hash_indexes = column_indexes(columns, self.update_columns)
+            self.pk_indexes = column_indexes(columns, primary_key)
+        self.project = None
+        self.keep = None
+        self.rows_written = 0
+        self.counts = {"inserted": 0, "updated": 0, "skipped": 0}
+        self.error = None
+
+    @property
+    def idempotent(self):
+        """Whether writing the same rows again is harmless, so a read can be replayed from the start."""
+        return bool(self.update_columns or self.primary_key)
+
+    def bind(self, read_columns):
+        """Locate this target's columns and filters among the columns the shared read returns."""
+        self.keep = compile_row_filter(read_columns, self.filters, self.newer_than, self.not_null)
+        indexes = column_indexes(read_columns, [col[0] for col in self.columns])
+        if indexes == list(range(len(read_columns))):
+            self.project = None
+        elif len(indexes) == 1:
+            self.project = lambda row, idx=indexes[0]: (row[idx],)
+        else:
+            self.project = itemgetter(*indexes)
+
+    def convert(self, chunk):
+        """
+        Convert one fetched chunk for this destination.
+
+        Returns:
+            tuple: (converted rows, batch statistics for `TableMetrics.record_batch`)
+        """
+        started = time.perf_counter()
+        if self.keep is not None:
+            chunk = [row for row in chunk if self.keep(row)]
+        rows = [self.project(row) for row in chunk] if self.project else chunk
+        converted_chunk, bad_records = convert_chunk(rows, self.row_converter)
+        if bad_records:
+            logging.warning(f"{len(bad_records)} rows for `{self.destination_table}` failed conversion.")
+        if self.use_row_hash:
+            converted_chunk = [row + (row_hash([row[idx] for idx in self.hash_indexes]),) for row in converted_chunk]
+        return converted_chunk, batch_stats(self.metrics, chunk, converted_chunk, bad_records, started)
+
+    def write(self, mysql_conn, converted_chunk, stats, batch_number, source_table):
+        """Write one converted batch; non-transient errors mark the target failed instead of raising."""
+        started = time.perf_counter()
+        batch_info = {"source": source_table, "batch": batch_number}
+        try:
+            if self.use_row_hash:
+                with timed_phase(self.metrics, "hash_lookup"):
+                    converted_chunk, inserted, updated, skipped = split_changed_rows(
+                        mysql_conn, self.destination_table, self.primary_key, self.pk_indexes,
+                        len(self.final_columns) - 1, converted_chunk
+                    )
+            if self.load_mode == "load_data":
+                written = load_data_to_mysql(
+                    mysql_conn, self.destination_table, self.final_columns, converted_chunk, self.primary_key,
+                    update_columns=self.write_update_columns or None, metrics=self.metrics,
+                    quarantine=self.quarantine, batch_info=batch_info
+                )
+            elif self.update_columns:
+                written = upsert_data_to_mysql(
+                    mysql_conn, self.destination_table, self.final_columns, converted_chunk, self.write_update_columns,
+                    metrics=self.metrics, quarantine=self.quarantine, batch_info=batch_info
+                )
+            else:
+                written = insert_data_to_mysql(
+                    mysql_conn, self.destination_table, self.final_columns, converted_chunk, self.primary_key,
+                    batch_size=len(converted_chunk), metrics=self.metrics, quarantine=self.quarantine,
+                    batch_info=batch_info
+                )
+            if self.fail_fast and converted_chunk and not written:
+                raise RuntimeError(f"Batch {batch_number} could not be written to `{self.destination_table}`.")
+        except Exception as e:
+            if is_transient_error(e):
+                raise
+            logging.error(f"Stopped writing to `{self.destination_table}`: {str(e)}", exc_info=True)
+            self.error = str(e)
+            return
+        self.rows_written += written
+        if self.use_row_hash and (written or not converted_chunk):
+            self.counts["inserted"] += inserted
+            self.counts["updated"] += updated
+            self.counts["skipped"] += skipped
+        if self.metrics:
+            self.metrics.record_batch(written, write_seconds=time.perf_counter() - started, **stats)
+
+
+def fan_out_rows(
+    odbc_conn, mysql_conn, source_table, read_columns, targets, chunk_size,
+    predicates=(), params=(), order_by=(), select=None, queue_depth=0, retry=None
+):
+    """
+    Read a source table once and write every batch to each of `targets` (`FanOutTarget`s).
+
+    `read_columns` is the column metadata of the rows the query returns: the source
+    table's columns, or those in `select` when only some are read. Batches go through
+    `run_pipeline`, so with `queue_depth` > 0 reading overlaps with converting and
+    writing; all targets are written over `mysql_conn`, one after another. Each batch is
+    committed per target.
+
+    With a `retry` policy transient errors reconnect and read the source again from the
+    start (see `run_resumable_pipeline`), when every target's writes are idempotent. The
+    time spent querying and fetching is added to every target's metrics. Errors reading
+    the source are raised; write errors are recorded on their target.
+    """
+    for target in targets:
+        target.bind(read_columns)
+        if target.use_row_hash:
+            ensure_row_hash_column(mysql_conn, target.destination_table)
+    read_metrics = TableMetrics(source_table, None)
+    batch_number = 1
+
+    def convert(chunk):
+        return chunk, [target.convert(chunk) if target.error is None else None for target in targets]
+
+    def write(batch):
+        nonlocal batch_number
+        chunk, converted = batch
+        for target, converted_batch in zip(targets, converted):
+            if converted_batch is not None and target.error is None:
+                target.write(mysql_conn, converted_batch[0], converted_batch[1], batch_number, source_table)
+        if all(target.error is not None for target in targets):
+            raise RuntimeError(f"Every destination of `{source_table}` failed.")
+        batch_number += 1
+
+    def read(conn):
+        # Batches already written are written again, which idempotent targets absorb
+        for target in targets:
+            target.rows_written = 0
+            target.counts = dict.fromkeys(target.counts, 0)
+        return read_source_batches(
+            conn, source_table, chunk_size, predicates, params, order_by, metrics=read_metrics, select=select
+        )
+
+    logging.info(
+        f"Reading `{source_table}` once for {len(targets)} destinations: "
+        f"{', '.join(target.destination_table for target in targets)}."
+    )
+    try:
+        run_resumable_pipeline(
+            read, convert, write, odbc_conn, mysql_conn, queue_depth, retry,
+            resumable=all(target.idempotent for target in targets),
+            description=f"fan-out read of `{source_table}`"
+        )
+    finally:
+        phases = read_metrics.to_dict()["phases"]
+        for target in targets:
+            if target.metrics is not None:
+                for name, phase in phases.items():
+                    target.metrics.add_phase(name, phase["seconds"], phase["calls"])
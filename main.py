@@ -1,18 +1,69 @@
 import time
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 start_time = time.time()
 import os
 import logging
 import json
+import argparse
+import signal
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 from dotenv import load_dotenv
 from db_operations import (
     connect_odbc,
     connect_mysql,
     fetch_odbc_metadata,
+    apply_column_exceptions,
+    fetch_mysql_table_layouts,
     create_mysql_table_from_odbc_metadata,
+    drop_mysql_table_if_exists,
+    does_table_exist,
+    swap_staging_table,
     fetch_and_insert_rows,
     fetch_and_update_rows,
-    close_connections
+    build_insert_query,
+    build_upsert_query,
+    write_rows_bisecting,
+    ROW_HASH_COLUMN,
+    close_connections,
+    partition_ranges,
+    source_filter_predicate,
+    since_predicate,
+    probe_source_table,
+    is_connection_usable,
+    ConnectionPool
+)
+from schema_cache import MetadataCache, fetch_odbc_catalog
+from quarantine import (
+    create_quarantine,
+    load_quarantined_rows,
+    read_quarantine_file,
+    record_row,
+    mark_replayed,
+    update_quarantine_errors
+)
+from sync_state import mapping_key, ensure_sync_state_table, load_sync_state, save_sync_state, encode_state
+from metrics import TableMetrics, timed_phase, build_run_report, write_json_report, write_prometheus_textfile
+from retry import RetryPolicy
+from reconcile import reconcile_table, DEFAULT_DELETE_BATCH
+from run_history import RunHistory, DEFAULT_DEVIATION_FACTOR
+from verify import TableVerifier, DEFAULT_RANGES, DEFAULT_LEAF_ROWS
+from snapshot import (
+    export_snapshot,
+    load_snapshot,
+    read_manifest,
+    snapshot_path,
+    DEFAULT_COMPRESSION,
+    DEFAULT_ROWS_PER_FILE
+)
+from fanout import FanOutTarget, fan_out_rows
+from daemon import (
+    ConfigWatcher,
+    IntervalScheduler,
+    StatusBoard,
+    serve_status,
+    DEFAULT_INTERVAL,
+    DEFAULT_POLL_SECONDS
 )
 
 # Load environment variables
@@ -27,128 +78,1502 @@ db_name = os.getenv("DB_NAME", "tracker")
 log_file_path = os.getenv("LOG_FILE_PATH", "script_log.log")
 log_level = os.getenv("LOG_LEVEL", "INFO").upper()
 BATCH_SIZE = int(os.getenv("BATCH_SIZE", 5000))
+# Rows per source query of a checkpointed load; 0 reads the table through one cursor
+CHECKPOINT_PAGE_SIZE = int(os.getenv("CHECKPOINT_PAGE_SIZE", BATCH_SIZE * 20))
+PIPELINE_DEPTH = int(os.getenv("PIPELINE_DEPTH", 0))
+BATCH_BYTES = int(os.getenv("BATCH_BYTES", 0))
+CONVERSION_WORKERS = int(os.getenv("CONVERSION_WORKERS", 0))
+MYSQL_WRITERS = int(os.getenv("MYSQL_WRITERS", 1))
+MAX_PARALLEL_TABLES = max(1, int(os.getenv("MAX_PARALLEL_TABLES", 1)))
+REPORT_JSON_PATH = os.getenv("REPORT_JSON_PATH", "")
+PROMETHEUS_TEXTFILE_PATH = os.getenv("PROMETHEUS_TEXTFILE_PATH", "")
+SCHEMA_CACHE_PATH = os.getenv("SCHEMA_CACHE_PATH", "schema_cache.json")
+QUARANTINE = os.getenv("QUARANTINE", "off")
+QUARANTINE_DIR = os.getenv("QUARANTINE_DIR", ".")
+RUN_HISTORY_PATH = os.getenv("RUN_HISTORY_PATH", "run_history.json")
+RUN_HISTORY_DEVIATION = float(os.getenv("RUN_HISTORY_DEVIATION", DEFAULT_DEVIATION_FACTOR))
+RETRY_ATTEMPTS = int(os.getenv("RETRY_ATTEMPTS", 5))
+RETRY_BASE_DELAY = float(os.getenv("RETRY_BASE_DELAY", 1))
+RETRY_MAX_DELAY = float(os.getenv("RETRY_MAX_DELAY", 60))
+SNAPSHOT_DIR = os.getenv("SNAPSHOT_DIR", "snapshots")
+SNAPSHOT_COMPRESSION = os.getenv("SNAPSHOT_COMPRESSION", DEFAULT_COMPRESSION)
+SNAPSHOT_FILE_ROWS = int(os.getenv("SNAPSHOT_FILE_ROWS", DEFAULT_ROWS_PER_FILE))
+DAEMON_INTERVAL = float(os.getenv("DAEMON_INTERVAL", DEFAULT_INTERVAL))
+DAEMON_POLL_SECONDS = float(os.getenv("DAEMON_POLL_SECONDS", DEFAULT_POLL_SECONDS))
+DAEMON_STATUS_PATH = os.getenv("DAEMON_STATUS_PATH", "daemon_status.json")
+DAEMON_STATUS_HOST = os.getenv("DAEMON_STATUS_HOST", "127.0.0.1")
+DAEMON_STATUS_PORT = int(os.getenv("DAEMON_STATUS_PORT", 0))
+DAEMON_STALE_SECONDS = float(os.getenv("DAEMON_STALE_SECONDS", 300))
+# Identifies this run in quarantine records and file names
+RUN_ID = datetime.now().strftime("%Y%m%d%H%M%S")
 
-# Set up logging
+# Set up logging; in parallel mode each line is tagged with the table its worker is migrating
+log_format = '%(asctime)s - %(levelname)s - %(message)s'
+if MAX_PARALLEL_TABLES > 1:
+    log_format = '%(asctime)s - %(levelname)s - [%(threadName)s] %(message)s'
 logging.basicConfig(
     filename=log_file_path,
     level=getattr(logging, log_level, logging.INFO),
-    format='%(asctime)s - %(levelname)s - %(message)s',
+    format=log_format,
     datefmt='%Y-%m-%d %H:%M:%S',
     filemode='a'
 )
-logging.getLogger().addHandler(logging.StreamHandler())  # Enable console logging
-
-logging.info("Script started")
-
-# Initialize connections to None
-odbc_conn = None
-mysql_conn = None
-
-# Load table mappings from external JSON file
-try:
-    with open('table_mappings.json', 'r') as f:
-        table_mappings = json.load(f)["table_mappings"]
-except FileNotFoundError as e:
-    logging.error(f"FileNotFoundError: {e}")
-    table_mappings = []
-except json.JSONDecodeError as e:
-    logging.error(f"JSONDecodeError: Failed to parse 'table_mappings.json' - {e}")
-    table_mappings = []
-except Exception as e:
-    logging.error(f"An unexpected error occurred: {e}")
-    table_mappings = []
-
-# Connect to ODBC and MySQL
-try:
-    odbc_conn = connect_odbc(odbc_dsn)
-    mysql_conn = connect_mysql(db_host, db_user, db_password, db_name)
+console_handler = logging.StreamHandler()  # Enable console logging
+console_handler.setFormatter(logging.Formatter(log_format, datefmt='%Y-%m-%d %H:%M:%S'))
+logging.getLogger().addHandler(console_handler)
 
-    if not table_mappings:
-        logging.error("No valid table mappings found. Exiting the script.")
-        exit(1)
 
-    # Iterate over each table mapping dynamically
-    for mapping in table_mappings:
-        if not mapping.get("active", True):
-            logging.info(f"Skipping inactive table mapping for source: {mapping.get('source')} -> destination: {mapping.get('destination')}")
-            continue
+# Enabled in main() when any active mapping uses `load_mode: "load_data"`
+allow_local_infile = False
+# Source column metadata cache, opened in main() unless SCHEMA_CACHE_PATH is empty
+metadata_cache = None
+# Existing destination tables and their columns, loaded once in main() (see `load_destination_layouts`)
+destination_layouts = {}
+# Sink for rows MySQL rejects, created in main() from QUARANTINE (see `quarantine.create_quarantine`)
+quarantine = None
+# Backoff for transient connection failures and deadlocks; RETRY_ATTEMPTS=0 disables retrying
+retry_policy = RetryPolicy(
+    RETRY_ATTEMPTS, RETRY_BASE_DELAY, RETRY_MAX_DELAY, odbc_factory=lambda: connect_odbc(odbc_dsn)
+)
 
-        source_table = mapping.get("source")
-        destination_table = mapping.get("destination")
-        primary_key = mapping.get("primary_key", [])
-        unique_keys = mapping.get("unique_keys", [])
-        update_columns = mapping.get("update_columns", [])
-        sort_column = mapping.get("sort_column", None)
-        exceptions = mapping.get("exceptions", {})
-        trim_trailing_spaces = mapping.get("trim_trailing_spaces", False)
-        insert_columns = mapping.get("insert_columns", None)
-        since = mapping.get("since", None)
-
-        logging.info(f"Processing migration for source: {source_table} -> destination: {destination_table}")
-
-        # Fetch ODBC metadata
-        columns_metadata = fetch_odbc_metadata(odbc_conn, source_table, exceptions)
-
-        # Check if table exists; create if missing
-        cursor = mysql_conn.cursor()
-        cursor.execute(f"SHOW TABLES LIKE '{destination_table}'")
-        result = cursor.fetchone()
-
-        if not result:
-            logging.info(f"MySQL table `{destination_table}` does not exist. Creating table.")
-            create_mysql_table_from_odbc_metadata(
-                mysql_conn,
-                destination_table,
-                columns_metadata,
-                primary_key,
-                unique_keys,
-                exceptions
-            )
 
-        # Determine operation: update or fresh insert
+def open_mysql_connection():
+    """Open a MySQL connection with the configured credentials, retrying transient failures."""
+    return retry_policy.call(
+        connect_mysql, db_host, db_user, db_password, db_name,
+        allow_local_infile=allow_local_infile, description="MySQL connect"
+    )
+
+
+def open_odbc_connection():
+    """Open an ODBC connection to the configured DSN, retrying transient failures."""
+    return retry_policy.call(connect_odbc, odbc_dsn, description="ODBC connect")
+
+
+def live_odbc_connection(odbc_conn):
+    """
+    Return `odbc_conn` while the source still answers on it, otherwise a new connection.
+
+    A load replaces a broken ODBC connection only for its own replay, so callers that
+    keep one connection across tables check it before each of them.
+    """
+    if is_connection_usable(odbc_conn):
+        return odbc_conn
+    logging.warning("The ODBC connection was lost; opening a new one.")
+    close_connections(odbc_conn)
+    return open_odbc_connection()
+
+
+def live_mysql_connection(mysql_conn):
+    """Reconnect `mysql_conn` in place if the server dropped it; returns it."""
+    if not is_connection_usable(mysql_conn):
+        logging.warning("The MySQL connection was lost; reconnecting.")
+        retry_policy.reconnect_mysql(mysql_conn)
+    return mysql_conn
+
+
+def load_destination_layouts(mysql_conn, mappings):
+    """Load existence and columns of every mapping's destination table with a single query."""
+    global destination_layouts
+    table_names = sorted({mapping.get("destination") for mapping in mappings if mapping.get("destination")})
+    try:
+        destination_layouts = fetch_mysql_table_layouts(mysql_conn, table_names)
+    except Exception as e:
+        logging.error(f"Could not load destination table layouts: {str(e)}", exc_info=True)
+        destination_layouts = {}
+    logging.info(f"{len(destination_layouts)} of {len(table_names)} destination tables already exist.")
+
+
+def warn_on_missing_columns(destination_table, columns_metadata):
+    """Warn when source columns are missing from an existing destination table."""
+    existing = {name.upper() for name, _ in destination_layouts.get(destination_table.lower(), [])}
+    missing = [col[0] for col in columns_metadata if col[0].upper() not in existing]
+    if missing:
+        logging.warning(f"Destination table `{destination_table}` has no column(s) for source columns: {missing}")
+
+
+def source_catalog(mapping, odbc_conn):
+    """Catalog column types for a mapping's source table, unless the mapping opts out with `catalog_types: false`."""
+    if not mapping.get("catalog_types", True):
+        return None
+    catalog = fetch_odbc_catalog(odbc_conn, mapping.get("source"))
+    if not catalog:
+        logging.info(f"No catalog column types reported for `{mapping.get('source')}`; mapping types from the query metadata.")
+    return catalog
+
+
+def is_projected(mapping):
+    """
+    Whether a mapping reads only the columns it copies (see `project_columns`).
+
+    Mappings listing `insert_columns` are always projected, upserts (other than swap
+    reloads) unless they set `projection: false`, and other mappings with `projection: true`.
+    """
+    if mapping.get("insert_columns"):
+        return True
+    upsert = bool(mapping.get("update_columns")) and mapping.get("strategy") != "swap"
+    return bool(mapping.get("projection", upsert))
+
+
+def project_columns(mapping, columns_metadata):
+    """
+    Narrow the source columns to those a projected mapping copies (see `is_projected`).
+
+    A projected mapping reads its `primary_key`, `unique_keys`, `update_columns`,
+    `insert_columns` and `sort_column`, in source table order; other mappings read every
+    column.
+
+    Returns:
+        list: The column metadata to read, convert and write.
+    """
+    if not is_projected(mapping):
+        return columns_metadata
+    wanted = [
+        *mapping.get("primary_key", []), *mapping.get("unique_keys", []),
+        *mapping.get("update_columns", []), *(mapping.get("insert_columns") or [])
+    ]
+    if mapping.get("sort_column"):
+        wanted.append(mapping["sort_column"])
+    wanted = {name.strip().upper() for name in wanted}
+    if not wanted:
+        return columns_metadata
+    missing = wanted - {col[0].strip().upper() for col in columns_metadata}
+    if missing:
+        raise ValueError(f"Columns {sorted(missing)} of `{mapping.get('source')}` are not in the source table.")
+    projected = [col for col in columns_metadata if col[0].strip().upper() in wanted]
+    logging.info(f"Reading {len(projected)} of {len(columns_metadata)} columns of `{mapping.get('source')}`.")
+    return projected
+
+
+def source_select(mapping, columns_metadata):
+    """Explicit SELECT list for a projected mapping, or None to read `SELECT *`."""
+    if is_projected(mapping):
+        return [col[0] for col in columns_metadata]
+    return None
+
+
+def mapping_source_filter(mapping, window=True):
+    """
+    The mapping's `filters` and, with `window`, its `date_column`/`days_back` window as a source predicate.
+
+    Returns:
+        tuple: (predicate or None, params), see `db_operations.source_filter_predicate`.
+    """
+    if not window:
+        return source_filter_predicate(mapping.get("filters"))
+    return source_filter_predicate(mapping.get("filters"), mapping.get("date_column"), mapping.get("days_back"))
+
+
+def load_table_mappings(path='table_mappings.json'):
+    """Load table mappings from the external JSON file, returning an empty list on failure."""
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)["table_mappings"]
+    except FileNotFoundError as e:
+        logging.error(f"FileNotFoundError: {e}")
+    except json.JSONDecodeError as e:
+        logging.error(f"JSONDecodeError: Failed to parse '{path}' - {e}")
+    except Exception as e:
+        logging.error(f"An unexpected error occurred: {e}")
+    return []
+
+
+def load_rows(mapping, columns_metadata, odbc_conn, mysql_conn, range_filter=None, counters=None, metrics=None):
+    """
+    Copy rows for one mapping, or one range of it, using the update or insert loader.
+
+    Inserted/updated/skipped counts from `row_hash` change detection are added to `counters`,
+    phase timings and batch records to `metrics`.
+
+    Returns:
+        int: The number of rows committed to MySQL.
+    """
+    update_columns = mapping.get("update_columns", [])
+    pipeline_depth = int(mapping.get("pipeline_depth", PIPELINE_DEPTH))
+    load_mode = mapping.get("load_mode", "executemany")
+    checkpoint = mapping.get("checkpoint", False)
+    # Checkpointed loads page through the table unless the mapping sets `page_size` to 0 or null
+    page_size = mapping.get("page_size", CHECKPOINT_PAGE_SIZE if checkpoint else None)
+    page_size = int(page_size) if page_size else None
+    page_syntax = mapping.get("page_syntax", "top")
+    swap = mapping.get("strategy") == "swap"
+    # A partial load must not be recorded as up to date by the change probe
+    fail_fast = swap or bool(mapping.get("change_probe"))
+    batch_bytes = int(mapping.get("batch_bytes", BATCH_BYTES)) or None
+    conversion_workers = int(mapping.get("conversion_workers", CONVERSION_WORKERS))
+
+    commit_interval = int(mapping.get("commit_interval", 10)) if swap else 1
+    writers = int(mapping.get("writers", MYSQL_WRITERS))
+    writer_commit_interval = int(mapping.get("writer_commit_interval", commit_interval))
+    source_filter = mapping_source_filter(mapping)
+    select_columns = source_select(mapping, columns_metadata)
+
+    # Parallel writers get MySQL connections of their own, open for this load only
+    writer_connections = []
+    try:
+        if writers > 1:
+            writer_connections = [open_mysql_connection() for _ in range(writers)]
         if update_columns:
-            logging.info(f"Table `{destination_table}` will be updated with columns: {update_columns}.")
-            fetch_and_update_rows(
+            return fetch_and_update_rows(
                 odbc_conn=odbc_conn,
                 mysql_conn=mysql_conn,
-                source_table=source_table,
-                destination_table=destination_table,
+                source_table=mapping.get("source"),
+                destination_table=mapping.get("destination"),
                 columns=columns_metadata,
-                primary_key=primary_key,
-                unique_keys=unique_keys,
-                sort_column=sort_column,
+                primary_key=mapping.get("primary_key", []),
+                unique_keys=mapping.get("unique_keys", []),
+                sort_column=mapping.get("sort_column", None),
                 update_columns=update_columns,
                 chunk_size=BATCH_SIZE,
-                exceptions=exceptions,
-                trim_trailing_spaces=trim_trailing_spaces, 
-                since=since  
+                exceptions=mapping.get("exceptions", {}),
+                trim_trailing_spaces=mapping.get("trim_trailing_spaces", False),
+                since=mapping.get("since", None),
+                queue_depth=pipeline_depth,
+                range_filter=range_filter,
+                load_mode=load_mode,
+                checkpoint=checkpoint,
+                page_size=page_size,
+                page_syntax=page_syntax,
+                use_row_hash=mapping.get("row_hash", False),
+                counters=counters,
+                batch_bytes=batch_bytes,
+                metrics=metrics,
+                quarantine=quarantine,
+                retry=retry_policy,
+                conversion_workers=conversion_workers,
+                writer_connections=writer_connections,
+                writer_commit_interval=writer_commit_interval,
+                source_filter=source_filter,
+                select_columns=select_columns,
+                fail_fast=fail_fast
             )
+        return fetch_and_insert_rows(
+            chunk_size=BATCH_SIZE,
+            odbc_conn=odbc_conn,
+            mysql_conn=mysql_conn,
+            source_table=mapping.get("source"),
+            destination_table=mapping.get("destination"),
+            columns=columns_metadata,
+            primary_key=mapping.get("primary_key", []),
+            unique_keys=mapping.get("unique_keys", []),
+            sort_column=mapping.get("sort_column", None),
+            exceptions=mapping.get("exceptions", {}),
+            since=mapping.get("since", None),
+            trim_trailing_spaces=mapping.get("trim_trailing_spaces", False),
+            insert_columns=mapping.get("insert_columns", None),
+            queue_depth=pipeline_depth,
+            range_filter=range_filter,
+            load_mode=load_mode,
+            checkpoint=checkpoint,
+            page_size=page_size,
+            page_syntax=page_syntax,
+            bulk_load=swap,
+            commit_interval=commit_interval,
+            fail_fast=fail_fast,
+            batch_bytes=batch_bytes,
+            metrics=metrics,
+            quarantine=quarantine,
+            retry=retry_policy,
+            conversion_workers=conversion_workers,
+            writer_connections=writer_connections,
+            writer_commit_interval=writer_commit_interval,
+            source_filter=source_filter,
+            select_columns=select_columns
+        )
+    finally:
+        close_connections(*writer_connections)
+
+
+def load_mapping(mapping, columns_metadata, odbc_conn, mysql_conn, counters=None, metrics=None):
+    """
+    Load a mapping's rows into its destination, split into concurrent ranges if configured.
+
+    Returns:
+        int: The number of rows committed to MySQL.
+    """
+    if int(mapping.get("partitions", 1)) > 1 and mapping.get("checkpoint", False):
+        logging.warning(f"`{mapping.get('source')}` uses checkpoint; ignoring partitions so a single watermark is kept.")
+    elif int(mapping.get("partitions", 1)) > 1:
+        return migrate_partitions(mapping, columns_metadata, odbc_conn, mysql_conn, counters, metrics)
+    return load_rows(mapping, columns_metadata, odbc_conn, mysql_conn, counters=counters, metrics=metrics)
+
+
+def migrate_with_swap(mapping, columns_metadata, odbc_conn, mysql_conn, metrics=None):
+    """
+    Reload a table into `<destination>_staging` and swap it in with one atomic RENAME.
+
+    The staging table is created with only its primary key, bulk-loaded with unique and
+    foreign key checks off and large commit intervals, then gets its unique keys in a
+    single ALTER before the swap. Any failed batch aborts the load and leaves the live
+    table untouched.
+
+    Returns:
+        int: The number of rows loaded.
+    """
+    destination_table = mapping.get("destination")
+    staging_table = f"{destination_table}_staging"
+    unique_keys = mapping.get("unique_keys", [])
+
+    drop_mysql_table_if_exists(mysql_conn, staging_table)
+    create_mysql_table_from_odbc_metadata(
+        mysql_conn,
+        staging_table,
+        columns_metadata,
+        mapping.get("primary_key", []),
+        unique_keys,
+        mapping.get("exceptions", {}),
+        include_unique_keys=False,
+        catalog=source_catalog(mapping, odbc_conn)
+    )
+
+    # A swap is always a full reload through the insert loader
+    staging_mapping = dict(mapping, destination=staging_table, update_columns=[], checkpoint=False)
+    rows = load_mapping(staging_mapping, columns_metadata, odbc_conn, mysql_conn, metrics=metrics)
+
+    with timed_phase(metrics, "swap"):
+        swap_staging_table(mysql_conn, staging_table, destination_table, unique_keys)
+    return rows
+
+
+def migrate_partitions(mapping, columns_metadata, odbc_conn, mysql_conn, counters=None, metrics=None):
+    """
+    Load one table as concurrent key ranges, each over its own ODBC and MySQL connection.
+
+    The table is split on `partition_column` (default: the first primary key column,
+    then `sort_column`) into `partitions` ranges, and progress is logged per range.
+
+    Returns:
+        int: The number of rows committed to MySQL across all ranges.
+    """
+    source_table = mapping.get("source")
+    destination_table = mapping.get("destination")
+    primary_key = mapping.get("primary_key", [])
+    partitions = int(mapping.get("partitions", 1))
+    partition_column = mapping.get("partition_column") or (primary_key[0] if primary_key else mapping.get("sort_column"))
+
+    if not partition_column:
+        logging.warning(f"`{source_table}` has no primary_key, sort_column or partition_column to split on; loading it as one range.")
+        return load_rows(mapping, columns_metadata, odbc_conn, mysql_conn, counters=counters, metrics=metrics)
+
+    ranges = partition_ranges(odbc_conn, source_table, partition_column, partitions)
+    odbc_pool = ConnectionPool(open_odbc_connection, len(ranges))
+    mysql_pool = ConnectionPool(open_mysql_connection, len(ranges))
+    progress_lock = threading.Lock()
+    progress = {"ranges": 0, "rows": 0}
+
+    def load_range(index, range_filter):
+        threading.current_thread().name = f"{destination_table}#{index + 1}"
+        range_start_time = time.time()
+        range_counters = {}
+        with odbc_pool.connection() as range_odbc_conn, mysql_pool.connection() as range_mysql_conn:
+            rows = load_rows(mapping, columns_metadata, range_odbc_conn, range_mysql_conn, range_filter, range_counters, metrics)
+        with progress_lock:
+            if counters is not None:
+                for name, count in range_counters.items():
+                    counters[name] = counters.get(name, 0) + count
+            progress["ranges"] += 1
+            progress["rows"] += rows
+            logging.info(
+                f"Range {index + 1}/{len(ranges)} of `{destination_table}` ({range_filter[0] or 'all rows'}) finished: "
+                f"{rows} rows in {str(timedelta(seconds=round(time.time() - range_start_time)))} "
+                f"[{progress['ranges']}/{len(ranges)} ranges, {progress['rows']} rows so far]"
+            )
+        return rows
+
+    try:
+        with ThreadPoolExecutor(max_workers=len(ranges), thread_name_prefix=destination_table) as executor:
+            return sum(executor.map(load_range, range(len(ranges)), ranges))
+    finally:
+        odbc_pool.close_all()
+        mysql_pool.close_all()
+
+
+def reconcile_mapping(mapping, columns_metadata, odbc_conn, mysql_conn, dry_run=False):
+    """
+    Delete destination rows whose primary key no longer exists in the source (see `reconcile.reconcile_table`).
+
+    The destination keys are streamed over a MySQL connection of their own.
+
+    Returns:
+        dict: Reconciliation counts.
+    """
+    key_conn = open_mysql_connection()
+    try:
+        return reconcile_table(
+            odbc_conn,
+            mysql_conn,
+            key_conn,
+            mapping.get("source"),
+            mapping.get("destination"),
+            columns_metadata,
+            mapping.get("primary_key", []),
+            exceptions=mapping.get("exceptions", {}),
+            trim_trailing_spaces=mapping.get("trim_trailing_spaces", False),
+            dry_run=dry_run,
+            delete_batch=int(mapping.get("reconcile_batch", DEFAULT_DELETE_BATCH)),
+            source_filter=mapping_source_filter(mapping, window=False)
+        )
+    finally:
+        close_connections(key_conn)
+
+
+def run_change_probe(mapping, odbc_conn, mysql_conn):
+    """
+    Probe a mapping's source table and compare the result with the last successful run.
+
+    `change_probe: true` probes `COUNT(*)` and `MAX(sort_column)` under the mapping's
+    filters; a string is run as the probe query instead.
+
+    Returns:
+        tuple: (probe values, True if they equal the stored ones)
+    """
+    change_probe = mapping.get("change_probe")
+    probe = probe_source_table(
+        odbc_conn,
+        mapping.get("source"),
+        sort_column=mapping.get("sort_column", None),
+        source_filter=mapping_source_filter(mapping),
+        query=change_probe if isinstance(change_probe, str) else None
+    )
+    ensure_sync_state_table(mysql_conn)
+    stored = load_sync_state(mysql_conn, mapping_key(mapping.get("source"), mapping.get("destination")), "probe")
+    unchanged = stored is not None and encode_state(stored) == encode_state(probe)
+    logging.info(
+        f"Change probe of `{mapping.get('source')}`: {probe} "
+        f"({'unchanged since the last run' if unchanged else f'last run: {stored}'})."
+    )
+    return probe, unchanged
+
+
+def save_change_probe(mapping, mysql_conn, probe):
+    """Store the probe taken before a successful load; the next run compares against it."""
+    cursor = mysql_conn.cursor()
+    try:
+        save_sync_state(cursor, mapping_key(mapping.get("source"), mapping.get("destination")), "probe", probe)
+        mysql_conn.commit()
+    finally:
+        cursor.close()
+
+
+def new_summary(mapping):
+    """Empty run summary of a table mapping, filled in by `migrate_mapping` or `migrate_group`."""
+    return {
+        "source": mapping.get("source"),
+        "destination": mapping.get("destination"),
+        "rows": 0,
+        "duration": 0.0,
+        "status": "ok",
+        "error": None,
+        "counters": {},
+        "probe": None,
+        "metrics": TableMetrics(mapping.get("source"), mapping.get("destination"))
+    }
+
+
+def prepare_mapping(mapping, summary, odbc_conn, mysql_conn, source_columns=None):
+    """
+    Run a mapping's change probe, fetch its column metadata and create its destination table if missing.
+
+    `source_columns`, the source table's columns as already fetched for a group of
+    mappings, saves fetching them again. A mapping with `row_hash` but no `update_columns`
+    or `primary_key` is rejected here, before anything is read or written for it.
+
+    Returns:
+        list: The column metadata to load, or None when the change probe found the source unchanged.
+    """
+    source_table = mapping.get("source")
+    destination_table = mapping.get("destination")
+    exceptions = mapping.get("exceptions", {})
+    update_columns = mapping.get("update_columns", [])
+    metrics = summary["metrics"]
+
+    if mapping.get("row_hash", False) and not (update_columns and mapping.get("primary_key")):
+        raise ValueError(f"row_hash on `{destination_table}` requires update_columns and a primary_key.")
+
+    # A table whose change probe did not move since the last successful run is skipped
+    if mapping.get("change_probe"):
+        with metrics.phase("probe"):
+            summary["probe"], unchanged = run_change_probe(mapping, odbc_conn, mysql_conn)
+        if unchanged:
+            logging.info(f"Skipping `{source_table}` -> `{destination_table}`: the source has not changed.")
+            summary["status"] = "skipped"
+            return None
+
+    # Fetch ODBC metadata
+    with metrics.phase("metadata"):
+        if source_columns is not None:
+            columns_metadata = apply_column_exceptions(source_columns, exceptions)
         else:
-            logging.info(f"Table `{destination_table}` will be freshly inserted.")
-            fetch_and_insert_rows(
-                chunk_size=BATCH_SIZE,
-                odbc_conn=odbc_conn,
-                mysql_conn=mysql_conn,
-                source_table=source_table,
-                destination_table=destination_table,
-                columns=columns_metadata,
-                primary_key=primary_key,
-                unique_keys=unique_keys,
-                sort_column=sort_column,
-                exceptions=exceptions,
-                since=since,
-                trim_trailing_spaces=trim_trailing_spaces,
-                insert_columns=insert_columns
+            columns_metadata = fetch_odbc_metadata(odbc_conn, source_table, exceptions, metadata_cache)
+        columns_metadata = project_columns(mapping, columns_metadata)
+
+    if mapping.get("strategy") == "swap":
+        logging.info(f"Table `{destination_table}` will be reloaded through a staging table and swapped in.")
+        return columns_metadata
+
+    # Check if table exists (as loaded at startup); create if missing
+    if destination_table.lower() in destination_layouts:
+        warn_on_missing_columns(destination_table, columns_metadata)
+    else:
+        logging.info(f"MySQL table `{destination_table}` does not exist. Creating table.")
+        create_mysql_table_from_odbc_metadata(
+            mysql_conn,
+            destination_table,
+            columns_metadata,
+            mapping.get("primary_key", []),
+            mapping.get("unique_keys", []),
+            exceptions,
+            catalog=source_catalog(mapping, odbc_conn)
+        )
+
+    # Determine operation: update or fresh insert
+    if update_columns:
+        logging.info(f"Table `{destination_table}` will be updated with columns: {update_columns}.")
+    else:
+        logging.info(f"Table `{destination_table}` will be freshly inserted.")
+    return columns_metadata
+
+
+def complete_mapping(mapping, summary, columns_metadata, odbc_conn, mysql_conn):
+    """After a successful load: reconcile deletes if configured, then store the change probe."""
+    # A swap reload already dropped rows deleted at the source
+    reconcile = mapping.get("reconcile", False)
+    if reconcile and mapping.get("strategy") != "swap":
+        with summary["metrics"].phase("reconcile"):
+            result = reconcile_mapping(mapping, columns_metadata, odbc_conn, mysql_conn, dry_run=reconcile == "dry_run")
+        summary["counters"].update({f"reconcile_{name}": count for name, count in result.items()})
+
+    if summary["probe"] is not None:
+        save_change_probe(mapping, mysql_conn, summary["probe"])
+
+
+def fail_summary(summary, error):
+    logging.error(f"Failed to migrate `{summary['source']}` -> `{summary['destination']}`: {str(error)}", exc_info=True)
+    summary["status"] = "failed"
+    summary["error"] = str(error)
+
+
+def finish_summary(summary, table_start_time):
+    summary["duration"] = time.time() - table_start_time
+    logging.info(
+        f"Finished `{summary['source']}` -> `{summary['destination']}`: {summary['status']}, "
+        f"{summary['rows']} rows in {str(timedelta(seconds=round(summary['duration'])))}"
+    )
+    return summary
+
+
+def migrate_mapping(mapping, odbc_conn, mysql_conn):
+    """
+    Migrate a single table mapping over the given connections.
+
+    Returns:
+        dict: Summary of the table run (rows written, duration and status).
+    """
+    summary = new_summary(mapping)
+    table_start_time = time.time()
+
+    logging.info(f"Processing migration for source: {mapping.get('source')} -> destination: {mapping.get('destination')}")
+
+    try:
+        columns_metadata = prepare_mapping(mapping, summary, odbc_conn, mysql_conn)
+        if columns_metadata is not None:
+            if mapping.get("strategy") == "swap":
+                summary["rows"] = migrate_with_swap(mapping, columns_metadata, odbc_conn, mysql_conn, summary["metrics"])
+            else:
+                summary["rows"] = load_mapping(
+                    mapping, columns_metadata, odbc_conn, mysql_conn, summary["counters"], summary["metrics"]
+                )
+            complete_mapping(mapping, summary, columns_metadata, odbc_conn, mysql_conn)
+    except Exception as e:
+        fail_summary(summary, e)
+
+    return finish_summary(summary, table_start_time)
+
+
+def fan_out_key(mapping):
+    """
+    The source read a mapping can share, or None when it must be read on its own.
+
+    Mappings with the same key read the same table in the same order and can share one
+    read (see `load_fan_out`), whatever their filters and columns. Swap, checkpointed and
+    partitioned loads, parallel writers, conversion workers, byte-sized batches and
+    `fan_out: false` keep their own read.
+    """
+    if (
+        not mapping.get("fan_out", True)
+        or mapping.get("strategy") == "swap"
+        or mapping.get("checkpoint", False)
+        or int(mapping.get("partitions", 1)) > 1
+        or int(mapping.get("writers", MYSQL_WRITERS)) > 1
+        or int(mapping.get("conversion_workers", CONVERSION_WORKERS)) > 1
+        or int(mapping.get("batch_bytes", BATCH_BYTES))
+    ):
+        return None
+    return ((mapping.get("source") or "").upper(), (mapping.get("sort_column") or "").upper())
+
+
+def fan_out_filter(mapping):
+    """
+    The source rows a mapping of a shared read loads, as a predicate and as `FanOutTarget` filters.
+
+    Both cover the mapping's `filters`, its `date_column`/`days_back` and `since` windows
+    and, for upserts, rows with a NULL `sort_column`.
+
+    Returns:
+        tuple: (predicate or None, params, keyword arguments for `FanOutTarget`)
+    """
+    sort_column = mapping.get("sort_column")
+    since = mapping.get("since")
+    skip_null_sort = bool(mapping.get("update_columns"))
+    filter_predicate, params = mapping_source_filter(mapping)
+    predicates = [since_predicate(sort_column, since, skip_null_sort), filter_predicate]
+    newer_than = []
+    if sort_column and since:
+        newer_than.append((sort_column, (datetime.now() - timedelta(days=since)).date()))
+    if mapping.get("date_column") and mapping.get("days_back") not in (None, "", []):
+        newer_than.append((mapping["date_column"], date.today() - timedelta(days=int(mapping["days_back"]))))
+    target_filters = {
+        "filters": mapping.get("filters"),
+        "newer_than": newer_than,
+        "not_null": [sort_column] if sort_column and skip_null_sort else [],
+    }
+    return " AND ".join(p for p in predicates if p) or None, params, target_filters
+
+
+def fan_out_groups(mappings):
+    """
+    Group mappings that can share one source read, keeping the order of each group's first mapping.
+
+    Returns:
+        list: Lists of mappings; mappings read on their own form groups of one.
+    """
+    groups = []
+    by_key = {}
+    for mapping in mappings:
+        key = fan_out_key(mapping)
+        if key is not None and key in by_key:
+            by_key[key].append(mapping)
+            continue
+        group = [mapping]
+        groups.append(group)
+        if key is not None:
+            by_key[key] = group
+    return groups
+
+
+def load_fan_out(loads, source_columns, odbc_conn, mysql_conn):
+    """
+    Load several mappings of one source from a single read (see `fanout.fan_out_rows`).
+
+    When the mappings filter the source differently, the query reads the rows any of them
+    needs (their predicates joined with OR) and each destination keeps its own rows.
+    `loads` holds (mapping, summary, column metadata) for each mapping; rows, counters
+    and per-destination errors are recorded in the summaries.
+    """
+    mapping = loads[0][0]
+    row_filters = [fan_out_filter(member) for member, _, _ in loads]
+    distinct = {}
+    for predicate, params, _ in row_filters:
+        distinct.setdefault((predicate, json.dumps(params, default=str)), (predicate, params))
+    shared = len(distinct) == 1
+    if shared:
+        predicate, params = next(iter(distinct.values()))
+    elif any(predicate is None for predicate, _ in distinct.values()):
+        predicate, params = None, []
+    else:
+        predicate = " OR ".join(f"({predicate})" for predicate, _ in distinct.values())
+        params = [param for _, member_params in distinct.values() for param in member_params]
+    targets = [
+        FanOutTarget(
+            destination_table=member.get("destination"),
+            columns=columns_metadata,
+            primary_key=member.get("primary_key", []),
+            update_columns=member.get("update_columns", []),
+            exceptions=member.get("exceptions", {}),
+            trim_trailing_spaces=member.get("trim_trailing_spaces", False),
+            use_row_hash=member.get("row_hash", False),
+            load_mode=member.get("load_mode", "executemany"),
+            fail_fast=bool(member.get("change_probe")),
+            metrics=summary["metrics"],
+            quarantine=quarantine,
+            **({} if shared else target_filters)
+        )
+        for (member, summary, columns_metadata), (_, _, target_filters) in zip(loads, row_filters)
+    ]
+    # Read every column one of the mappings needs, or all of them if any mapping is not projected
+    selects = [source_select(member, columns_metadata) for member, _, columns_metadata in loads]
+    read_columns = source_columns
+    select = None
+    if all(selects):
+        wanted = {name.strip().upper() for names in selects for name in names}
+        if not shared:
+            for target in targets:
+                wanted.update(name.strip().upper() for name in target.filters or {})
+                wanted.update(name.strip().upper() for name, _ in target.newer_than)
+                wanted.update(name.strip().upper() for name in target.not_null)
+        read_columns = [col for col in source_columns if col[0].strip().upper() in wanted]
+        select = [col[0] for col in read_columns]
+    sort_column = mapping.get("sort_column")
+    fan_out_rows(
+        odbc_conn, mysql_conn, mapping.get("source"), read_columns, targets, BATCH_SIZE,
+        predicates=[predicate],
+        params=params,
+        order_by=[sort_column] if sort_column else [],
+        select=select,
+        queue_depth=max(int(member.get("pipeline_depth", PIPELINE_DEPTH)) for member, _, _ in loads),
+        retry=retry_policy
+    )
+    for target, (member, summary, _) in zip(targets, loads):
+        summary["rows"] = target.rows_written
+        if target.use_row_hash:
+            summary["counters"].update(target.counts)
+        if target.error is not None:
+            summary["status"] = "failed"
+            summary["error"] = target.error
+
+
+def migrate_group(mappings, odbc_conn, mysql_conn):
+    """
+    Migrate mappings that share a source read (see `fan_out_groups`) over the given connections.
+
+    Every mapping is probed and prepared on its own; those left to load are read from the
+    source once. A group of one is migrated with `migrate_mapping`.
+
+    Returns:
+        list: One run summary per mapping, in order.
+    """
+    if len(mappings) == 1:
+        return [migrate_mapping(mappings[0], odbc_conn, mysql_conn)]
+    source_table = mappings[0].get("source")
+    group_start_time = time.time()
+    summaries = [new_summary(mapping) for mapping in mappings]
+    logging.info(
+        f"Processing migration for source: {source_table} -> destinations: "
+        f"{', '.join(mapping.get('destination') for mapping in mappings)}"
+    )
+
+    loads = []
+    try:
+        with summaries[0]["metrics"].phase("metadata"):
+            source_columns = fetch_odbc_metadata(odbc_conn, source_table, None, metadata_cache)
+    except Exception as e:
+        for summary in summaries:
+            fail_summary(summary, e)
+        return [finish_summary(summary, group_start_time) for summary in summaries]
+    for mapping, summary in zip(mappings, summaries):
+        try:
+            columns_metadata = prepare_mapping(mapping, summary, odbc_conn, mysql_conn, source_columns)
+            if columns_metadata is not None:
+                loads.append((mapping, summary, columns_metadata))
+        except Exception as e:
+            fail_summary(summary, e)
+
+    if len(loads) == 1:
+        mapping, summary, columns_metadata = loads[0]
+        try:
+            summary["rows"] = load_mapping(mapping, columns_metadata, odbc_conn, mysql_conn, summary["counters"], summary["metrics"])
+        except Exception as e:
+            fail_summary(summary, e)
+    elif loads:
+        try:
+            load_fan_out(loads, source_columns, odbc_conn, mysql_conn)
+        except Exception as e:
+            for _, summary, _ in loads:
+                fail_summary(summary, e)
+
+    for mapping, summary, columns_metadata in loads:
+        if summary["status"] == "ok":
+            try:
+                complete_mapping(mapping, summary, columns_metadata, odbc_conn, mysql_conn)
+            except Exception as e:
+                fail_summary(summary, e)
+    return [finish_summary(summary, group_start_time) for summary in summaries]
+
+
+def migrate_group_from_pools(mappings, odbc_pool, mysql_pool):
+    """Worker entry point: migrate one group of mappings over connections borrowed from the pools."""
+    threading.current_thread().name = mappings[0].get("destination") or mappings[0].get("source")
+    try:
+        with odbc_pool.connection() as odbc_conn, mysql_pool.connection() as mysql_conn:
+            return migrate_group(mappings, odbc_conn, mysql_conn)
+    except Exception as e:
+        logging.error(f"Could not obtain connections for `{mappings[0].get('source')}`: {str(e)}", exc_info=True)
+        return [
+            {
+                "source": mapping.get("source"),
+                "destination": mapping.get("destination"),
+                "rows": 0,
+                "duration": 0.0,
+                "status": "failed",
+                "error": str(e),
+                "counters": {},
+                "metrics": None
+            }
+            for mapping in mappings
+        ]
+
+
+def log_run_summary(summaries):
+    """Log one line per migrated table followed by totals."""
+    logging.info("Run summary:")
+    for summary in summaries:
+        line = (
+            f"  {summary['source']} -> {summary['destination']}: {summary['status']}, "
+            f"{summary['rows']} rows, {str(timedelta(seconds=round(summary['duration'])))}"
+        )
+        if summary["duration"]:
+            line += f", {summary['rows'] / summary['duration']:.0f} rows/s"
+        if summary["counters"]:
+            line += " [" + ", ".join(f"{name}: {count}" for name, count in summary["counters"].items()) + "]"
+        if summary["error"]:
+            line += f" ({summary['error']})"
+        logging.info(line)
+    failed = [s for s in summaries if s["status"] == "failed"]
+    skipped = [s for s in summaries if s["status"] == "skipped"]
+    logging.info(
+        f"{len(summaries) - len(failed) - len(skipped)} tables succeeded, {len(skipped)} skipped as unchanged, "
+        f"{len(failed)} failed."
+    )
+
+
+def write_run_report(summaries):
+    """Write the JSON run report and Prometheus textfile when their paths are configured."""
+    if not (REPORT_JSON_PATH or PROMETHEUS_TEXTFILE_PATH):
+        return
+    report = build_run_report(summaries, start_time, time.time())
+    for path, writer in ((REPORT_JSON_PATH, write_json_report), (PROMETHEUS_TEXTFILE_PATH, write_prometheus_textfile)):
+        if not path:
+            continue
+        try:
+            writer(report, path)
+            logging.info(f"Run report written to {path}")
+        except OSError as e:
+            logging.error(f"Could not write run report to {path}: {str(e)}")
+
+
+def schedule_mappings(run_history, mappings):
+    """Order mappings longest expected duration first and log the estimates."""
+    scheduled = run_history.schedule(mappings)
+    estimates = []
+    for mapping in scheduled:
+        estimate = run_history.estimate(mapping.get("source"), mapping.get("destination"))
+        estimates.append(f"{mapping.get('destination')} ({f'~{estimate:.0f}s' if estimate is not None else 'no history'})")
+    logging.info(f"Scheduling tables longest first: {', '.join(estimates)}")
+    return scheduled
+
+
+def record_run_history(run_history, summaries):
+    """Warn about tables whose duration deviates from their history, then add this run to it."""
+    for summary in summaries:
+        run_history.check_deviation(summary, RUN_HISTORY_DEVIATION)
+        run_history.record(summary)
+    try:
+        run_history.save()
+    except OSError as e:
+        logging.error(f"Could not save run history to {RUN_HISTORY_PATH}: {str(e)}")
+
+
+def replay_quarantine(mysql_conn, table_mappings, destination=None, path=None):
+    """
+    Write quarantined rows again with the statement their mapping uses.
+
+    Rows come from the `_quarantine` table, or from a quarantine file when `path` is given.
+    Rows that fail again are found by bisection. In the table they stay unreplayed with
+    their new error; from a file they are appended to this run's quarantine file.
+
+    Returns:
+        tuple: (rows replayed, rows still failing)
+    """
+    records = read_quarantine_file(path, destination) if path else load_quarantined_rows(mysql_conn, destination)
+    if not records:
+        logging.info("No quarantined rows to replay.")
+        return 0, 0
+    mappings_by_destination = {(mapping.get("destination") or "").lower(): mapping for mapping in table_mappings}
+    file_quarantine = create_quarantine("file", RUN_ID, QUARANTINE_DIR) if path else None
+
+    groups = {}
+    for record in records:
+        groups.setdefault((record["destination"], tuple(record["columns"])), []).append(record)
+
+    replayed = 0
+    still_failing = 0
+    try:
+        for (destination_table, column_names), group in groups.items():
+            mapping = mappings_by_destination.get(destination_table.lower(), {})
+            columns = [(name, None) for name in column_names]
+            update_columns = list(mapping.get("update_columns", []))
+            if update_columns:
+                if ROW_HASH_COLUMN in column_names:
+                    update_columns.append(ROW_HASH_COLUMN)
+                query = build_upsert_query(destination_table, columns, update_columns)
+            else:
+                query = build_insert_query(destination_table, columns, mapping.get("primary_key", []))
+            rows = [record_row(record) for record in group]
+
+            cursor = mysql_conn.cursor()
+            try:
+                cursor.executemany(query, rows)
+                mysql_conn.commit()
+                failures = []
+            except Exception as e:
+                mysql_conn.rollback()
+                _, failures = write_rows_bisecting(mysql_conn, query, rows, e)
+            finally:
+                cursor.close()
+
+            failed = dict(failures)
+            if file_quarantine is not None:
+                if failures:
+                    file_quarantine.add(mysql_conn, destination_table, columns, [(rows[index], message) for index, message in failures])
+            else:
+                mark_replayed(mysql_conn, [record["id"] for index, record in enumerate(group) if index not in failed])
+                update_quarantine_errors(mysql_conn, [(group[index]["id"], message) for index, message in failures])
+            replayed += len(rows) - len(failed)
+            still_failing += len(failed)
+            logging.info(f"Replayed {len(rows) - len(failed)} of {len(rows)} quarantined rows into `{destination_table}`.")
+    finally:
+        if file_quarantine is not None:
+            file_quarantine.close()
+            if still_failing:
+                logging.warning(f"Rows that failed again were written to {file_quarantine.path}")
+    return replayed, still_failing
+
+
+def verify_mapping(mapping, odbc_conn, mysql_conn, resync=False, full=False, content=False):
+    """
+    Verify one mapping's destination against its source (see `verify.TableVerifier`).
+
+    Ranges whose aggregates match are only checked by content with `content` or the
+    mapping's `verify_content`.
+
+    Returns:
+        dict: The verification report.
+    """
+    source_table = mapping.get("source")
+    exceptions = mapping.get("exceptions", {})
+    columns_metadata = project_columns(mapping, fetch_odbc_metadata(odbc_conn, source_table, exceptions, metadata_cache))
+    verifier = TableVerifier(
+        odbc_conn,
+        mysql_conn,
+        source_table,
+        mapping.get("destination"),
+        columns_metadata,
+        mapping.get("primary_key", []),
+        exceptions=exceptions,
+        trim_trailing_spaces=mapping.get("trim_trailing_spaces", False),
+        select_columns=source_select(mapping, columns_metadata),
+        source_filter=mapping_source_filter(mapping, window=False),
+        destination_filter=source_filter_predicate(mapping.get("filters"), placeholder="%s"),
+        checksum_columns=mapping.get("checksum_columns", None),
+        leaf_rows=int(mapping.get("verify_leaf_rows", DEFAULT_LEAF_ROWS)),
+        full=full,
+        resync=resync,
+        row_hash_columns=mapping.get("update_columns") if mapping.get("row_hash", False) else None,
+        content_checksum=content or mapping.get("verify_content", False)
+    )
+    return verifier.verify(int(mapping.get("verify_ranges", DEFAULT_RANGES)))
+
+
+def export_mapping(mapping, odbc_conn, snapshot_dir):
+    """
+    Snapshot one mapping's source query (see `snapshot.export_snapshot`).
+
+    Returns:
+        dict: The snapshot's manifest.
+    """
+    source_table = mapping.get("source")
+    exceptions = mapping.get("exceptions", {})
+    columns_metadata = project_columns(mapping, fetch_odbc_metadata(odbc_conn, source_table, exceptions, metadata_cache))
+    return export_snapshot(
+        odbc_conn,
+        source_table,
+        mapping.get("destination"),
+        columns_metadata,
+        snapshot_dir,
+        BATCH_SIZE,
+        sort_column=mapping.get("sort_column", None),
+        since=mapping.get("since", None),
+        exceptions=exceptions,
+        trim_trailing_spaces=mapping.get("trim_trailing_spaces", False),
+        catalog=source_catalog(mapping, odbc_conn),
+        source_filter=mapping_source_filter(mapping),
+        select_columns=source_select(mapping, columns_metadata),
+        rows_per_file=SNAPSHOT_FILE_ROWS,
+        compression=SNAPSHOT_COMPRESSION
+    )
+
+
+def load_snapshot_mapping(mapping, mysql_conn, snapshot_dir):
+    """
+    Load one mapping's snapshot into its destination, creating the table if needed.
+
+    Swap mappings are loaded into `<destination>_staging` and swapped in, and only when
+    every snapshot row was written.
+
+    Returns:
+        int: The number of rows committed to MySQL.
+    """
+    destination_table = mapping.get("destination")
+    primary_key = mapping.get("primary_key", [])
+    unique_keys = mapping.get("unique_keys", [])
+    path = snapshot_path(snapshot_dir, destination_table)
+    manifest = read_manifest(path)
+    columns_metadata = [tuple(col) for col in manifest["columns"]]
+    load_mode = mapping.get("load_mode", "executemany")
+    queue_depth = int(mapping.get("pipeline_depth", PIPELINE_DEPTH))
+
+    if mapping.get("strategy") == "swap":
+        staging_table = f"{destination_table}_staging"
+        drop_mysql_table_if_exists(mysql_conn, staging_table)
+        create_mysql_table_from_odbc_metadata(
+            mysql_conn, staging_table, columns_metadata, primary_key, unique_keys, mapping.get("exceptions", {}),
+            include_unique_keys=False, catalog=manifest.get("catalog")
+        )
+        rows = load_snapshot(
+            mysql_conn, path, staging_table, primary_key, load_mode=load_mode, queue_depth=queue_depth, quarantine=quarantine
+        )
+        if rows < manifest["rows"]:
+            raise RuntimeError(f"Only {rows} of {manifest['rows']} snapshot rows were written; `{destination_table}` left untouched.")
+        swap_staging_table(mysql_conn, staging_table, destination_table, unique_keys)
+        return rows
+
+    if not does_table_exist(mysql_conn, destination_table):
+        logging.info(f"MySQL table `{destination_table}` does not exist. Creating table.")
+        create_mysql_table_from_odbc_metadata(
+            mysql_conn, destination_table, columns_metadata, primary_key, unique_keys, mapping.get("exceptions", {}),
+            catalog=manifest.get("catalog")
+        )
+    return load_snapshot(
+        mysql_conn,
+        path,
+        destination_table,
+        primary_key,
+        update_columns=mapping.get("update_columns", []),
+        use_row_hash=mapping.get("row_hash", False),
+        load_mode=load_mode,
+        queue_depth=queue_depth,
+        quarantine=quarantine
+    )
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Migrate tables from an ODBC source to MySQL.")
+    subparsers = parser.add_subparsers(dest="command")
+    subparsers.add_parser("migrate", help="Migrate the active table mappings (the default).")
+    replay = subparsers.add_parser("replay", help="Write quarantined rows to their destination tables again.")
+    replay.add_argument("--destination", help="Only replay rows for this destination table.")
+    replay.add_argument("--file", help="Replay from a quarantine file instead of the `_quarantine` table.")
+    reconcile = subparsers.add_parser("reconcile", help="Delete destination rows whose key no longer exists in the source.")
+    reconcile.add_argument("--destination", help="Only reconcile this destination table.")
+    reconcile.add_argument("--dry-run", action="store_true", help="Only count missing and extra keys.")
+    verify = subparsers.add_parser("verify", help="Compare destination tables with their source by range checksums.")
+    verify.add_argument("--destination", help="Only verify this destination table.")
+    verify.add_argument("--resync", action="store_true", help="Rewrite mismatched rows and delete rows gone from the source.")
+    verify.add_argument("--full", action="store_true", help="Compare every range row by row, even when its checksums match.")
+    verify.add_argument("--content", action="store_true", help="Also checksum the content of ranges whose aggregates match.")
+    verify.add_argument("--report", help="Write the mismatch report as JSON to this file.")
+    export = subparsers.add_parser("export", help="Snapshot source tables to local compressed columnar files.")
+    export.add_argument("--destination", help="Only export the mapping of this destination table.")
+    export.add_argument("--dir", help=f"Snapshot directory (default: SNAPSHOT_DIR, currently {SNAPSHOT_DIR}).")
+    load = subparsers.add_parser("load-snapshot", help="Load exported snapshots into MySQL without reading the source.")
+    load.add_argument("--destination", help="Only load the snapshot of this destination table.")
+    load.add_argument("--dir", help=f"Snapshot directory (default: SNAPSHOT_DIR, currently {SNAPSHOT_DIR}).")
+    load.add_argument("--database", help="Load into this MySQL database instead of DB_NAME.")
+    subparsers.add_parser("daemon", help="Keep syncing the active mappings, each on its own interval, until stopped.")
+    return parser.parse_args()
+
+
+def main_replay(args, table_mappings):
+    mysql_conn = None
+    try:
+        mysql_conn = open_mysql_connection()
+        replayed, still_failing = replay_quarantine(mysql_conn, table_mappings, args.destination, args.file)
+        logging.info(f"Replay finished: {replayed} rows written, {still_failing} still failing.")
+    except Exception as e:
+        logging.error(f"An error occurred: {str(e)}", exc_info=True)
+    finally:
+        if mysql_conn is not None:
+            close_connections(mysql_conn)
+
+
+def main_reconcile(args, table_mappings):
+    """Reconcile every active mapping with a primary key, without loading any rows."""
+    odbc_conn = None
+    mysql_conn = None
+    try:
+        odbc_conn = open_odbc_connection()
+        mysql_conn = open_mysql_connection()
+        for mapping in table_mappings:
+            destination_table = mapping.get("destination") or ""
+            if not mapping.get("active", True) or (args.destination and destination_table.lower() != args.destination.lower()):
+                continue
+            if not mapping.get("primary_key") or mapping.get("strategy") == "swap":
+                logging.info(f"Skipping `{destination_table}`: reconciling needs a primary_key and no swap strategy.")
+                continue
+            try:
+                odbc_conn = live_odbc_connection(odbc_conn)
+                live_mysql_connection(mysql_conn)
+                columns_metadata = fetch_odbc_metadata(odbc_conn, mapping.get("source"), mapping.get("exceptions", {}), metadata_cache)
+                reconcile_mapping(mapping, columns_metadata, odbc_conn, mysql_conn, dry_run=args.dry_run)
+            except Exception as e:
+                logging.error(f"Failed to reconcile `{destination_table}`: {str(e)}", exc_info=True)
+    except Exception as e:
+        logging.error(f"An error occurred: {str(e)}", exc_info=True)
+    finally:
+        if odbc_conn is not None:
+            close_connections(odbc_conn)
+        if mysql_conn is not None:
+            close_connections(mysql_conn)
+
+
+def selected_mappings(table_mappings, destination=None):
+    """Active mappings, or only the one for `destination` when given."""
+    return [
+        mapping for mapping in table_mappings
+        if mapping.get("active", True)
+        and (not destination or (mapping.get("destination") or "").lower() == destination.lower())
+    ]
+
+
+def main_verify(args, table_mappings):
+    """Verify every active mapping with a primary key and optionally write the mismatch report."""
+    odbc_conn = None
+    mysql_conn = None
+    reports = []
+    try:
+        odbc_conn = open_odbc_connection()
+        mysql_conn = open_mysql_connection()
+        for mapping in selected_mappings(table_mappings, args.destination):
+            destination_table = mapping.get("destination")
+            if not mapping.get("primary_key"):
+                logging.info(f"Skipping `{destination_table}`: verifying needs a primary_key.")
+                continue
+            try:
+                odbc_conn = live_odbc_connection(odbc_conn)
+                live_mysql_connection(mysql_conn)
+                reports.append(verify_mapping(mapping, odbc_conn, mysql_conn, resync=args.resync, full=args.full, content=args.content))
+            except Exception as e:
+                logging.error(f"Failed to verify `{destination_table}`: {str(e)}", exc_info=True)
+                reports.append({"source": mapping.get("source"), "destination": destination_table, "error": str(e)})
+    except Exception as e:
+        logging.error(f"An error occurred: {str(e)}", exc_info=True)
+    finally:
+        if odbc_conn is not None:
+            close_connections(odbc_conn)
+        if mysql_conn is not None:
+            close_connections(mysql_conn)
+
+    drifted = [report for report in reports if report.get("error") or report["mismatches"]]
+    logging.info(f"Verify finished: {len(reports) - len(drifted)} tables match, {len(drifted)} differ or failed.")
+    if args.report:
+        try:
+            write_json_report({"verified_at": datetime.now().isoformat(timespec="seconds"), "tables": reports}, args.report)
+            logging.info(f"Verify report written to {args.report}")
+        except OSError as e:
+            logging.error(f"Could not write verify report to {args.report}: {str(e)}")
+
+
+def main_export(args, table_mappings):
+    """Snapshot every active mapping's source table, one after another over one ODBC connection."""
+    snapshot_dir = args.dir or SNAPSHOT_DIR
+    odbc_conn = None
+    exported, failed = 0, 0
+    try:
+        odbc_conn = open_odbc_connection()
+        for mapping in selected_mappings(table_mappings, args.destination):
+            try:
+                odbc_conn = live_odbc_connection(odbc_conn)
+                export_mapping(mapping, odbc_conn, snapshot_dir)
+                exported += 1
+            except Exception as e:
+                logging.error(f"Failed to export `{mapping.get('source')}`: {str(e)}", exc_info=True)
+                failed += 1
+    except Exception as e:
+        logging.error(f"An error occurred: {str(e)}", exc_info=True)
+    finally:
+        if odbc_conn is not None:
+            close_connections(odbc_conn)
+    logging.info(f"Export finished: {exported} tables exported to {snapshot_dir}, {failed} failed.")
+
+
+def main_load_snapshot(args, table_mappings):
+    """Load the snapshots of every active mapping into MySQL; the ODBC source is not touched."""
+    global db_name, allow_local_infile, quarantine
+    snapshot_dir = args.dir or SNAPSHOT_DIR
+    if args.database:
+        db_name = args.database
+    mappings = selected_mappings(table_mappings, args.destination)
+    allow_local_infile = any(mapping.get("load_mode") == "load_data" for mapping in mappings)
+    quarantine = create_quarantine(QUARANTINE, RUN_ID, QUARANTINE_DIR)
+    mysql_conn = None
+    loaded, failed = 0, 0
+    try:
+        mysql_conn = open_mysql_connection()
+        for mapping in mappings:
+            destination_table = mapping.get("destination")
+            try:
+                rows = load_snapshot_mapping(mapping, mysql_conn, snapshot_dir)
+                logging.info(f"Loaded {rows} rows into `{db_name}`.`{destination_table}` from its snapshot.")
+                loaded += 1
+            except FileNotFoundError:
+                logging.warning(f"No snapshot of `{destination_table}` in {snapshot_dir}; skipping it.")
+            except Exception as e:
+                logging.error(f"Failed to load the snapshot of `{destination_table}`: {str(e)}", exc_info=True)
+                failed += 1
+    except Exception as e:
+        logging.error(f"An error occurred: {str(e)}", exc_info=True)
+    finally:
+        if mysql_conn is not None:
+            close_connections(mysql_conn)
+        if quarantine is not None:
+            quarantine.close()
+    logging.info(f"Snapshot load finished: {loaded} tables loaded, {failed} failed.")
+
+
+def finish_daemon_run(run_history, scheduler, board, mapping, started, summary):
+    """Schedule a mapping's next daemon run and record the one that just finished."""
+    next_due = scheduler.finished(mapping, started, time.time())
+    board.record(summary, started, next_due)
+    if run_history is not None:
+        record_run_history(run_history, [summary])
+    if metadata_cache is not None:
+        try:
+            metadata_cache.save()
+        except OSError as e:
+            logging.error(f"Could not save metadata cache to {SCHEMA_CACHE_PATH}: {str(e)}")
+
+
+def reads_incrementally(mapping):
+    """Whether a run of the mapping reads less than the whole source table (or nothing when unchanged)."""
+    return bool(
+        mapping.get("checkpoint") or mapping.get("change_probe") or mapping.get("since")
+        or (mapping.get("date_column") and mapping.get("days_back"))
+    )
+
+
+def warn_full_reloads(mappings, scheduler):
+    """Log the daemon mappings that copy their whole source table on every run."""
+    for mapping in mappings:
+        if not reads_incrementally(mapping):
+            logging.warning(
+                f"`{mapping.get('source')}` -> `{mapping.get('destination')}` has no checkpoint, change_probe, "
+                f"since or days_back; the daemon reloads it in full every {scheduler.interval(mapping):.0f}s."
             )
 
-except Exception as e:
-    logging.error(f"An error occurred: {str(e)}", exc_info=True)
-finally:
-    # Close connections if they were successfully created
-    if odbc_conn is not None:
-        close_connections(odbc_conn)
-    if mysql_conn is not None:
-        close_connections(mysql_conn)
-    logging.info("Connections closed")
+
+def main_daemon(run_history):
+    """
+    Sync the active mappings continuously until SIGINT or SIGTERM.
+
+    Each mapping runs every `interval` seconds (default DAEMON_INTERVAL) on up to
+    MAX_PARALLEL_TABLES workers. Connections stay open in the pools between runs and
+    source metadata stays in the in-memory cache. `table_mappings.json` is reloaded
+    when it changes. The daemon's state is written to DAEMON_STATUS_PATH and, with
+    DAEMON_STATUS_PORT, served over HTTP. On a stop request running tables finish first.
+
+    Every run borrows its connections from the pools, which check them first and
+    replace those the server dropped (see `ConnectionPool.acquire`). Mappings without an
+    incremental read are reloaded in full on every run; they are logged as such.
+    """
+    global allow_local_infile
+    stop = threading.Event()
+
+    def request_stop(signum, frame):
+        if not stop.is_set():
+            logging.info("Stop requested; no new tables are started, waiting for running ones to finish.")
+        stop.set()
+
+    signal.signal(signal.SIGINT, request_stop)
+    signal.signal(signal.SIGTERM, request_stop)
+
+    workers = MAX_PARALLEL_TABLES
+    watcher = ConfigWatcher("table_mappings.json", load_table_mappings)
+    scheduler = IntervalScheduler(DAEMON_INTERVAL)
+    board = StatusBoard(DAEMON_STATUS_PATH, DAEMON_STALE_SECONDS)
+    server = serve_status(board, DAEMON_STATUS_HOST, DAEMON_STATUS_PORT) if DAEMON_STATUS_PORT else None
+    odbc_pool = ConnectionPool(open_odbc_connection, workers)
+    mysql_pool = ConnectionPool(open_mysql_connection, workers)
+    # Pools replaced after a reload, closed once the runs still using them finish
+    retired_pools = []
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="table")
+    active_mappings = []
+    running = {}
+    logging.info(f"Daemon started with {workers} workers and a default interval of {DAEMON_INTERVAL:.0f}s.")
+
+    try:
+        while not stop.is_set() or running:
+            error = None
+            try:
+                if not stop.is_set():
+                    if watcher.poll():
+                        active_mappings = [mapping for mapping in watcher.mappings if mapping.get("active", True)]
+                        scheduler.sync(active_mappings)
+                        board.set_mappings(active_mappings, scheduler, watcher.loaded_at)
+                        warn_full_reloads(active_mappings, scheduler)
+                        if not allow_local_infile and any(mapping.get("load_mode") == "load_data" for mapping in active_mappings):
+                            # Connections only allow LOCAL INFILE if opened with it
+                            allow_local_infile = True
+                            retired_pools.append(mysql_pool)
+                            mysql_pool = ConnectionPool(open_mysql_connection, workers)
+                    due = scheduler.due(time.time())
+                    if due:
+                        # Refreshed before starting runs, so tables created by earlier runs are known
+                        with mysql_pool.connection() as mysql_conn:
+                            load_destination_layouts(mysql_conn, active_mappings)
+                        for group in fan_out_groups(due):
+                            for mapping in group:
+                                scheduler.started(mapping)
+                                board.start(mapping)
+                            future = executor.submit(migrate_group_from_pools, group, odbc_pool, mysql_pool)
+                            running[future] = (group, time.time())
+            except Exception as e:
+                logging.error(f"Daemon pass failed: {str(e)}", exc_info=True)
+                error = str(e)
+
+            timeout = DAEMON_POLL_SECONDS
+            until_next = scheduler.seconds_until_next(time.time())
+            if until_next is not None and not stop.is_set():
+                timeout = min(timeout, until_next)
+            if running:
+                done, _ = wait(list(running), timeout=timeout, return_when=FIRST_COMPLETED)
+            else:
+                stop.wait(timeout)
+                done = []
+            for future in done:
+                group, started = running.pop(future)
+                for mapping, summary in zip(group, future.result()):
+                    finish_daemon_run(run_history, scheduler, board, mapping, started, summary)
+            if retired_pools and not running:
+                for pool in retired_pools:
+                    pool.close_all()
+                retired_pools = []
+
+            board.heartbeat(error)
+            try:
+                board.write()
+            except OSError as e:
+                logging.error(f"Could not write daemon status to {DAEMON_STATUS_PATH}: {str(e)}")
+    finally:
+        executor.shutdown(wait=False)
+        for pool in retired_pools + [odbc_pool, mysql_pool]:
+            pool.close_all()
+        board.state = "stopped"
+        try:
+            board.write()
+        except OSError as e:
+            logging.error(f"Could not write daemon status to {DAEMON_STATUS_PATH}: {str(e)}")
+        if server is not None:
+            server.shutdown()
+        logging.info("Daemon stopped; connections closed.")
+
+
+def main():
+    global allow_local_infile, metadata_cache, quarantine
+    args = parse_args()
+    logging.info("Script started")
+
+    # Load table mappings from external JSON file
+    table_mappings = load_table_mappings()
+    if not table_mappings:
+        logging.error("No valid table mappings found. Exiting the script.")
+        exit(1)
+
+    if args.command == "replay":
+        main_replay(args, table_mappings)
+        return
+    if args.command == "reconcile":
+        main_reconcile(args, table_mappings)
+        return
+    if args.command == "verify":
+        main_verify(args, table_mappings)
+        return
+    if args.command == "export":
+        main_export(args, table_mappings)
+        return
+    if args.command == "load-snapshot":
+        main_load_snapshot(args, table_mappings)
+        return
+
+    active_mappings = []
+    for mapping in table_mappings:
+        if not mapping.get("active", True):
+            logging.info(f"Skipping inactive table mapping for source: {mapping.get('source')} -> destination: {mapping.get('destination')}")
+            continue
+        active_mappings.append(mapping)
+    allow_local_infile = any(mapping.get("load_mode") == "load_data" for mapping in active_mappings)
+    if SCHEMA_CACHE_PATH:
+        metadata_cache = MetadataCache(SCHEMA_CACHE_PATH)
+    quarantine = create_quarantine(QUARANTINE, RUN_ID, QUARANTINE_DIR)
+    run_history = RunHistory(RUN_HISTORY_PATH) if RUN_HISTORY_PATH else None
+
+    summaries = []
+    if args.command == "daemon":
+        main_daemon(run_history)
+    elif MAX_PARALLEL_TABLES > 1:
+        # Each worker borrows its own ODBC and MySQL connection from the pools
+        if run_history is not None:
+            active_mappings = schedule_mappings(run_history, active_mappings)
+        groups = fan_out_groups(active_mappings)
+        workers = min(MAX_PARALLEL_TABLES, len(groups)) or 1
+        logging.info(f"Migrating {len(active_mappings)} tables with {workers} parallel workers")
+        odbc_pool = ConnectionPool(open_odbc_connection, workers)
+        mysql_pool = ConnectionPool(open_mysql_connection, workers)
+        try:
+            with mysql_pool.connection() as mysql_conn:
+                load_destination_layouts(mysql_conn, active_mappings)
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="table") as executor:
+                for group_summaries in executor.map(
+                    lambda group: migrate_group_from_pools(group, odbc_pool, mysql_pool),
+                    groups
+                ):
+                    summaries.extend(group_summaries)
+        except Exception as e:
+            logging.error(f"An error occurred: {str(e)}", exc_info=True)
+        finally:
+            odbc_pool.close_all()
+            mysql_pool.close_all()
+            logging.info("Connections closed")
+    else:
+        # Initialize connections to None
+        odbc_conn = None
+        mysql_conn = None
+
+        # Connect to ODBC and MySQL
+        try:
+            odbc_conn = open_odbc_connection()
+            mysql_conn = open_mysql_connection()
+            load_destination_layouts(mysql_conn, active_mappings)
+
+            # Iterate over each table mapping dynamically; mappings sharing a source read are migrated together
+            for group in fan_out_groups(active_mappings):
+                odbc_conn = live_odbc_connection(odbc_conn)
+                summaries.extend(migrate_group(group, odbc_conn, live_mysql_connection(mysql_conn)))
+
+        except Exception as e:
+            logging.error(f"An error occurred: {str(e)}", exc_info=True)
+        finally:
+            # Close connections if they were successfully created
+            if odbc_conn is not None:
+                close_connections(odbc_conn)
+            if mysql_conn is not None:
+                close_connections(mysql_conn)
+            logging.info("Connections closed")
+
+    if quarantine is not None:
+        quarantine.close()
+    if metadata_cache is not None:
+        try:
+            metadata_cache.save()
+        except OSError as e:
+            logging.error(f"Could not save metadata cache to {SCHEMA_CACHE_PATH}: {str(e)}")
+    if summaries:
+        log_run_summary(summaries)
+        write_run_report(summaries)
+        if run_history is not None:
+            record_run_history(run_history, summaries)
     logging.info("Script finished")
-    logging.info(f"Script finished. Total runtime: {str(timedelta(seconds=round(time.time() - start_time)))}")
\ No newline at end of file
+    logging.info(f"Script finished. Total runtime: {str(timedelta(seconds=round(time.time() - start_time)))}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""
+Per-table phase timings and the machine-readable run report.
+
+Each migrated table gets a TableMetrics that the loaders feed while they run: time spent
+in each phase (metadata fetch, source query, `fetchmany`, conversion, the MySQL write and
+`commit`) and one record per written batch. At the end of the run the collected metrics
+are written as a JSON report and/or a Prometheus textfile-collector file.
+"""
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+
+PROMETHEUS_PREFIX = "odbc_mysql_migration"
+
+
+class TableMetrics:
+    """
+    Timers and counters for one table mapping.
+
+    Safe to share between the threads of a pipelined or partitioned load.
+    """
+
+    def __init__(self, source, destination):
+        self.source = source
+        self.destination = destination
+        self.phases = {}
+        self.batches = []
+        self.rows = 0
+        self.source_rows = 0
+        self.bytes = 0
+        self.bad_rows = 0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def phase(self, name):
+        """Add the time spent in the block to phase `name`."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_phase(name, time.perf_counter() - started)
+
+    def add_phase(self, name, seconds, calls=1):
+        with self._lock:
+            phase = self.phases.setdefault(name, {"seconds": 0.0, "calls": 0})
+            phase["seconds"] += seconds
+            phase["calls"] += calls
+
+    def record_batch(self, rows, source_rows, bad_rows, bytes_processed, convert_seconds, write_seconds):
+        """Record one written batch; `rows` is what reached MySQL, `source_rows` what was fetched."""
+        with self._lock:
+            self.rows += rows
+            self.source_rows += source_rows
+            self.bad_rows += bad_rows
+            self.bytes += bytes_processed
+            self.batches.append({
+                "batch": len(self.batches) + 1,
+                "rows": rows,
+                "source_rows": source_rows,
+                "bad_rows": bad_rows,
+                "bytes": bytes_processed,
+                "convert_seconds": round(convert_seconds, 6),
+                "write_seconds": round(write_seconds, 6),
+                "rows_per_second": round(rows / write_seconds, 1) if write_seconds else None,
+            })
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                "rows": self.rows,
+                "source_rows": self.source_rows,
+                "bad_rows": self.bad_rows,
+                "bytes": self.bytes,
+                "phases": {
+                    name: {"seconds": round(phase["seconds"], 6), "calls": phase["calls"]}
+                    for name, phase in self.phases.items()
+                },
+                "batches": list(self.batches),
+            }
+
+
+def timed_phase(metrics, name):
+    """Time phase `name` on `metrics`, or do nothing when no metrics are collected."""
+    return metrics.phase(name) if metrics is not None else nullcontext()
+
+
+def build_run_report(summaries, started_at, finished_at):
+    """
+    Combine the per-table run summaries (see `main.migrate_mapping`) into one report.
+
+    Returns:
+        dict: JSON-serialisable run report.
+    """
+    tables = []
+    for summary in summaries:
+        metrics = summary.get("metrics")
+        table = {
+            "source": summary["source"],
+            "destination": summary["destination"],
+            "status": summary["status"],
+            "error": summary["error"],
+            "duration_seconds": round(summary["duration"], 3),
+            "rows_per_second": round(summary["rows"] / summary["duration"], 1) if summary["duration"] else None,
+            "counters": summary.get("counters", {}),
+            "probe": summary.get("probe"),
+        }
+        table.update(metrics.to_dict() if metrics else {"rows": summary["rows"]})
+        # Rows committed as reported by the loader, which is authoritative
+        table["rows"] = summary["rows"]
+        tables.append(table)
+    return {
+        "started_at": datetime.fromtimestamp(started_at).isoformat(timespec="seconds"),
+        "finished_at": datetime.fromtimestamp(finished_at).isoformat(timespec="seconds"),
+        "duration_seconds": round(finished_at - started_at, 3),
+        "tables": tables,
+    }
+
+
+def _write_atomically(path, text):
+    """Write through a temporary file so readers never see a partial file."""
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(temp_path, path)
+
+
+def write_json_report(report, path):
+    _write_atomically(path, json.dumps(report, indent=2, default=str))
+
+
+def _label_value(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def format_prometheus(report):
+    """Render the run report in the Prometheus text exposition format."""
+    lines = []
+
+    def metric(name, help_text, samples):
+        lines.append(f"# HELP {PROMETHEUS_PREFIX}_{name} {help_text}")
+        lines.append(f"# TYPE {PROMETHEUS_PREFIX}_{name} gauge")
+        for labels, value in samples:
+            label_text = ",".join(f'{key}="{_label_value(val)}"' for key, val in labels.items())
+            lines.append(f"{PROMETHEUS_PREFIX}_{name}{{{label_text}}} {value}" if labels else f"{PROMETHEUS_PREFIX}_{name} {value}")
+
+    def table_labels(table, **extra):
+        return dict(source=table["source"], destination=table["destination"], **extra)
+
+    tables = report["tables"]
+    metric("last_run_timestamp_seconds", "Unix time the last run finished.",
+           [({}, datetime.fromisoformat(report["finished_at"]).timestamp())])
+    metric("run_duration_seconds", "Wall-clock duration of the last run.", [({}, report["duration_seconds"])])
+    metric("table_success", "1 if the table migrated without error in the last run, else 0.",
+           [(table_labels(t), int(t["status"] in ("ok", "skipped"))) for t in tables])
+    metric("table_skipped", "1 if the table was skipped in the last run because its change probe was unchanged.",
+           [(table_labels(t), int(t["status"] == "skipped")) for t in tables])
+    metric("table_rows", "Rows committed to MySQL in the last run.",
+           [(table_labels(t), t["rows"]) for t in tables])
+    metric("table_bad_rows", "Source rows dropped by conversion in the last run.",
+           [(table_labels(t), t.get("bad_rows", 0)) for t in tables])
+    metric("table_bytes", "Approximate bytes of converted row data written in the last run.",
+           [(table_labels(t), t.get("bytes", 0)) for t in tables])
+    metric("table_duration_seconds", "Wall-clock duration of the table in the last run.",
+           [(table_labels(t), t["duration_seconds"]) for t in tables])
+    metric("table_rows_per_second", "Overall throughput of the table in the last run.",
+           [(table_labels(t), t["rows_per_second"] or 0) for t in tables])
+    metric("table_phase_seconds", "Time spent in each phase of the table in the last run.",
+           [(table_labels(t, phase=name), phase["seconds"])
+            for t in tables for name, phase in t.get("phases", {}).items()])
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus_textfile(report, path):
+    """Write the report for the node_exporter textfile collector (path should end in `.prom`)."""
+    _write_atomically(path, format_prometheus(report))
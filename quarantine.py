@@ -0,0 +1,210 @@
+"""
+Quarantine for rows MySQL rejected.
+
+When a batch fails, the writers bisect it (see `db_operations.write_rows_bisecting`) so
+the good rows still commit, and hand each rejected row to a quarantine sink together
+with the error and batch details; without a sink they are only logged. Rows are kept either in the `_quarantine` table of
+the destination database or in one append-only JSON-lines file per run, and can be
+written again later with `python main.py replay`.
+"""
+import os
+import json
+import logging
+import threading
+from datetime import datetime
+from sync_state import encode_state, decode_state
+
+QUARANTINE_TABLE = "_quarantine"
+
+
+def quarantine_record(run_id, destination_table, column_names, row, error, batch_info=None):
+    """Describe one rejected row; values keep their types through `sync_state.encode_state`."""
+    return {
+        "run_id": run_id,
+        "destination": destination_table,
+        "columns": list(column_names),
+        "row": encode_state(list(row)),
+        "error": error,
+        "batch": batch_info or {},
+        "quarantined_at": datetime.now().isoformat(timespec="seconds"),
+    }
+
+
+def record_row(record):
+    """Decode the row values of a quarantine record."""
+    return tuple(decode_state(record["row"]))
+
+
+def ensure_quarantine_table(mysql_conn):
+    """Create the quarantine table if it does not exist yet."""
+    cursor = mysql_conn.cursor()
+    try:
+        cursor.execute(f"""
+            CREATE TABLE IF NOT EXISTS `{QUARANTINE_TABLE}` (
+                `id` BIGINT NOT NULL AUTO_INCREMENT,
+                `run_id` VARCHAR(32) NOT NULL,
+                `destination_table` VARCHAR(255) NOT NULL,
+                `column_names` TEXT NOT NULL,
+                `row_values` MEDIUMTEXT NOT NULL,
+                `error` TEXT,
+                `batch_info` TEXT,
+                `created_at` DATETIME DEFAULT CURRENT_TIMESTAMP,
+                `replayed_at` DATETIME NULL,
+                PRIMARY KEY (`id`),
+                KEY (`destination_table`, `replayed_at`)
+            )
+        """)
+        mysql_conn.commit()
+    finally:
+        cursor.close()
+
+
+class TableQuarantine:
+    """Keeps rejected rows in the `_quarantine` table of the destination database."""
+
+    def __init__(self, run_id):
+        self.run_id = run_id
+        self._ensured = False
+        self._lock = threading.Lock()
+
+    def add(self, mysql_conn, destination_table, columns, failures, batch_info=None):
+        """Store `failures`, a list of (row, error message), and commit them."""
+        with self._lock:
+            if not self._ensured:
+                ensure_quarantine_table(mysql_conn)
+                self._ensured = True
+        column_names = [col[0] for col in columns]
+        cursor = mysql_conn.cursor()
+        try:
+            cursor.executemany(
+                f"INSERT INTO `{QUARANTINE_TABLE}` "
+                "(`run_id`, `destination_table`, `column_names`, `row_values`, `error`, `batch_info`) "
+                "VALUES (%s, %s, %s, %s, %s, %s)",
+                [
+                    (self.run_id, destination_table, json.dumps(column_names), encode_state(list(row)), error,
+                     json.dumps(batch_info or {}, default=str))
+                    for row, error in failures
+                ]
+            )
+            mysql_conn.commit()
+        finally:
+            cursor.close()
+
+    def close(self):
+        pass
+
+
+class FileQuarantine:
+    """Appends rejected rows as JSON lines to a single file for the whole run."""
+
+    def __init__(self, path, run_id):
+        self.path = path
+        self.run_id = run_id
+        self._file = None
+        self._lock = threading.Lock()
+
+    def add(self, mysql_conn, destination_table, columns, failures, batch_info=None):
+        column_names = [col[0] for col in columns]
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, "a", encoding="utf-8")
+            for row, error in failures:
+                record = quarantine_record(self.run_id, destination_table, column_names, row, error, batch_info)
+                self._file.write(json.dumps(record, default=str) + "\n")
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def create_quarantine(mode, run_id, directory="."):
+    """
+    Build the quarantine sink for a run: "table", "file" or "off".
+
+    Returns:
+        TableQuarantine | FileQuarantine | None
+    """
+    mode = (mode or "off").lower()
+    if mode == "table":
+        return TableQuarantine(run_id)
+    if mode == "file":
+        return FileQuarantine(os.path.join(directory, f"quarantine_{run_id}.jsonl"), run_id)
+    if mode != "off":
+        logging.warning(f"Unknown QUARANTINE mode '{mode}'; rejected rows will only be logged.")
+    return None
+
+
+def load_quarantined_rows(mysql_conn, destination_table=None):
+    """
+    Read rows from the quarantine table that have not been replayed yet.
+
+    Returns:
+        list: Quarantine records with an extra `id` key.
+    """
+    query = (
+        f"SELECT `id`, `run_id`, `destination_table`, `column_names`, `row_values`, `error`, `batch_info` "
+        f"FROM `{QUARANTINE_TABLE}` WHERE `replayed_at` IS NULL"
+    )
+    params = ()
+    if destination_table:
+        query += " AND `destination_table` = %s"
+        params = (destination_table,)
+    cursor = mysql_conn.cursor()
+    try:
+        cursor.execute(query + " ORDER BY `id`", params)
+        return [
+            {
+                "id": row_id,
+                "run_id": run_id,
+                "destination": destination,
+                "columns": json.loads(column_names),
+                "row": row_values,
+                "error": error,
+                "batch": json.loads(batch_info) if batch_info else {},
+            }
+            for row_id, run_id, destination, column_names, row_values, error, batch_info in cursor.fetchall()
+        ]
+    finally:
+        cursor.close()
+
+
+def read_quarantine_file(path, destination_table=None):
+    """Read quarantine records from a JSON-lines file, optionally for one destination only."""
+    records = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                if not destination_table or record["destination"] == destination_table:
+                    records.append(record)
+    return records
+
+
+def mark_replayed(mysql_conn, ids):
+    """Flag quarantine table rows as replayed so they are not written again."""
+    if not ids:
+        return
+    cursor = mysql_conn.cursor()
+    try:
+        cursor.execute(
+            f"UPDATE `{QUARANTINE_TABLE}` SET `replayed_at` = NOW() WHERE `id` IN ({', '.join(['%s'] * len(ids))})",
+            tuple(ids)
+        )
+        mysql_conn.commit()
+    finally:
+        cursor.close()
+
+
+def update_quarantine_errors(mysql_conn, errors):
+    """Record the latest error for quarantine table rows whose replay failed again."""
+    if not errors:
+        return
+    cursor = mysql_conn.cursor()
+    try:
+        cursor.executemany(f"UPDATE `{QUARANTINE_TABLE}` SET `error` = %s WHERE `id` = %s", [(error, row_id) for row_id, error in errors])
+        mysql_conn.commit()
+    finally:
+        cursor.close()
@@ -0,0 +1,208 @@
+"""
+Reconciliation of a destination table against its source.
+
+Both sides stream their primary keys in the same order and are merge-joined, so memory
+use stays constant however large the tables are. Keys found only in MySQL were deleted
+at the source and are removed in batches; keys found only in the source are counted
+(the regular load copies them). Text keys are compared without trailing spaces, because
+ODBC returns CHAR(n) values padded and MySQL returns them stripped.
+"""
+import logging
+from db_operations import build_source_query, column_indexes, compile_row_converter, normalize_key
+
+DEFAULT_DELETE_BATCH = 1000
+# Keys looked up in the source per query before they are deleted
+VERIFY_BATCH = 500
+# Example keys logged per kind of difference
+SAMPLE_KEYS = 5
+
+
+def destination_key_query(destination_table, key_columns, text_columns=()):
+    """
+    SELECT of the destination's primary keys, ordered the way Python compares them.
+
+    Text columns are ordered by their binary value, i.e. by code point, instead of by
+    the column's (usually case-insensitive) collation.
+    """
+    select_list = ", ".join(f"`{col}`" for col in key_columns)
+    order_by = ", ".join(f"CAST(`{col}` AS BINARY)" if col in text_columns else f"`{col}`" for col in key_columns)
+    return f"SELECT {select_list} FROM `{destination_table}` ORDER BY {order_by}"
+
+
+def stream_keys(cursor, chunk_size, key_converter=None):
+    """Yield key tuples from an executed cursor with `fetchmany`, skipping keys with NULLs."""
+    while True:
+        rows = cursor.fetchmany(chunk_size)
+        if not rows:
+            return
+        for row in rows:
+            key = key_converter(row) if key_converter else tuple(row)
+            if None not in key:
+                yield key
+
+
+def _ordered(keys, side, stats):
+    """Count keys and those breaking ascending order, which make the merge report false differences."""
+    previous = None
+    for key in keys:
+        stats[f"{side}_keys"] += 1
+        if previous is not None and key < previous:
+            stats["out_of_order"] += 1
+            if stats["out_of_order"] == 1:
+                logging.warning(
+                    f"{side.capitalize()} keys are not in ascending order ({key} after {previous}); "
+                    f"differences found from here on are verified against the source before deleting."
+                )
+        previous = key
+        yield key
+
+
+def keys_in_source(odbc_conn, source_table, key_columns, keys, key_converter, source_filter=None):
+    """
+    Look up which of `keys` still exist in the source table (and match `source_filter`).
+
+    Returns:
+        set: The keys that were found, as `normalize_key` forms.
+    """
+    filter_predicate, filter_params = source_filter or (None, [])
+    found = set()
+    cursor = odbc_conn.cursor()
+    try:
+        for start in range(0, len(keys), VERIFY_BATCH):
+            batch = keys[start:start + VERIFY_BATCH]
+            match = " AND ".join(f"{col} = ?" for col in key_columns)
+            predicate = " OR ".join([f"({match})"] * len(batch))
+            cursor.execute(
+                build_source_query(source_table, [filter_predicate, predicate], select=key_columns),
+                *filter_params, *[value for key in batch for value in key]
+            )
+            found.update(normalize_key(key_converter(row)) for row in cursor.fetchall())
+    finally:
+        cursor.close()
+    return found
+
+
+def delete_keys(mysql_conn, destination_table, key_columns, keys):
+    """Delete rows by primary key in one statement and commit."""
+    if len(key_columns) == 1:
+        predicate = f"`{key_columns[0]}` IN ({', '.join(['%s'] * len(keys))})"
+    else:
+        row_placeholder = f"({', '.join(['%s'] * len(key_columns))})"
+        predicate = f"({', '.join(f'`{col}`' for col in key_columns)}) IN ({', '.join([row_placeholder] * len(keys))})"
+    cursor = mysql_conn.cursor()
+    try:
+        cursor.execute(f"DELETE FROM `{destination_table}` WHERE {predicate}", tuple(value for key in keys for value in key))
+        mysql_conn.commit()
+        return cursor.rowcount
+    except Exception:
+        mysql_conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def reconcile_table(
+    odbc_conn, mysql_conn, key_conn, source_table, destination_table, columns, primary_key,
+    exceptions=None, trim_trailing_spaces=False, dry_run=False, delete_batch=DEFAULT_DELETE_BATCH, chunk_size=10000,
+    source_filter=None
+):
+    """
+    Merge-join the primary keys of a source table and its destination and delete what the source lost.
+
+    The destination keys are streamed over `key_conn`, a MySQL connection of their own,
+    because an unbuffered result set blocks its connection; deletes go through
+    `mysql_conn`. Source keys are converted like the load converts them (`exceptions`,
+    `trim_trailing_spaces`). Keys only in the destination are looked up in the source
+    once more before they are deleted, `delete_batch` at a time, so a source whose order
+    differs from the destination's can never cause wrong deletes. With `dry_run` nothing
+    is deleted. A `source_filter` (see `db_operations.source_filter_predicate`) limits
+    the source to the rows the mapping copies, so destination rows outside it count as
+    extra.
+
+    Returns:
+        dict: Counts of `source_keys`, `destination_keys`, keys `missing` from the
+        destination, `extra` keys only in the destination, rows `deleted`, keys `kept`
+        because the source still has them, and keys `out_of_order`.
+    """
+    if not primary_key:
+        raise ValueError(f"Reconciling `{destination_table}` requires a primary_key.")
+    key_metadata = [columns[idx] for idx in column_indexes(columns, primary_key)]
+    key_columns = [col[0] for col in key_metadata]
+    text_columns = {col[0] for col in key_metadata if col[1] == "str"}
+    key_converter = compile_row_converter(key_metadata, exceptions, trim_trailing_spaces)
+
+    stats = {"source_keys": 0, "destination_keys": 0, "missing": 0, "extra": 0, "deleted": 0, "kept": 0, "out_of_order": 0}
+    samples = {"missing": [], "extra": []}
+    pending = []
+
+    def flush():
+        candidates = list(pending)
+        pending.clear()
+        if not candidates:
+            return
+        still_in_source = keys_in_source(odbc_conn, source_table, key_columns, candidates, key_converter, source_filter)
+        extra = [key for key in candidates if normalize_key(key) not in still_in_source]
+        stats["kept"] += len(candidates) - len(extra)
+        stats["extra"] += len(extra)
+        samples["extra"].extend(extra[:SAMPLE_KEYS - len(samples["extra"])])
+        if extra and not dry_run:
+            stats["deleted"] += delete_keys(mysql_conn, destination_table, key_columns, extra)
+
+    source_cursor = odbc_conn.cursor()
+    key_cursor = key_conn.cursor()
+    try:
+        filter_predicate, filter_params = source_filter or (None, [])
+        source_cursor.execute(build_source_query(
+            source_table, [filter_predicate, " AND ".join(f"{col} IS NOT NULL" for col in key_columns)], key_columns,
+            select=key_columns
+        ), *filter_params)
+        key_cursor.execute(destination_key_query(destination_table, key_columns, text_columns))
+        # Keys are merged in their normalised form; deletes use the destination's stored values
+        source_keys = _ordered(
+            (normalize_key(key) for key in stream_keys(source_cursor, chunk_size, key_converter)), "source", stats
+        )
+        destination_keys = (
+            (normalize_key(key), key) for key in _ordered(stream_keys(key_cursor, chunk_size), "destination", stats)
+        )
+
+        source_key = next(source_keys, None)
+        destination_key, stored_key = next(destination_keys, (None, None))
+        if source_key is None and destination_key is not None:
+            raise RuntimeError(f"Source `{source_table}` returned no keys; refusing to empty `{destination_table}`.")
+
+        while source_key is not None or destination_key is not None:
+            if destination_key is None or (source_key is not None and source_key < destination_key):
+                stats["missing"] += 1
+                if len(samples["missing"]) < SAMPLE_KEYS:
+                    samples["missing"].append(source_key)
+                source_key = next(source_keys, None)
+            elif source_key is None or destination_key < source_key:
+                pending.append(stored_key)
+                if len(pending) >= delete_batch:
+                    flush()
+                destination_key, stored_key = next(destination_keys, (None, None))
+            else:
+                source_key = next(source_keys, None)
+                destination_key, stored_key = next(destination_keys, (None, None))
+        flush()
+    finally:
+        source_cursor.close()
+        try:
+            key_cursor.close()
+        except Exception:
+            pass
+
+    logging.info(
+        f"Reconciled `{source_table}` -> `{destination_table}`{' (dry run)' if dry_run else ''}: "
+        f"{stats['source_keys']} source keys, {stats['destination_keys']} destination keys, "
+        f"{stats['missing']} missing, {stats['extra']} extra, {stats['deleted']} deleted."
+    )
+    for kind, keys in samples.items():
+        if keys:
+            logging.info(f"Examples of {kind} keys in `{destination_table}`: {keys}")
+    if stats["kept"]:
+        logging.warning(
+            f"{stats['kept']} keys of `{destination_table}` looked deleted but still exist in the source; "
+            f"source and MySQL order `{', '.join(key_columns)}` differently."
+        )
+    return stats
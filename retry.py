@@ -0,0 +1,93 @@
+"""
+Retrying transient database failures.
+
+Errors are classified as transient (dropped connections, deadlocks, lock wait timeouts,
+ODBC communication failures) or fatal. Transient ones are retried with exponential
+backoff and full jitter after reconnecting; fatal ones are raised straight away.
+"""
+import time
+import random
+import logging
+import pyodbc
+import mysql.connector
+
+# MySQL errors worth retrying after a pause (and, for lost connections, a reconnect)
+TRANSIENT_MYSQL_ERRNOS = {
+    1040,  # Too many connections
+    1205,  # Lock wait timeout exceeded
+    1213,  # Deadlock found when trying to get lock
+    2003,  # Can't connect to MySQL server
+    2006,  # MySQL server has gone away
+    2013,  # Lost connection to MySQL server during query
+    2055,  # Lost connection to MySQL server (system error)
+}
+# ODBC SQLSTATEs for communication failures, timeouts and serialization failures
+TRANSIENT_ODBC_SQLSTATES = {"08S01", "08001", "08003", "08004", "08007", "HYT00", "HYT01", "40001"}
+
+
+def is_transient_error(error):
+    """Return True for errors that may succeed when retried (after reconnecting)."""
+    if isinstance(error, mysql.connector.Error):
+        return getattr(error, "errno", None) in TRANSIENT_MYSQL_ERRNOS
+    if isinstance(error, pyodbc.Error):
+        sqlstate = error.args[0] if error.args else None
+        return isinstance(sqlstate, str) and sqlstate.upper() in TRANSIENT_ODBC_SQLSTATES
+    return isinstance(error, (ConnectionError, TimeoutError))
+
+
+class RetryPolicy:
+    """
+    How often and how patiently transient failures are retried.
+
+    `attempts` is the number of retries after the first failure. Delays grow as
+    `base_delay * 2**attempt`, capped at `max_delay`, with full jitter so parallel
+    workers do not reconnect in lockstep. `odbc_factory` opens a replacement ODBC
+    connection when the current one breaks.
+    """
+
+    def __init__(self, attempts=5, base_delay=1.0, max_delay=60.0, odbc_factory=None):
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.odbc_factory = odbc_factory
+
+    def delay(self, attempt):
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def wait(self, attempt, description, error):
+        """Log a transient failure and sleep before retry number `attempt` (0-based)."""
+        delay = self.delay(attempt)
+        logging.warning(
+            f"Transient error during {description} (retry {attempt + 1}/{self.attempts} in {delay:.1f}s): {str(error)}"
+        )
+        time.sleep(delay)
+
+    def call(self, func, *args, description="database call", is_retryable=is_transient_error, **kwargs):
+        """Call `func`, retrying it while it fails with retryable errors."""
+        attempt = 0
+        while True:
+            try:
+                return func(*args, **kwargs)
+            except Exception as e:
+                if attempt >= self.attempts or not is_retryable(e):
+                    raise
+                self.wait(attempt, description, e)
+                attempt += 1
+
+    def reconnect_mysql(self, mysql_conn):
+        """Reconnect a MySQL connection in place, so everything holding it keeps a working object."""
+        self.call(
+            mysql_conn.reconnect, attempts=1, delay=0,
+            description="MySQL reconnect", is_retryable=lambda e: isinstance(e, mysql.connector.Error)
+        )
+        logging.info("Reconnected to MySQL.")
+
+    def reconnect_odbc(self):
+        """Open a replacement ODBC connection through `odbc_factory`."""
+        if self.odbc_factory is None:
+            raise RuntimeError("No ODBC connection factory configured for reconnecting.")
+        conn = self.call(
+            self.odbc_factory, description="ODBC reconnect", is_retryable=lambda e: isinstance(e, pyodbc.Error)
+        )
+        logging.info("Reconnected to the ODBC source.")
+        return conn
@@ -0,0 +1,114 @@
+"""
+History of per-table run statistics.
+
+Every run appends each table's rows, bytes, duration and average batch size to a JSON
+file. The next run uses the history to estimate how long each table will take, so
+parallel runs can start the longest tables first (longest-processing-time scheduling),
+and to warn when a table takes much longer or shorter than usual.
+"""
+import os
+import json
+import time
+import logging
+import statistics
+from sync_state import mapping_key
+
+# Runs kept per table
+DEFAULT_KEEP_RUNS = 10
+# Warn when a table takes more than this factor longer (or shorter) than its median
+DEFAULT_DEVIATION_FACTOR = 2.0
+# ...and the difference is at least this many seconds, so short tables stay quiet
+MIN_DEVIATION_SECONDS = 30.0
+
+
+class RunHistory:
+    """JSON file of the last `keep` runs of every table mapping."""
+
+    def __init__(self, path, keep=DEFAULT_KEEP_RUNS):
+        self.path = path
+        self.keep = keep
+        self.tables = {}
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, "r") as f:
+                self.tables = json.load(f).get("tables", {})
+        except FileNotFoundError:
+            self.tables = {}
+        except (OSError, ValueError) as e:
+            logging.warning(f"Ignoring unreadable run history {self.path}: {str(e)}")
+            self.tables = {}
+
+    def save(self):
+        """Write the history through a temporary file."""
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump({"tables": self.tables}, f, indent=1)
+        os.replace(temp_path, self.path)
+
+    def estimate(self, source_table, destination_table):
+        """
+        Expected duration of a table, the median of its successful runs.
+
+        Returns:
+            float: Seconds, or None for a table without successful runs.
+        """
+        durations = [
+            run["duration"] for run in self.tables.get(mapping_key(source_table, destination_table), [])
+            if run.get("status") == "ok"
+        ]
+        return statistics.median(durations) if durations else None
+
+    def schedule(self, mappings):
+        """
+        Order mappings longest expected duration first.
+
+        Tables without history go first, as they may be the longest of all; ties keep
+        their order in the mappings file.
+
+        Returns:
+            list: The mappings in scheduling order.
+        """
+        def cost(mapping):
+            estimate = self.estimate(mapping.get("source"), mapping.get("destination"))
+            return float("inf") if estimate is None else estimate
+        return sorted(mappings, key=cost, reverse=True)
+
+    def check_deviation(self, summary, factor=DEFAULT_DEVIATION_FACTOR):
+        """Warn when a finished table took `factor` times longer or shorter than its history."""
+        expected = self.estimate(summary["source"], summary["destination"])
+        duration = summary["duration"]
+        if expected is None or summary["status"] != "ok" or abs(duration - expected) < MIN_DEVIATION_SECONDS:
+            return
+        if duration > expected * factor or duration * factor < expected:
+            logging.warning(
+                f"`{summary['source']}` -> `{summary['destination']}` took {duration:.0f}s, "
+                f"against a median of {expected:.0f}s over its previous runs."
+            )
+
+    def record(self, summary):
+        """
+        Append a finished table's statistics (see `main.migrate_mapping`) and drop the oldest runs.
+
+        Tables skipped by their change probe are not recorded, so frequent skips never
+        push the durations of real loads out of the history.
+        """
+        if summary["status"] == "skipped":
+            return
+        metrics = summary.get("metrics")
+        run = {
+            "finished_at": round(time.time()),
+            "status": summary["status"],
+            "rows": summary["rows"],
+            "duration": round(summary["duration"], 3),
+        }
+        if metrics:
+            stats = metrics.to_dict()
+            run["source_rows"] = stats["source_rows"]
+            run["bytes"] = stats["bytes"]
+            batches = stats["batches"]
+            run["batch_rows"] = round(sum(batch["source_rows"] for batch in batches) / len(batches)) if batches else None
+        runs = self.tables.setdefault(mapping_key(summary["source"], summary["destination"]), [])
+        runs.append(run)
+        del runs[:-self.keep]
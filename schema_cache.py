@@ -0,0 +1,139 @@
+"""
+On-disk cache of ODBC source column metadata.
+
+Probing a source table with `SELECT * ... WHERE 1=0` can take seconds per table on slow
+drivers. The probe result is stored per driver and table, together with a fingerprint of
+the table's catalog entry (`cursor.columns()`), and reused until the fingerprint changes.
+"""
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+import pyodbc
+
+# Entries whose table could not be fingerprinted are trusted for this many seconds
+DEFAULT_UNFINGERPRINTED_TTL = 24 * 60 * 60
+
+
+def odbc_driver_key(odbc_conn):
+    """Identify the ODBC driver and DBMS a connection talks to, for keying cache entries."""
+    try:
+        return f"{odbc_conn.getinfo(pyodbc.SQL_DRIVER_NAME)}/{odbc_conn.getinfo(pyodbc.SQL_DBMS_NAME)}"
+    except Exception:
+        return "unknown"
+
+
+def fetch_odbc_catalog(odbc_conn, source_table):
+    """
+    Read a table's column catalog entry (`SQLColumns`) through `cursor.columns()`.
+
+    Returns:
+        list: One dict per column in table order, with `name`, `type_name`, `data_type`
+        (ODBC SQL type code), `column_size`, `decimal_digits` and `nullable`, or None
+        when the driver does not report catalog columns for the table.
+    """
+    schema, _, table = source_table.rpartition(".")
+    cursor = odbc_conn.cursor()
+    try:
+        rows = cursor.columns(table=table, schema=schema or None).fetchall()
+    except Exception as e:
+        logging.debug(f"Catalog lookup for {source_table} failed: {str(e)}")
+        return None
+    finally:
+        cursor.close()
+    if not rows:
+        return None
+    rows = sorted(rows, key=lambda row: row.ordinal_position or 0)
+    return [
+        {
+            "name": row.column_name,
+            "type_name": row.type_name,
+            "data_type": row.data_type,
+            "column_size": row.column_size,
+            "decimal_digits": row.decimal_digits,
+            "nullable": row.nullable,
+        }
+        for row in rows
+    ]
+
+
+def source_fingerprint(odbc_conn, source_table):
+    """
+    Hash the table's column catalog entry (names, types, sizes, nullability).
+
+    Returns None when the driver does not report catalog columns for the table.
+    """
+    catalog = fetch_odbc_catalog(odbc_conn, source_table)
+    if not catalog:
+        return None
+    return hashlib.md5(json.dumps(catalog, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+class MetadataCache:
+    """
+    JSON file of source column metadata keyed by driver and table.
+
+    Safe to share between the workers of a parallel run; call `save` once at the end.
+    """
+
+    def __init__(self, path, unfingerprinted_ttl=DEFAULT_UNFINGERPRINTED_TTL):
+        self.path = path
+        self.unfingerprinted_ttl = unfingerprinted_ttl
+        self.entries = {}
+        self.dirty = False
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, "r") as f:
+                self.entries = json.load(f).get("entries", {})
+        except FileNotFoundError:
+            self.entries = {}
+        except (OSError, ValueError) as e:
+            logging.warning(f"Ignoring unreadable metadata cache {self.path}: {str(e)}")
+            self.entries = {}
+
+    def save(self):
+        """Write the cache back if it changed, through a temporary file."""
+        with self._lock:
+            if not self.dirty:
+                return
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, "w") as f:
+                json.dump({"entries": self.entries}, f, indent=1)
+            os.replace(temp_path, self.path)
+            self.dirty = False
+
+    def get_or_probe(self, odbc_conn, source_table, probe):
+        """
+        Return the cached columns for a table, or call `probe(odbc_conn, source_table)` and cache them.
+
+        Returns:
+            list: (column name, type name) tuples.
+        """
+        key = f"{odbc_driver_key(odbc_conn)}|{source_table}"
+        fingerprint = source_fingerprint(odbc_conn, source_table)
+        with self._lock:
+            entry = self.entries.get(key)
+        if entry and self._is_valid(entry, fingerprint):
+            logging.debug(f"Using cached metadata for {source_table}")
+            return [tuple(column) for column in entry["columns"]]
+
+        columns = probe(odbc_conn, source_table)
+        with self._lock:
+            self.entries[key] = {
+                "fingerprint": fingerprint,
+                "cached_at": time.time(),
+                "columns": [list(column) for column in columns],
+            }
+            self.dirty = True
+        return columns
+
+    def _is_valid(self, entry, fingerprint):
+        if fingerprint is not None:
+            return entry.get("fingerprint") == fingerprint
+        # Without a fingerprint fall back to the entry's age
+        return entry.get("fingerprint") is None and time.time() - entry.get("cached_at", 0) < self.unfingerprinted_ttl
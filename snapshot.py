@@ -0,0 +1,268 @@
+"""
+Local columnar snapshots of source tables.
+
+`export_snapshot` reads a mapping's source query once, converts the rows with the same
+rules as the loaders (`db_operations.compile_row_converter`) and writes them as
+compressed Arrow IPC files plus a `manifest.json`. `load_snapshot` writes a snapshot
+into MySQL from memory-mapped files, so a table can be loaded or reloaded, into any
+number of databases, without querying the ODBC source again.
+
+Snapshots need the optional `pyarrow` package.
+"""
+import os
+import json
+import shutil
+import logging
+from decimal import Decimal
+from datetime import datetime
+from db_operations import (
+    ROW_HASH_COLUMN,
+    build_source_query,
+    column_indexes,
+    compile_row_converter,
+    convert_chunk,
+    ensure_row_hash_column,
+    insert_data_to_mysql,
+    load_data_to_mysql,
+    read_source_batches,
+    row_hash,
+    run_pipeline,
+    since_predicate,
+    upsert_data_to_mysql
+)
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as ipc
+except ImportError:  # Optional; only the export and load-snapshot commands need it
+    pa = None
+    ipc = None
+
+MANIFEST_FILE = "manifest.json"
+SNAPSHOT_FORMAT = 1
+DEFAULT_ROWS_PER_FILE = 1000000
+DEFAULT_COMPRESSION = "zstd"
+
+
+def require_pyarrow():
+    if pa is None:
+        raise RuntimeError("Snapshots need the pyarrow package (pip install pyarrow).")
+
+
+def _to_text(value):
+    return None if value is None else str(value)
+
+
+def column_codec(column_type):
+    """
+    How values of a converted column are stored in Arrow.
+
+    Decimals are stored as text so no precision or scale has to be guessed, and are
+    turned back into `Decimal` when loaded; types without an Arrow counterpart are
+    stored as text.
+
+    Returns:
+        tuple: (Arrow type, function preparing values for Arrow or None,
+        function restoring loaded values or None)
+    """
+    codecs = {
+        "int": (pa.int64(), None, None),
+        "bool": (pa.bool_(), None, None),
+        "float": (pa.float64(), None, None),
+        "str": (pa.string(), None, None),
+        "datetime": (pa.timestamp("us"), None, None),
+        "date": (pa.date32(), None, None),
+        "DATE": (pa.date32(), None, None),
+        "time": (pa.time64("us"), None, None),
+        "bytes": (pa.binary(), None, None),
+        "bytearray": (pa.binary(), lambda value: None if value is None else bytes(value), None),
+        "Decimal": (pa.string(), _to_text, lambda value: None if value is None else Decimal(value)),
+    }
+    return codecs.get(column_type, (pa.string(), _to_text, None))
+
+
+def snapshot_path(snapshot_dir, destination_table):
+    """Directory holding the snapshot of one destination table."""
+    return os.path.join(snapshot_dir, destination_table)
+
+
+def read_manifest(path):
+    """Load a snapshot's manifest, raising FileNotFoundError for missing or unfinished snapshots."""
+    with open(os.path.join(path, MANIFEST_FILE), "r") as f:
+        manifest = json.load(f)
+    if manifest.get("format") != SNAPSHOT_FORMAT:
+        raise ValueError(f"Unsupported snapshot format {manifest.get('format')} in {path}")
+    return manifest
+
+
+def export_snapshot(
+    odbc_conn, source_table, destination_table, columns, snapshot_dir, chunk_size,
+    sort_column=None, since=None, exceptions=None, trim_trailing_spaces=False, catalog=None,
+    source_filter=None, select_columns=None, rows_per_file=DEFAULT_ROWS_PER_FILE, compression=DEFAULT_COMPRESSION
+):
+    """
+    Read a source table once and write its converted rows as a snapshot.
+
+    Every fetched chunk becomes one record batch; a new file is started once the
+    current one holds `rows_per_file` rows. Files are written to `<destination>.partial` and replace the
+    previous snapshot only when complete, so an interrupted export never leaves a
+    snapshot that looks finished. The manifest records the columns, the source catalog
+    (for creating the destination table later) and the row count of every file.
+    `source_filter` and `select_columns` restrict the read like they do for the loaders.
+
+    Returns:
+        dict: The snapshot's manifest.
+    """
+    require_pyarrow()
+    codecs = [column_codec(col[1]) for col in columns]
+    schema = pa.schema([pa.field(col[0], codec[0]) for col, codec in zip(columns, codecs)])
+    options = ipc.IpcWriteOptions(compression=compression or None)
+    row_converter = compile_row_converter(columns, exceptions, trim_trailing_spaces)
+
+    target = snapshot_path(snapshot_dir, destination_table)
+    partial = f"{target}.partial"
+    shutil.rmtree(partial, ignore_errors=True)
+    os.makedirs(partial)
+
+    filter_predicate, filter_params = source_filter or (None, [])
+    predicates = [filter_predicate, since_predicate(sort_column, since)]
+
+    files = []
+    bad_rows = 0
+    writer = None
+    sink = None
+    try:
+        for chunk in read_source_batches(odbc_conn, source_table, chunk_size, predicates, filter_params, select=select_columns):
+            converted_chunk, bad_records = convert_chunk(chunk, row_converter)
+            bad_rows += len(bad_records)
+            if not converted_chunk:
+                continue
+            if writer is None or files[-1]["rows"] >= rows_per_file:
+                if writer is not None:
+                    writer.close()
+                    sink.close()
+                files.append({"path": f"part-{len(files):05d}.arrow", "rows": 0})
+                sink = pa.OSFile(os.path.join(partial, files[-1]["path"]), "wb")
+                writer = ipc.new_file(sink, schema, options=options)
+            # Converted rows end with the loader's `created_at`/`updated_at`; those are set on load
+            values = list(zip(*converted_chunk))
+            arrays = [
+                pa.array([prepare(value) for value in column] if prepare else column, type=arrow_type)
+                for column, (arrow_type, prepare, _) in zip(values, codecs)
+            ]
+            writer.write_batch(pa.record_batch(arrays, schema=schema))
+            files[-1]["rows"] += len(converted_chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+            sink.close()
+
+    manifest = {
+        "format": SNAPSHOT_FORMAT,
+        "source": source_table,
+        "destination": destination_table,
+        "query": build_source_query(source_table, predicates, select=select_columns),
+        "params": list(filter_params),
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "columns": [list(col[:2]) for col in columns],
+        "catalog": catalog,
+        "compression": compression or None,
+        "rows": sum(entry["rows"] for entry in files),
+        "bad_rows": bad_rows,
+        "files": files,
+    }
+    with open(os.path.join(partial, MANIFEST_FILE), "w") as f:
+        json.dump(manifest, f, indent=1, default=str)
+
+    shutil.rmtree(target, ignore_errors=True)
+    os.replace(partial, target)
+    logging.info(
+        f"Exported `{source_table}` to {target}: {manifest['rows']} rows in {len(files)} files"
+        f"{f', {bad_rows} rows failed conversion' if bad_rows else ''}."
+    )
+    return manifest
+
+
+def snapshot_batches(path, manifest):
+    """
+    Yield the rows of a snapshot, one list of tuples per record batch.
+
+    Files are memory-mapped, so only the batch being decoded is held in memory.
+    """
+    require_pyarrow()
+    restores = [column_codec(column_type)[2] for _, column_type in manifest["columns"]]
+    for entry in manifest["files"]:
+        with pa.memory_map(os.path.join(path, entry["path"]), "r") as source:
+            reader = ipc.open_file(source)
+            for index in range(reader.num_record_batches):
+                batch = reader.get_batch(index)
+                values = []
+                for column, restore in zip(batch.columns, restores):
+                    column = column.to_pylist()
+                    values.append([restore(value) for value in column] if restore else column)
+                yield list(zip(*values))
+
+
+def load_snapshot(
+    mysql_conn, path, destination_table, primary_key, update_columns=None, use_row_hash=False,
+    load_mode="executemany", queue_depth=0, quarantine=None, metrics=None
+):
+    """
+    Write a snapshot into a MySQL table with the insert or upsert writers.
+
+    Rows get fresh `created_at`/`updated_at` timestamps. With `update_columns` rows are
+    upserted and, with `use_row_hash`, their `_row_hash` is kept current so later
+    incremental runs compare against the loaded values. With `queue_depth` > 0 reading
+    the files overlaps with writing (see `db_operations.run_pipeline`).
+
+    Returns:
+        int: The number of rows committed to MySQL.
+    """
+    manifest = read_manifest(path)
+    columns = [tuple(col) for col in manifest["columns"]]
+    final_columns = columns + [("created_at", "DATETIME"), ("updated_at", "DATETIME")]
+    write_update_columns = update_columns
+    hash_indexes = None
+    if update_columns and use_row_hash:
+        ensure_row_hash_column(mysql_conn, destination_table)
+        final_columns = final_columns + [(ROW_HASH_COLUMN, "CHAR")]
+        write_update_columns = update_columns + [ROW_HASH_COLUMN]
+        hash_indexes = column_indexes(columns, update_columns)
+
+    logging.info(
+        f"Loading snapshot of `{manifest['source']}` taken {manifest['created_at']} "
+        f"({manifest['rows']} rows) into `{destination_table}`."
+    )
+    rows_written = 0
+    batch_number = 1
+
+    def convert(rows):
+        converted_chunk, _ = convert_chunk(rows, tuple)
+        if hash_indexes:
+            converted_chunk = [row + (row_hash([row[idx] for idx in hash_indexes]),) for row in converted_chunk]
+        return converted_chunk
+
+    def write(rows):
+        nonlocal rows_written, batch_number
+        batch_info = {"source": manifest["source"], "batch": batch_number, "snapshot": manifest["created_at"]}
+        if load_mode == "load_data":
+            written = load_data_to_mysql(
+                mysql_conn, destination_table, final_columns, rows, primary_key,
+                update_columns=write_update_columns, metrics=metrics, quarantine=quarantine, batch_info=batch_info
+            )
+        elif update_columns:
+            written = upsert_data_to_mysql(
+                mysql_conn, destination_table, final_columns, rows, write_update_columns,
+                metrics=metrics, quarantine=quarantine, batch_info=batch_info
+            )
+        else:
+            written = insert_data_to_mysql(
+                mysql_conn, destination_table, final_columns, rows, primary_key, batch_size=len(rows),
+                metrics=metrics, quarantine=quarantine, batch_info=batch_info
+            )
+        rows_written += written
+        batch_number += 1
+
+    run_pipeline(snapshot_batches(path, manifest), convert, write, queue_depth)
+    logging.info(f"Loaded {rows_written} of {manifest['rows']} snapshot rows into `{destination_table}`.")
+    return rows_written
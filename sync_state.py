@@ -0,0 +1,133 @@
+"""
+Per-mapping sync state persisted in MySQL.
+
+State values, such as the incremental high-watermark, are stored as JSON in a small
+key/value table so a loader can write them in the same transaction as the batch
+they describe.
+"""
+import json
+import logging
+from decimal import Decimal
+from datetime import datetime, date, time as datetime_time
+
+SYNC_STATE_TABLE = "_sync_state"
+
+
+def mapping_key(source_table, destination_table):
+    """Identify a table mapping in the sync-state table."""
+    return f"{source_table}->{destination_table}"
+
+
+def _encode_value(value):
+    """Tag values JSON cannot represent so they round-trip with their source type."""
+    if isinstance(value, datetime):
+        return {"$datetime": value.isoformat()}
+    if isinstance(value, date):
+        return {"$date": value.isoformat()}
+    if isinstance(value, datetime_time):
+        return {"$time": value.isoformat()}
+    if isinstance(value, Decimal):
+        return {"$decimal": str(value)}
+    if isinstance(value, (bytes, bytearray)):
+        return {"$bytes": value.hex()}
+    if isinstance(value, (list, tuple)):
+        return [_encode_value(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _encode_value(item) for key, item in value.items()}
+    return value
+
+
+def _decode_value(value):
+    if isinstance(value, list):
+        return [_decode_value(item) for item in value]
+    if isinstance(value, dict):
+        if "$datetime" in value:
+            return datetime.fromisoformat(value["$datetime"])
+        if "$date" in value:
+            return date.fromisoformat(value["$date"])
+        if "$time" in value:
+            return datetime_time.fromisoformat(value["$time"])
+        if "$decimal" in value:
+            return Decimal(value["$decimal"])
+        if "$bytes" in value:
+            return bytes.fromhex(value["$bytes"])
+        return {key: _decode_value(item) for key, item in value.items()}
+    return value
+
+
+def encode_state(value):
+    return json.dumps(_encode_value(value))
+
+
+def decode_state(text):
+    return _decode_value(json.loads(text))
+
+
+def ensure_sync_state_table(mysql_conn):
+    """Create the sync-state table if it does not exist yet."""
+    cursor = mysql_conn.cursor()
+    try:
+        cursor.execute(f"""
+            CREATE TABLE IF NOT EXISTS `{SYNC_STATE_TABLE}` (
+                `mapping_key` VARCHAR(255) NOT NULL,
+                `state_name` VARCHAR(64) NOT NULL,
+                `state_value` TEXT,
+                `updated_at` DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+                PRIMARY KEY (`mapping_key`, `state_name`)
+            )
+        """)
+        mysql_conn.commit()
+    finally:
+        cursor.close()
+
+
+def load_sync_state(mysql_conn, key, state_name):
+    """Return the stored state value for a mapping, or None if nothing was recorded."""
+    cursor = mysql_conn.cursor()
+    try:
+        cursor.execute(
+            f"SELECT `state_value` FROM `{SYNC_STATE_TABLE}` WHERE `mapping_key` = %s AND `state_name` = %s",
+            (key, state_name)
+        )
+        row = cursor.fetchone()
+    finally:
+        cursor.close()
+    if not row or row[0] is None:
+        return None
+    try:
+        return decode_state(row[0])
+    except (ValueError, TypeError) as e:
+        logging.warning(f"Ignoring unreadable sync state `{state_name}` for {key}: {str(e)}")
+        return None
+
+
+def save_sync_state(cursor, key, state_name, value):
+    """
+    Record a state value through an open cursor without committing.
+
+    Callers commit it together with the batch it belongs to.
+    """
+    cursor.execute(
+        f"""
+        INSERT INTO `{SYNC_STATE_TABLE}` (`mapping_key`, `state_name`, `state_value`)
+        VALUES (%s, %s, %s)
+        ON DUPLICATE KEY UPDATE `state_value` = VALUES(`state_value`)
+        """,
+        (key, state_name, encode_state(value))
+    )
+
+
+def clear_sync_state(mysql_conn, key, state_name=None):
+    """Forget one state value, or all state, for a mapping."""
+    cursor = mysql_conn.cursor()
+    try:
+        if state_name:
+            cursor.execute(
+                f"DELETE FROM `{SYNC_STATE_TABLE}` WHERE `mapping_key` = %s AND `state_name` = %s",
+                (key, state_name)
+            )
+        else:
+            cursor.execute(f"DELETE FROM `{SYNC_STATE_TABLE}` WHERE `mapping_key` = %s", (key,))
+        mysql_conn.commit()
+    finally:
+        cursor.close()
@@ -0,0 +1,201 @@
+"""
+In-memory stand-ins for the ODBC source and the MySQL destination, for loader tests.
+
+`SourceConnection` runs the loaders' queries against an SQLite table, so filters,
+ordering and keyset pagination behave like a real source (use `page_syntax="limit"`).
+`Database` keeps what was committed; each `DestinationConnection` to it has its own
+open transaction, so tests can tell committed rows from rows lost to a rollback.
+"""
+import re
+import sqlite3
+import threading
+
+
+class RejectedRow(Exception):
+    """Raised for a statement holding a row the destination refuses, like a constraint violation."""
+
+
+class SourceCursor:
+    def __init__(self, conn):
+        self.conn = conn
+        self._cursor = None
+
+    def execute(self, query, *params):
+        self.conn.queries.append(query)
+        if self.conn.fail_queries:
+            raise self.conn.fail_queries.pop(0)
+        self._cursor = self.conn.db.execute(query, params)
+
+    def fetchmany(self, size):
+        return [tuple(row) for row in self._cursor.fetchmany(size)]
+
+    def fetchall(self):
+        return [tuple(row) for row in self._cursor.fetchall()]
+
+    def close(self):
+        pass
+
+
+class SourceConnection:
+    """pyodbc-style connection to one SQLite table of `rows` with `columns` (name, SQL type)."""
+
+    def __init__(self, table, columns, rows):
+        self.db = sqlite3.connect(":memory:", check_same_thread=False)
+        self.db.execute(f"CREATE TABLE {table} ({', '.join(f'{name} {sql_type}' for name, sql_type in columns)})")
+        self.db.executemany(f"INSERT INTO {table} VALUES ({', '.join('?' * len(columns))})", rows)
+        self.queries = []
+        # Errors raised by the next queries, in order
+        self.fail_queries = []
+        self.closed = False
+
+    def cursor(self):
+        return SourceCursor(self)
+
+    def close(self):
+        self.closed = True
+
+
+class Database:
+    """Committed rows per table, keyed by their first value, and committed sync state."""
+
+    def __init__(self):
+        self.tables = {}
+        self.state = {}
+        self.lock = threading.Lock()
+
+    def rows(self, table):
+        return sorted(self.tables.get(table, {}).values())
+
+
+class DestinationCursor:
+    def __init__(self, conn):
+        self.conn = conn
+        self.rows = []
+        self.rowcount = 0
+
+    def execute(self, query, params=None):
+        self.conn.statements.append(query)
+        self.rows = []
+        if "_sync_state" in query and query.lstrip().startswith("INSERT"):
+            key, name, value = params
+            self.conn.pending_state[(key, name)] = value
+        elif "_sync_state" in query and query.lstrip().startswith("SELECT"):
+            value = self.conn.database.state.get(tuple(params))
+            self.rows = [(value,)] if value is not None else []
+
+    def executemany(self, query, rows):
+        self.conn.statements.append(query)
+        error = self.conn.fail_writes.pop(0) if self.conn.fail_writes else None
+        if isinstance(error, ConnectionError):
+            self.conn.connected = False
+        if error is not None:
+            raise error
+        if any(value in self.conn.reject for row in rows for value in row):
+            raise RejectedRow(f"Row rejected by `{table_name(query)}`.")
+        self.conn.pending.append((table_name(query), list(rows)))
+        self.rowcount = len(rows)
+
+    def fetchone(self):
+        return self.rows.pop(0) if self.rows else None
+
+    def fetchall(self):
+        rows, self.rows = self.rows, []
+        return rows
+
+    def close(self):
+        pass
+
+
+class DestinationConnection:
+    """
+    MySQL-style connection with its own transaction on a shared `Database`.
+
+    Written rows stay pending until `commit`; `rollback` discards them. A statement with
+    a value in `reject` raises `RejectedRow`, and errors queued in `fail_writes` are
+    raised by the next `executemany` calls (a None lets that call through). A
+    `ConnectionError` also drops the connection until `reconnect`.
+    """
+
+    def __init__(self, database=None, reject=()):
+        self.database = database or Database()
+        self.reject = set(reject)
+        self.pending = []
+        self.pending_state = {}
+        self.statements = []
+        self.fail_writes = []
+        self.commits = 0
+        self.reconnects = 0
+        self.connected = True
+
+    def cursor(self, **kwargs):
+        return DestinationCursor(self)
+
+    def commit(self):
+        with self.database.lock:
+            for table, rows in self.pending:
+                self.database.tables.setdefault(table, {}).update((row[0], row) for row in rows)
+            self.database.state.update(self.pending_state)
+        self.pending = []
+        self.pending_state = {}
+        self.commits += 1
+
+    def rollback(self):
+        self.pending = []
+        self.pending_state = {}
+
+    def is_connected(self):
+        return self.connected
+
+    def reconnect(self, **kwargs):
+        self.rollback()
+        self.reconnects += 1
+        self.connected = True
+
+    def close(self):
+        self.connected = False
+
+
+def table_name(query):
+    match = re.search(r"INTO\s+`([^`]+)`", query)
+    return match.group(1) if match else None
+
+
+class SqliteDestinationCursor:
+    def __init__(self, conn):
+        self.conn = conn
+        self._cursor = None
+
+    def execute(self, query, params=()):
+        self.conn.queries.append(query)
+        self._cursor = self.conn.db.execute(query.replace("%s", "?"), tuple(params or ()))
+
+    def fetchmany(self, size):
+        return [tuple(row) for row in self._cursor.fetchmany(size)]
+
+    def fetchall(self):
+        return [tuple(row) for row in self._cursor.fetchall()]
+
+    def close(self):
+        pass
+
+
+class SqliteDestinationConnection:
+    """MySQL-style connection running `%s` queries against one SQLite table, for read-only checks."""
+
+    def __init__(self, table, columns, rows):
+        self.db = sqlite3.connect(":memory:", check_same_thread=False)
+        self.db.execute(f"CREATE TABLE `{table}` ({', '.join(f'`{name}` {sql_type}' for name, sql_type in columns)})")
+        self.db.executemany(f"INSERT INTO `{table}` VALUES ({', '.join('?' * len(columns))})", rows)
+        self.queries = []
+
+    def cursor(self, **kwargs):
+        return SqliteDestinationCursor(self)
+
+    def commit(self):
+        self.db.commit()
+
+    def rollback(self):
+        self.db.rollback()
+
+    def is_connected(self):
+        return True
@@ -0,0 +1,34 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db_operations import BatchSizer
+
+COLUMNS = [("ID", "INT"), ("NAME", "STRING")]
+
+
+class BatchSizerTest(unittest.TestCase):
+    def test_slow_writes_never_raise_the_budget_above_the_packet_cap(self):
+        sizer = BatchSizer(COLUMNS, 64 * 1024 * 1024, max_bytes=1024 * 1024)
+        self.assertEqual(sizer.byte_budget, 1024 * 1024)
+        for _ in range(20):
+            sizer.observe_write(1000, seconds=60)
+            self.assertLessEqual(sizer.byte_budget, 1024 * 1024)
+        self.assertEqual(sizer.byte_budget, 1024 * 1024 // 8)
+
+    def test_fast_writes_grow_the_budget_up_to_the_cap(self):
+        sizer = BatchSizer(COLUMNS, 100_000, max_bytes=150_000)
+        for _ in range(10):
+            sizer.observe_write(1000, seconds=0.1)
+        self.assertEqual(sizer.byte_budget, 150_000)
+
+    def test_minimum_rows_fit_in_the_cap(self):
+        sizer = BatchSizer(COLUMNS, 10_000, max_bytes=10_000)
+        sizer.row_bytes = 1000
+        self.assertEqual(sizer.rows, 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db_operations import fetch_and_insert_rows
+from sync_state import decode_state, mapping_key
+from tests.fakes import Database, DestinationConnection, SourceConnection
+
+COLUMNS = [("ID", "int"), ("CHANGED", "int"), ("NAME", "str")]
+SQL_COLUMNS = [("ID", "INTEGER"), ("CHANGED", "INTEGER"), ("NAME", "TEXT")]
+STATE_KEY = (mapping_key("SRC", "dest"), "watermark")
+
+
+def source(row_count, bad_ids=()):
+    rows = [(i, 1000 + i, "BAD" if i in bad_ids else f"name {i}") for i in range(1, row_count + 1)]
+    return SourceConnection("SRC", SQL_COLUMNS, rows)
+
+
+def checkpointed_load(odbc_conn, mysql_conn, page_size=None, **kwargs):
+    return fetch_and_insert_rows(
+        10, odbc_conn, mysql_conn, "SRC", "dest", COLUMNS, ["ID"], [], "CHANGED",
+        checkpoint=True, page_size=page_size, page_syntax="limit", **kwargs
+    )
+
+
+class CheckpointTest(unittest.TestCase):
+    def setUp(self):
+        self.database = Database()
+
+    def watermark(self):
+        value = self.database.state.get(STATE_KEY)
+        return decode_state(value) if value is not None else None
+
+    def test_pages_through_the_table_by_key(self):
+        odbc_conn = source(95)
+        rows = checkpointed_load(odbc_conn, DestinationConnection(self.database), page_size=30)
+        self.assertEqual(rows, 95)
+        self.assertEqual(len(self.database.rows("dest")), 95)
+        # Pages of 30, 30, 30 and 5 rows, each query starting after the last key read
+        self.assertEqual(len(odbc_conn.queries), 4)
+        self.assertTrue(all("LIMIT 30" in query for query in odbc_conn.queries))
+        self.assertTrue(all("CHANGED > ?" in query for query in odbc_conn.queries[1:]))
+        self.assertEqual(self.watermark(), [1095, 95])
+
+    def test_next_run_resumes_after_the_watermark(self):
+        checkpointed_load(source(50), DestinationConnection(self.database), page_size=30)
+        odbc_conn = source(70)
+        rows = checkpointed_load(odbc_conn, DestinationConnection(self.database), page_size=30)
+        self.assertEqual(rows, 20)
+        self.assertEqual(len(self.database.rows("dest")), 70)
+        self.assertEqual(self.watermark(), [1070, 70])
+
+    def test_failed_batch_keeps_the_watermark_before_it(self):
+        with self.assertRaises(RuntimeError):
+            checkpointed_load(source(50, bad_ids={34}), DestinationConnection(self.database, reject={"BAD"}))
+        self.assertEqual(self.watermark(), [1030, 30])
+        # The good rows of the bisected batch commit, but its rejected row was only logged
+        self.assertEqual(len(self.database.rows("dest")), 39)
+        # Once the row is fixed the next run picks up the rows after the last commit
+        self.assertEqual(checkpointed_load(source(50), DestinationConnection(self.database)), 20)
+        self.assertEqual(len(self.database.rows("dest")), 50)
+
+
+if __name__ == "__main__":
+    unittest.main()
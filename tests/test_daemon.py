@@ -0,0 +1,117 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from daemon import ConfigWatcher, IntervalScheduler, StatusBoard
+
+FAST = {"source": "A", "destination": "a", "interval": 60}
+SLOW = {"source": "B", "destination": "b"}
+
+
+def summary(mapping, status="ok", rows=10, duration=5.0, error=None):
+    return {
+        "source": mapping["source"], "destination": mapping["destination"],
+        "status": status, "rows": rows, "duration": duration, "error": error,
+    }
+
+
+class IntervalSchedulerTest(unittest.TestCase):
+    def setUp(self):
+        self.scheduler = IntervalScheduler(default_interval=300)
+        self.scheduler.sync([FAST, SLOW])
+
+    def test_new_mappings_are_due_at_once(self):
+        self.assertEqual(self.scheduler.due(1000), [FAST, SLOW])
+
+    def test_running_mapping_is_not_due_again(self):
+        self.scheduler.started(FAST)
+        self.assertEqual(self.scheduler.due(1000), [SLOW])
+        self.assertEqual(self.scheduler.finished(FAST, 1000, 1010), 1060)
+        self.assertEqual(self.scheduler.due(1059), [SLOW])
+        self.assertEqual(self.scheduler.due(1060), [SLOW, FAST])
+
+    def test_overrunning_mapping_runs_again_once_finished(self):
+        self.assertEqual(self.scheduler.finished(FAST, 1000, 1500), 1500)
+        self.assertEqual(self.scheduler.finished(SLOW, 1000, 1010), 1300)
+        self.assertEqual(self.scheduler.seconds_until_next(1200), 100)
+
+    def test_sync_keeps_known_schedules(self):
+        self.scheduler.finished(FAST, 1000, 1010)
+        self.scheduler.sync([FAST])
+        self.assertEqual(self.scheduler.next_due, {key: 1060 for key in self.scheduler.next_due})
+        self.assertIsNone(self.scheduler.finished(SLOW, 1000, 1010))
+
+
+class ConfigWatcherTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.path = os.path.join(self.directory.name, "mappings.json")
+
+    def save(self, mappings, mtime):
+        with open(self.path, "w") as f:
+            json.dump(mappings, f)
+        os.utime(self.path, (mtime, mtime))
+
+    def test_reloads_only_changed_files_and_keeps_the_last_good_mappings(self):
+        loads = []
+        def loader(path):
+            loads.append(path)
+            with open(path) as f:
+                return json.load(f)
+        watcher = ConfigWatcher(self.path, loader)
+        self.assertFalse(watcher.poll())
+        self.save([FAST], 1000)
+        self.assertTrue(watcher.poll())
+        self.assertFalse(watcher.poll())
+        self.assertEqual(len(loads), 1)
+        self.save([], 2000)
+        with self.assertLogs(level="ERROR"):
+            self.assertFalse(watcher.poll())
+        self.assertEqual(watcher.mappings, [FAST])
+        self.save([FAST, SLOW], 3000)
+        self.assertTrue(watcher.poll())
+        self.assertEqual(watcher.mappings, [FAST, SLOW])
+
+
+class StatusBoardTest(unittest.TestCase):
+    def test_records_runs_and_failures(self):
+        scheduler = IntervalScheduler()
+        scheduler.sync([FAST, SLOW])
+        board = StatusBoard()
+        board.set_mappings([FAST, SLOW], scheduler, 1000)
+        board.start(FAST)
+        board.record(summary(FAST), 1000, 1060)
+        board.record(summary(SLOW, status="failed", rows=0, error="gone"), 1000, 1300)
+        status = board.to_dict()
+        fast, slow = status["tables"]
+        self.assertEqual((fast["runs"], fast["running"], fast["last_rows"]), (1, False, 10))
+        self.assertIsNotNone(fast["last_success_at"])
+        self.assertEqual((slow["failures"], slow["last_error"], slow["last_success_at"]), (1, "gone", None))
+        self.assertEqual(status["failing_tables"], 1)
+        # A reload keeps what is known about the mappings that stay
+        board.set_mappings([SLOW], scheduler, 2000)
+        self.assertEqual([table["failures"] for table in board.to_dict()["tables"]], [1])
+
+    def test_stalled_loop_is_unhealthy(self):
+        board = StatusBoard(stale_after=60)
+        self.assertTrue(board.is_healthy())
+        board.heartbeat_at -= 120
+        self.assertFalse(board.to_dict()["healthy"])
+
+    def test_write_replaces_the_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "status.json")
+            board = StatusBoard(path)
+            board.write()
+            with open(path) as f:
+                self.assertEqual(json.load(f)["state"], "running")
+            self.assertEqual(os.listdir(directory), ["status.json"])
+
+
+if __name__ == "__main__":
+    unittest.main()
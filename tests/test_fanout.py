@@ -0,0 +1,40 @@
+import os
+import sys
+import unittest
+from datetime import date, datetime
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fanout import compile_row_filter
+
+COLUMNS = [("CODE", "CHAR"), ("AMOUNT", "DECIMAL"), ("CHANGED", "DATETIME")]
+
+
+class CompileRowFilterTest(unittest.TestCase):
+    def test_no_conditions_keeps_every_row(self):
+        self.assertIsNone(compile_row_filter(COLUMNS))
+
+    def test_filters_match_like_the_source(self):
+        keep = compile_row_filter(COLUMNS, filters={"code": ["A", "B"], "AMOUNT": "1.50"})
+        self.assertTrue(keep(("A   ", Decimal("1.5"), None)))
+        self.assertFalse(keep(("C   ", Decimal("1.5"), None)))
+        self.assertFalse(keep(("A   ", Decimal("2"), None)))
+        self.assertFalse(keep((None, Decimal("1.5"), None)))
+        self.assertTrue(compile_row_filter(COLUMNS, filters={"CODE": None})((None, 0, None)))
+
+    def test_windows_compare_dates_with_timestamps(self):
+        keep = compile_row_filter(COLUMNS, newer_than=[("CHANGED", date(2024, 1, 1))])
+        self.assertTrue(keep(("A", 1, datetime(2024, 1, 1, 0, 0, 1))))
+        self.assertFalse(keep(("A", 1, datetime(2024, 1, 1))))
+        self.assertTrue(keep(("A", 1, "2024-01-02 08:00:00")))
+        self.assertFalse(keep(("A", 1, None)))
+
+    def test_not_null(self):
+        keep = compile_row_filter(COLUMNS, not_null=["CHANGED"])
+        self.assertTrue(keep(("A", 1, date(2024, 1, 1))))
+        self.assertFalse(keep(("A", 1, None)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,46 @@
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# main logs to a file as soon as it is imported
+os.environ.setdefault("LOG_FILE_PATH", os.devnull)
+
+import main
+
+COLUMNS = [("ID", "int"), ("NAME", "str")]
+
+
+def mapping(destination, **options):
+    return {"source": "SRC", "destination": destination, "primary_key": ["ID"], **options}
+
+
+class RowHashValidationTest(unittest.TestCase):
+    def setUp(self):
+        patches = [
+            mock.patch.object(main, "fetch_odbc_metadata", return_value=COLUMNS),
+            mock.patch.object(main, "destination_layouts", {"good": COLUMNS, "bad": COLUMNS}),
+            mock.patch.object(main, "load_mapping", return_value=7),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def test_misconfigured_mapping_fails_alone(self):
+        good = mapping("good", update_columns=["NAME"], row_hash=True)
+        bad = mapping("bad", row_hash=True)
+        summaries = main.migrate_group([good, bad], None, None)
+        self.assertEqual([summary["status"] for summary in summaries], ["ok", "failed"])
+        self.assertIn("row_hash", summaries[1]["error"])
+        self.assertEqual(summaries[0]["rows"], 7)
+        main.load_mapping.assert_called_once()
+
+    def test_plain_mapping_is_rejected_too(self):
+        summary = main.migrate_mapping(mapping("bad", update_columns=["NAME"], primary_key=[], row_hash=True), None, None)
+        self.assertEqual(summary["status"], "failed")
+        main.load_mapping.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
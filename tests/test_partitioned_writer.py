@@ -0,0 +1,90 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db_operations import PartitionedWriter, insert_data_to_mysql
+from retry import RetryPolicy
+from tests.fakes import Database, DestinationConnection
+
+COLUMNS = [("ID", "int"), ("NAME", "str")]
+
+
+def batches(row_count=30, size=3, bad_ids=()):
+    rows = [(i, "BAD" if i in bad_ids else f"name {i}") for i in range(1, row_count + 1)]
+    return [rows[start:start + size] for start in range(0, row_count, size)]
+
+
+class PartitionedWriterTest(unittest.TestCase):
+    def setUp(self):
+        self.database = Database()
+        self.connections = [DestinationConnection(self.database, reject={"BAD"}) for _ in range(3)]
+        self.written = []
+
+    def write_rows(self, conn, rows, batch_number, commit, before_commit=None):
+        self.written.append((self.connections.index(conn), [row[0] for row in rows]))
+        return insert_data_to_mysql(conn, "dest", COLUMNS, rows, ["ID"], len(rows), before_commit=before_commit, commit=commit)
+
+    def writer(self, **kwargs):
+        return PartitionedWriter(self.connections, [0], self.write_rows, **kwargs)
+
+    def submit_all(self, writer, chunks):
+        for number, rows in enumerate(chunks, 1):
+            writer.submit(number, rows, f"state {number}")
+        writer.close()
+
+    def test_rows_of_a_key_always_go_to_the_same_connection(self):
+        writer = self.writer()
+        self.submit_all(writer, batches() + batches())
+        self.assertEqual(writer.rows_written, 60)
+        self.assertEqual(len(self.database.rows("dest")), 30)
+        owners = {}
+        for index, ids in self.written:
+            for id_ in ids:
+                self.assertEqual(owners.setdefault(id_, index), index)
+        self.assertEqual(len(set(owners.values())), 3)
+
+    def test_commits_every_interval(self):
+        writer = self.writer(commit_interval=4)
+        self.submit_all(writer, batches())
+        self.assertEqual(len(self.database.rows("dest")), 30)
+        # 10 sub-batches per writer: two full groups and the rest at close
+        self.assertEqual([conn.commits for conn in self.connections], [3, 3, 3])
+
+    def test_failed_sub_batch_is_rewritten_on_its_own(self):
+        writer = self.writer(commit_interval=4)
+        self.submit_all(writer, batches(bad_ids={14}))
+        self.assertEqual(writer.rows_written, 29)
+        self.assertEqual(len(self.database.rows("dest")), 29)
+
+    def test_durable_state_follows_the_slowest_writer(self):
+        writer = self.writer()
+        self.submit_all(writer, batches())
+        self.assertEqual(writer.pop_durable_state(), "state 10")
+        self.assertIsNone(writer.pop_durable_state())
+
+    def test_checkpoint_stops_at_a_lost_sub_batch(self):
+        writer = self.writer(checkpoint=True)
+        with self.assertRaisesRegex(RuntimeError, "neither written nor quarantined"):
+            self.submit_all(writer, batches(bad_ids={14}))
+
+    def test_writer_error_is_raised(self):
+        def write_rows(conn, rows, batch_number, commit, before_commit=None):
+            raise ValueError("cannot write")
+        writer = PartitionedWriter(self.connections, [0], write_rows)
+        with self.assertRaises(RuntimeError) as raised:
+            self.submit_all(writer, batches())
+        self.assertIsInstance(raised.exception.__cause__, ValueError)
+
+    def test_transient_error_reconnects_and_rewrites_the_group(self):
+        self.connections[0].fail_writes = [ConnectionError("server has gone away")]
+        writer = self.writer(commit_interval=2, retry=RetryPolicy(3, base_delay=0))
+        self.submit_all(writer, batches())
+        self.assertEqual(writer.rows_written, 30)
+        self.assertEqual(len(self.database.rows("dest")), 30)
+        self.assertEqual(self.connections[0].reconnects, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+import os
+import sys
+import threading
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db_operations import run_pipeline
+
+
+class Source:
+    """Endless batches, or `count` of them, then optionally an error; records whether it was closed."""
+
+    def __init__(self, count=None, error=None):
+        self.count = count
+        self.error = error
+        self.read = 0
+        self.closed = threading.Event()
+
+    def __iter__(self):
+        return self.batches()
+
+    def batches(self):
+        try:
+            while self.count is None or self.read < self.count:
+                self.read += 1
+                yield [self.read]
+            if self.error is not None:
+                raise self.error
+        finally:
+            self.closed.set()
+
+
+class RunPipelineTest(unittest.TestCase):
+    def run_both(self, test):
+        for queue_depth in (0, 2):
+            with self.subTest(queue_depth=queue_depth):
+                test(queue_depth)
+
+    def test_writes_every_batch_in_order(self):
+        def test(queue_depth):
+            written = []
+            batches = iter(Source(10))
+            count = run_pipeline(batches, lambda batch: batch * 2, written.append, queue_depth)
+            self.assertEqual(count, 10)
+            self.assertEqual(written, [[n, n] for n in range(1, 11)])
+        self.run_both(test)
+
+    def test_writer_error_stops_the_reader(self):
+        def test(queue_depth):
+            source = Source()
+            def write(batch):
+                if batch == [3]:
+                    raise ValueError("write failed")
+            with self.assertRaisesRegex(ValueError, "write failed"):
+                run_pipeline(iter(source), lambda batch: batch, write, queue_depth)
+            self.assertTrue(source.closed.wait(1))
+            # The reader is held back by the bounded queues
+            self.assertLessEqual(source.read, 3 + 2 * queue_depth + 2)
+        self.run_both(test)
+
+    def test_reader_error_is_raised_after_the_batches_before_it(self):
+        def test(queue_depth):
+            written = []
+            with self.assertRaisesRegex(ConnectionError, "source gone"):
+                run_pipeline(iter(Source(4, ConnectionError("source gone"))), lambda batch: batch, written.append, queue_depth)
+            if queue_depth == 0:
+                self.assertEqual(written, [[1], [2], [3], [4]])
+            else:
+                self.assertLessEqual(len(written), 4)
+        self.run_both(test)
+
+    def test_converter_error_is_raised(self):
+        def test(queue_depth):
+            source = Source()
+            def convert(batch):
+                if batch == [2]:
+                    raise TypeError("bad row")
+                return batch
+            with self.assertRaisesRegex(TypeError, "bad row"):
+                run_pipeline(iter(source), convert, lambda batch: None, queue_depth)
+            self.assertTrue(source.closed.wait(1))
+        self.run_both(test)
+
+    def test_threaded_stages_are_stopped(self):
+        def write(batch):
+            raise ValueError("write failed")
+        before = threading.active_count()
+        with self.assertRaises(ValueError):
+            run_pipeline(iter(Source()), lambda batch: batch, write, 2)
+        self.assertEqual(threading.active_count(), before)
+
+
+if __name__ == "__main__":
+    unittest.main()
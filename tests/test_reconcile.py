@@ -0,0 +1,101 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from reconcile import reconcile_table
+
+
+class FakeCursor:
+    """Cursor returning canned rows; the rows of a key lookup are filtered by its parameters."""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.rows = []
+        self.rowcount = 0
+
+    def execute(self, query, *params):
+        if len(params) == 1 and isinstance(params[0], tuple):
+            params = params[0]
+        self.conn.queries.append((query, params))
+        if query.startswith("DELETE"):
+            self.conn.deleted.extend(params)
+            self.rowcount = len(params)
+            self.rows = []
+        elif params:
+            # Source lookup of single-column keys, matched the way CHAR comparisons ignore padding
+            wanted = {value.rstrip() for value in params}
+            self.rows = [row for row in self.conn.rows if row[0].rstrip() in wanted]
+        else:
+            self.rows = list(self.conn.rows)
+
+    def fetchmany(self, size):
+        rows, self.rows = self.rows[:size], self.rows[size:]
+        return rows
+
+    def fetchall(self):
+        return self.fetchmany(len(self.rows))
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, rows):
+        self.rows = rows
+        self.queries = []
+        self.deleted = []
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+
+class ReconcileCharKeyTest(unittest.TestCase):
+    columns = [("CODE", "str", 5, None, None, 0), ("NAME", "str", 20, None, None, 1)]
+
+    def reconcile(self, source_rows, destination_rows, **kwargs):
+        source = FakeConnection(source_rows)
+        destination = FakeConnection([])
+        keys = FakeConnection(destination_rows)
+        stats = reconcile_table(
+            source, destination, keys, "SRC", "dest", self.columns, ["CODE"], chunk_size=2, **kwargs
+        )
+        return stats, destination.deleted
+
+    def test_padded_source_keys_match_stripped_destination_keys(self):
+        stats, deleted = self.reconcile(
+            [("A    ",), ("B    ",), ("C    ",)],
+            [("A",), ("B",), ("C",), ("D",)]
+        )
+        self.assertEqual(stats["extra"], 1)
+        self.assertEqual(stats["missing"], 0)
+        self.assertEqual(stats["kept"], 0)
+        self.assertEqual(deleted, ["D"])
+
+    def test_padded_keys_kept_after_source_lookup(self):
+        # Out-of-order destination keys are looked up in the source before deleting
+        stats, deleted = self.reconcile(
+            [("A    ",), ("C    ",)],
+            [("C",), ("A",)]
+        )
+        self.assertEqual(stats["kept"], 1)
+        self.assertEqual(stats["extra"], 0)
+        self.assertEqual(deleted, [])
+
+    def test_trimmed_source_keys(self):
+        stats, deleted = self.reconcile(
+            [("A    ",), ("B    ",)], [("A",), ("B",), ("E",)], trim_trailing_spaces=True
+        )
+        self.assertEqual(stats["extra"], 1)
+        self.assertEqual(deleted, ["E"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db_operations import fetch_and_insert_rows
+from retry import RetryPolicy
+from sync_state import decode_state, mapping_key
+from tests.fakes import Database, DestinationConnection, SourceConnection
+
+COLUMNS = [("ID", "int"), ("CHANGED", "int"), ("NAME", "str")]
+SQL_COLUMNS = [("ID", "INTEGER"), ("CHANGED", "INTEGER"), ("NAME", "TEXT")]
+STATE_KEY = (mapping_key("SRC", "dest"), "watermark")
+
+
+def source(row_count):
+    rows = [(i, 1000 + i, f"name {i}") for i in range(1, row_count + 1)]
+    return SourceConnection("SRC", SQL_COLUMNS, rows)
+
+
+def load(odbc_conn, mysql_conn, primary_key=("ID",), sort_column="CHANGED", attempts=3, **kwargs):
+    return fetch_and_insert_rows(
+        10, odbc_conn, mysql_conn, "SRC", "dest", COLUMNS, list(primary_key), [], sort_column,
+        page_syntax="limit", retry=RetryPolicy(attempts, base_delay=0), **kwargs
+    )
+
+
+class ReplayTest(unittest.TestCase):
+    def setUp(self):
+        self.database = Database()
+        self.mysql_conn = DestinationConnection(self.database)
+
+    def test_checkpoint_load_resumes_after_the_last_commit(self):
+        odbc_conn = source(50)
+        # Batches 1-3 commit, batch 4 loses the connection
+        self.mysql_conn.fail_writes = [None, None, None, ConnectionError("server has gone away")]
+        self.assertEqual(load(odbc_conn, self.mysql_conn, checkpoint=True), 50)
+        self.assertEqual(len(self.database.rows("dest")), 50)
+        self.assertEqual(decode_state(self.database.state[STATE_KEY]), [1050, 50])
+        self.assertEqual(self.mysql_conn.reconnects, 1)
+        # Read once from the start, then again after the watermark of batch 3
+        self.assertEqual(len(odbc_conn.queries), 2)
+
+    def test_keyed_load_replays_from_the_start_without_double_counting(self):
+        odbc_conn = source(30)
+        self.mysql_conn.fail_writes = [None, ConnectionError("server has gone away")]
+        self.assertEqual(load(odbc_conn, self.mysql_conn), 30)
+        self.assertEqual(len(self.database.rows("dest")), 30)
+        self.assertEqual(len(odbc_conn.queries), 2)
+
+    def test_transient_error_without_a_key_is_raised(self):
+        self.mysql_conn.fail_writes = [ConnectionError("server has gone away")]
+        with self.assertRaises(ConnectionError):
+            load(source(30), self.mysql_conn, primary_key=())
+
+    def test_gives_up_after_its_attempts(self):
+        odbc_conn = source(30)
+        self.mysql_conn.fail_writes = [TimeoutError("lock wait timeout")] * 3
+        with self.assertRaises(TimeoutError):
+            load(odbc_conn, self.mysql_conn, attempts=2)
+        self.assertEqual(len(odbc_conn.queries), 3)
+        self.assertEqual(self.database.rows("dest"), [])
+
+    def test_retries_start_over_once_a_commit_moves_the_checkpoint(self):
+        odbc_conn = source(50)
+        self.mysql_conn.fail_writes = [TimeoutError("lock wait timeout"), None, TimeoutError("lock wait timeout"), None,
+                                       TimeoutError("lock wait timeout")]
+        self.assertEqual(load(odbc_conn, self.mysql_conn, attempts=1, checkpoint=True), 50)
+        self.assertEqual(len(self.database.rows("dest")), 50)
+        self.assertEqual(len(odbc_conn.queries), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
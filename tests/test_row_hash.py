@@ -0,0 +1,47 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db_operations import split_changed_rows
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def execute(self, query, params):
+        self.conn.queries.append((query, params))
+
+    def fetchall(self):
+        return self.conn.rows
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, rows):
+        self.rows = rows
+        self.queries = []
+
+    def cursor(self):
+        return FakeCursor(self)
+
+
+class SplitChangedRowsTest(unittest.TestCase):
+    def test_padded_char_keys_match_stored_hashes(self):
+        # MySQL returns CHAR keys stripped, the ODBC source returns them padded
+        conn = FakeConnection([("ABC", "h1"), ("XY", "h2")])
+        rows = [("ABC  ", 1, "h1"), ("XY   ", 2, "changed"), ("NEW  ", 3, "h3")]
+        changed, inserted, updated, skipped = split_changed_rows(conn, "dest", ["CODE"], [0], 2, rows)
+        self.assertEqual(changed, rows[1:])
+        self.assertEqual((inserted, updated, skipped), (1, 1, 1))
+        _, params = conn.queries[0]
+        self.assertIn("ABC", params)
+        self.assertIn("ABC  ", params)
+
+
+if __name__ == "__main__":
+    unittest.main()
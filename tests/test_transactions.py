@@ -0,0 +1,110 @@
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import db_operations
+from db_operations import fetch_and_insert_rows
+from quarantine import FileQuarantine
+from tests.fakes import DestinationConnection, SourceConnection
+
+COLUMNS = [("ID", "int"), ("NAME", "str")]
+
+
+def source(row_count=30, bad_ids=()):
+    rows = [(i, "BAD" if i in bad_ids else f"name {i}") for i in range(1, row_count + 1)]
+    return SourceConnection("SRC", [("ID", "INTEGER"), ("NAME", "TEXT")], rows)
+
+
+def insert_rows(odbc_conn, mysql_conn, **kwargs):
+    return fetch_and_insert_rows(
+        3, odbc_conn, mysql_conn, "SRC", "dest", COLUMNS, ["ID"], [], None, **kwargs
+    )
+
+
+class QuarantineTransactionTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.quarantine = FileQuarantine(os.path.join(self.directory.name, "quarantine.jsonl"), "run")
+
+    def tearDown(self):
+        self.quarantine.close()
+        self.directory.cleanup()
+
+    def quarantined(self):
+        self.quarantine.close()
+        path = self.quarantine.path
+        return open(path).read().splitlines() if os.path.exists(path) else []
+
+    def test_own_transaction_batches_are_bisected(self):
+        mysql_conn = DestinationConnection(reject={"BAD"})
+        rows = insert_rows(source(bad_ids={29}), mysql_conn, quarantine=self.quarantine)
+        self.assertEqual(rows, 29)
+        self.assertEqual(len(mysql_conn.database.rows("dest")), 29)
+        self.assertEqual(len(self.quarantined()), 1)
+
+    def test_failed_batch_is_bisected_without_a_quarantine(self):
+        mysql_conn = DestinationConnection(reject={"BAD"})
+        with self.assertLogs(level="ERROR") as logs:
+            rows = insert_rows(source(bad_ids={29}), mysql_conn)
+        self.assertEqual(rows, 29)
+        self.assertEqual(len(mysql_conn.database.rows("dest")), 29)
+        self.assertTrue(any("BAD" in line for line in logs.output))
+
+    def test_failed_committing_batch_of_a_swap_load_fails_the_load(self):
+        # Batch 10 commits batches 1-9 with it; salvaging its good rows would lose theirs
+        mysql_conn = DestinationConnection(reject={"BAD"})
+        with self.assertRaises(RuntimeError):
+            insert_rows(
+                source(bad_ids={29}), mysql_conn, bulk_load=True, commit_interval=10, fail_fast=True,
+                quarantine=self.quarantine
+            )
+        self.assertEqual(mysql_conn.database.rows("dest"), [])
+        self.assertEqual(self.quarantined(), [])
+
+    def test_failed_batch_sharing_a_transaction_is_not_bisected(self):
+        mysql_conn = DestinationConnection(reject={"BAD"})
+        with self.assertRaises(RuntimeError):
+            insert_rows(source(bad_ids={29}), mysql_conn, commit_interval=10, quarantine=self.quarantine)
+        self.assertEqual(mysql_conn.database.rows("dest"), [])
+        self.assertEqual(self.quarantined(), [])
+
+
+class CommitIntervalTest(unittest.TestCase):
+    def test_batches_commit_every_interval(self):
+        mysql_conn = DestinationConnection()
+        self.assertEqual(insert_rows(source(), mysql_conn, commit_interval=4), 30)
+        self.assertEqual(len(mysql_conn.database.rows("dest")), 30)
+        # Batches 4 and 8, then the rest at the end of the load
+        self.assertEqual(mysql_conn.commits, 3)
+
+    def test_failed_batch_within_the_interval_fails_the_load(self):
+        mysql_conn = DestinationConnection(reject={"BAD"})
+        with self.assertRaises(RuntimeError) as raised:
+            insert_rows(source(bad_ids={20}), mysql_conn, commit_interval=4)
+        # Batches 1-4 were committed; batch 7's failure rolled back batches 5 and 6 with it
+        self.assertEqual([row[0] for row in mysql_conn.database.rows("dest")], list(range(1, 13)))
+        self.assertIn("6 rows written since the last commit", str(raised.exception))
+
+    def test_partly_written_committing_batch_fails_the_load(self):
+        # A batch that commits only some of its rows still lost the uncommitted batches before it
+        insert = db_operations.insert_data_to_mysql
+
+        def partly_written(conn, table, columns, rows, *args, commit=True, **kwargs):
+            if not commit:
+                return insert(conn, table, columns, rows, *args, commit=commit, **kwargs)
+            conn.rollback()
+            return insert(conn, table, columns, rows[:1], *args, commit=commit, **kwargs)
+
+        mysql_conn = DestinationConnection()
+        with mock.patch("db_operations.insert_data_to_mysql", side_effect=partly_written):
+            with self.assertRaises(RuntimeError) as raised:
+                insert_rows(source(), mysql_conn, bulk_load=True, commit_interval=4)
+        self.assertIn("9 rows written since the last commit", str(raised.exception))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+import os
+import sys
+import unittest
+from datetime import datetime, timedelta, time
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tests.fakes import SourceConnection, SqliteDestinationConnection
+from verify import TableVerifier, range_predicate, row_checksum, split_at_keys
+
+COLUMNS = [("ID", "int"), ("NAME", "str"), ("AMOUNT", "int")]
+SQL_COLUMNS = [("ID", "INTEGER"), ("NAME", "TEXT"), ("AMOUNT", "INTEGER")]
+
+
+class RowChecksumTest(unittest.TestCase):
+    def test_equal_data_from_both_sides_hashes_equal(self):
+        # As converted from the source, and as mysql-connector returns it
+        source = ("ABC  ", Decimal("1.50"), datetime(2024, 5, 1, 12, 0, 0, 400000), time(8, 30), 7, None)
+        destination = ("ABC", Decimal("1.5"), datetime(2024, 5, 1, 12, 0, 0), timedelta(hours=8, minutes=30), Decimal("7"), None)
+        self.assertEqual(row_checksum(source), row_checksum(destination))
+
+    def test_text_change_changes_checksum(self):
+        self.assertNotEqual(row_checksum((1, "name")), row_checksum((1, "other")))
+
+    def test_null_differs_from_empty_text(self):
+        self.assertNotEqual(row_checksum((1, None)), row_checksum((1, "")))
+
+
+class TextKeyRangeTest(unittest.TestCase):
+    def test_split_at_keys(self):
+        self.assertEqual(
+            split_at_keys((None, None, True), ["b", "b", "d"]),
+            [(None, "b", False), ("b", "d", False), ("d", None, True)]
+        )
+        self.assertIsNone(split_at_keys(("a", "c", False), ["a"]))
+
+    def test_open_range_predicate(self):
+        self.assertEqual(range_predicate("CODE", (None, None, True)), (None, []))
+        self.assertEqual(range_predicate("CODE", (None, "m", False)), ("CODE < ?", ["m"]))
+        self.assertEqual(range_predicate("`CODE`", ("m", None, True), "%s"), ("`CODE` >= %s", ["m"]))
+
+
+
+class TableVerifierTest(unittest.TestCase):
+    def verifier(self, destination_rows, **kwargs):
+        rows = [(i, f"name {i}", i * 10) for i in range(1, 2001)]
+        self.odbc_conn = SourceConnection("SRC", SQL_COLUMNS, rows)
+        self.mysql_conn = SqliteDestinationConnection("dest", SQL_COLUMNS, destination_rows(rows))
+        return TableVerifier(self.odbc_conn, self.mysql_conn, "SRC", "dest", COLUMNS, ["ID"], leaf_rows=100, **kwargs)
+
+    def test_matching_table_reads_only_aggregates(self):
+        report = self.verifier(list).verify(ranges=4)
+        self.assertEqual((report["missing"], report["extra"], report["different"]), (0, 0, 0))
+        self.assertEqual(report["ranges_hashed"], 0)
+        # Bounds plus one aggregate query per range on each side; no row is streamed
+        self.assertEqual(len(self.odbc_conn.queries), 5)
+        self.assertTrue(all("COUNT(*)" in query or "MIN(" in query for query in self.mysql_conn.queries))
+
+    def test_drift_is_narrowed_down_to_its_rows(self):
+        report = self.verifier(lambda rows: [row for row in rows if row[0] != 1500]).verify(ranges=4)
+        self.assertEqual(report["missing"], 1)
+        self.assertLessEqual(report["rows_compared"], 100)
+
+    def test_content_check_is_opt_in(self):
+        edited = lambda rows: [(i, "edited" if i == 700 else name, amount) for i, name, amount in rows]
+        self.assertEqual(self.verifier(edited).verify(ranges=4)["different"], 0)
+        report = self.verifier(edited, content_checksum=True).verify(ranges=4)
+        self.assertEqual(report["different"], 1)
+        self.assertGreater(report["ranges_hashed"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
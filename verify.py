@@ -0,0 +1,581 @@
+"""
+Checksum verification of a destination table against its source.
+
+The table is split into ranges of its first primary key column. For every range both
+databases compute the same aggregates, `COUNT(*)` plus `COUNT` and `SUM` of the numeric
+checksum columns, so a single row per range crosses the wire and a table that matches
+costs a few queries, whatever its size. Ranges that differ are split again until they
+are small enough to compare row by row. As a deeper, opt-in check, ranges whose
+aggregates match can also be compared by a content checksum: the sum of the CRC32 of
+every row's normalised text, with source rows converted the way the loaders convert
+them, so changes to text, date and time columns are caught too, at the cost of reading
+every row of both tables.
+
+Numeric and date keys are split arithmetically. Text keys are split at keys sampled
+in key order, and because each database orders text by its own collation, rows found
+on one side of a text range only are looked up on the other side by key. When the
+collations disagree so much that splitting a range does not make it smaller, the range
+is reported as skipped instead.
+"""
+import math
+import zlib
+import logging
+from decimal import Decimal
+from datetime import datetime, timedelta, time as datetime_time
+from db_operations import (
+    ROW_HASH_COLUMN,
+    build_source_query,
+    column_indexes,
+    compile_row_converter,
+    convert_chunk,
+    normalize_key,
+    row_hash,
+    upsert_data_to_mysql
+)
+from reconcile import delete_keys, DEFAULT_DELETE_BATCH, VERIFY_BATCH
+
+DEFAULT_RANGES = 16
+# Sub-ranges a mismatched range is split into
+DEFAULT_FANOUT = 4
+# Ranges with at most this many rows on either side are compared row by row
+DEFAULT_LEAF_ROWS = 1000
+MAX_DEPTH = 32
+# Example keys kept in the report per mismatched range and kind of difference
+SAMPLE_KEYS = 20
+# Source column types summed by default; FLOAT columns round, so floats are left out
+CHECKSUM_TYPES = {"int", "Decimal"}
+SPLIT_TYPES = {"int", "Decimal", "float", "date", "datetime"}
+# First key column types split at sampled keys instead
+SAMPLED_SPLIT_TYPES = {"str"}
+# Rows fetched per round trip while computing a content checksum
+CHECKSUM_FETCH_ROWS = 10000
+CHECKSUM_MASK = (1 << 64) - 1
+
+
+def split_range(key_range, parts):
+    """
+    Split a (low, high, closed) key range into up to `parts` contiguous ranges.
+
+    A range includes `low` and excludes `high` unless `closed` is set.
+
+    Returns:
+        list: The sub-ranges, or None when the range holds a single key value.
+    """
+    low, high, closed = key_range
+    if low == high:
+        return None
+    if isinstance(low, int):
+        span = high - low + (1 if closed else 0)
+        step = max(1, -(-span // parts))
+        bounds = list(range(low + step, low + span, step))
+    else:
+        step = (high - low) / parts
+        bounds = [low + step * i for i in range(1, parts)]
+    distinct_bounds = []
+    for bound in bounds:
+        if low < bound and (bound < high or (closed and bound == high)) and (not distinct_bounds or bound > distinct_bounds[-1]):
+            distinct_bounds.append(bound)
+    if not distinct_bounds:
+        return None
+    edges = [low] + distinct_bounds + [high]
+    ranges = [(lower, upper, False) for lower, upper in zip(edges, edges[1:])]
+    ranges[-1] = (ranges[-1][0], high, closed)
+    return ranges
+
+
+def range_predicate(column, key_range, placeholder="?"):
+    """`column` within a (low, high, closed) range; a None bound leaves that end open."""
+    low, high, closed = key_range
+    terms, params = [], []
+    if low is not None:
+        terms.append(f"{column} >= {placeholder}")
+        params.append(low)
+    if high is not None:
+        terms.append(f"{column} {'<=' if closed else '<'} {placeholder}")
+        params.append(high)
+    return " AND ".join(terms) or None, params
+
+
+def split_at_keys(key_range, keys):
+    """
+    Split a (low, high, closed) range at `keys`, given in key order.
+
+    Returns:
+        list: The sub-ranges, or None when no key lies strictly inside the range.
+    """
+    low, high, closed = key_range
+    bounds = []
+    for key in keys:
+        if key != low and key != high and (not bounds or key != bounds[-1]):
+            bounds.append(key)
+    if not bounds:
+        return None
+    edges = [low] + bounds + [high]
+    ranges = [(lower, upper, False) for lower, upper in zip(edges, edges[1:])]
+    ranges[-1] = (ranges[-1][0], high, closed)
+    return ranges
+
+
+def comparable(value):
+    """Normalise a value read from either side so equal data compares equal."""
+    if isinstance(value, timedelta):
+        # mysql-connector returns TIME columns as timedelta
+        seconds = int(value.total_seconds())
+        return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+    if isinstance(value, datetime_time):
+        return value.strftime("%H:%M:%S")
+    if isinstance(value, str):
+        # CHAR columns drop trailing spaces
+        return value.rstrip()
+    if isinstance(value, bytearray):
+        return bytes(value)
+    return value
+
+
+def checksum_text(value):
+    """
+    Text form of a value for the content checksum, the same for equal data on both sides.
+
+    Values are normalised like `comparable`; numbers lose trailing zeros, floats keep six
+    significant digits and datetimes are rounded to the second, as DATETIME columns do.
+    """
+    value = comparable(value)
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return str(int(value))
+    if isinstance(value, Decimal):
+        return format(value.normalize(), "f")
+    if isinstance(value, float):
+        return f"{value:.6g}"
+    if isinstance(value, datetime):
+        return (value + timedelta(microseconds=500000)).replace(microsecond=0).isoformat(" ")
+    if isinstance(value, bytes):
+        return value.hex()
+    return str(value)
+
+
+def row_checksum(values):
+    """CRC32 of a row's normalised text (see `checksum_text`)."""
+    return zlib.crc32("\x1f".join(checksum_text(value) for value in values).encode("utf-8"))
+
+
+def values_match(source_value, destination_value):
+    a, b = comparable(source_value), comparable(destination_value)
+    if a is None or b is None:
+        return a is b
+    if isinstance(a, float) or isinstance(b, float):
+        return math.isclose(float(a), float(b), rel_tol=1e-6)
+    if isinstance(a, datetime) and isinstance(b, datetime):
+        # DATETIME columns round fractional seconds
+        return abs((a - b).total_seconds()) < 1
+    return a == b
+
+
+def _aggregates(row):
+    return [None if value is None else Decimal(str(value)) for value in row]
+
+
+class TableVerifier:
+    """
+    Compares one mapping's source and destination range by range.
+
+    `columns` is the column metadata the mapping copies (read with `select_columns`,
+    `SELECT *` by default). `source_filter` and `destination_filter` are the mapping's
+    filters as (predicate, params) pairs for each side. With `resync` mismatched rows are
+    upserted from the source and rows only in MySQL are deleted; `row_hash_columns`
+    keeps `_row_hash` current for `row_hash` mappings. By default only the aggregates are
+    compared; with `content_checksum` ranges whose aggregates match are also compared by
+    a checksum of their rows' content, which reads every row of both tables once.
+    """
+
+    def __init__(
+        self, odbc_conn, mysql_conn, source_table, destination_table, columns, primary_key,
+        exceptions=None, trim_trailing_spaces=False, select_columns=None, source_filter=None, destination_filter=None,
+        checksum_columns=None, fanout=DEFAULT_FANOUT, leaf_rows=DEFAULT_LEAF_ROWS, full=False, resync=False,
+        row_hash_columns=None, content_checksum=False
+    ):
+        if not primary_key:
+            raise ValueError(f"Verifying `{destination_table}` requires a primary_key.")
+        self.odbc_conn = odbc_conn
+        self.mysql_conn = mysql_conn
+        self.source_table = source_table
+        self.destination_table = destination_table
+        self.columns = columns
+        self.column_names = [col[0] for col in columns]
+        self.key_columns = list(primary_key)
+        self.key_indexes = column_indexes(columns, primary_key)
+        self.split_column = self.key_columns[0]
+        split_type = columns[self.key_indexes[0]][1]
+        if split_type not in SPLIT_TYPES | SAMPLED_SPLIT_TYPES:
+            raise ValueError(
+                f"Verifying `{destination_table}` needs a numeric, date or text first primary key column; "
+                f"`{self.split_column}` is {split_type}."
+            )
+        self.sampled_split = split_type in SAMPLED_SPLIT_TYPES
+        if checksum_columns is None:
+            checksum_columns = [col[0] for col in columns if col[1] in CHECKSUM_TYPES]
+        self.checksum_columns = checksum_columns
+        self.select_columns = select_columns
+        self.source_filter = source_filter or (None, [])
+        self.destination_filter = destination_filter or (None, [])
+        self.row_converter = compile_row_converter(columns, exceptions, trim_trailing_spaces)
+        self.fanout = fanout
+        self.leaf_rows = leaf_rows
+        self.full = full
+        self.resync = resync
+        self.content_checksum = content_checksum
+        self.row_hash_indexes = column_indexes(columns, row_hash_columns) if row_hash_columns else None
+        # Keys of text-keyed rows already compared outside the range they were found in
+        self._cross_checked = set()
+        self.report = {
+            "source": source_table, "destination": destination_table, "ranges_checked": 0, "ranges_hashed": 0,
+            "ranges_compared": 0, "rows_compared": 0, "missing": 0, "extra": 0, "different": 0, "written": 0,
+            "deleted": 0, "ranges_skipped": 0, "mismatches": [], "skipped": [],
+        }
+
+    def _source_query(self, select, key_range):
+        predicate, params = range_predicate(self.split_column, key_range)
+        filter_predicate, filter_params = self.source_filter
+        return build_source_query(self.source_table, [filter_predicate, predicate], select=select), [*filter_params, *params]
+
+    def _destination_query(self, select, key_range):
+        predicate, params = range_predicate(f"`{self.split_column}`", key_range, "%s")
+        filter_predicate, filter_params = self.destination_filter
+        where = " AND ".join(f"({term})" for term in (filter_predicate, predicate) if term)
+        query = f"SELECT {', '.join(select)} FROM `{self.destination_table}`" + (f" WHERE {where}" if where else "")
+        return query, (*filter_params, *params)
+
+    def _fetch_source(self, query, params):
+        cursor = self.odbc_conn.cursor()
+        try:
+            cursor.execute(query, *params)
+            return cursor.fetchall()
+        finally:
+            cursor.close()
+
+    def _fetch_destination(self, query, params):
+        cursor = self.mysql_conn.cursor()
+        try:
+            cursor.execute(query, params)
+            return cursor.fetchall()
+        finally:
+            cursor.close()
+
+    def _stream_source(self, query, params):
+        cursor = self.odbc_conn.cursor()
+        try:
+            cursor.execute(query, *params)
+            while True:
+                rows = cursor.fetchmany(CHECKSUM_FETCH_ROWS)
+                if not rows:
+                    return
+                yield rows
+        finally:
+            cursor.close()
+
+    def _stream_destination(self, query, params):
+        cursor = self.mysql_conn.cursor()
+        try:
+            cursor.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(CHECKSUM_FETCH_ROWS)
+                if not rows:
+                    return
+                yield rows
+        finally:
+            cursor.close()
+
+    def key_bounds(self):
+        """
+        Smallest and largest split key on either side.
+
+        Text keys are not bounded by value, because the two sides may order them
+        differently: the first range is open at both ends.
+
+        Returns:
+            tuple: A closed (low, high, True) range, or None when both sides are empty.
+        """
+        if self.sampled_split:
+            return None, None, True
+        filter_predicate, filter_params = self.source_filter
+        source = self._fetch_source(
+            build_source_query(self.source_table, [filter_predicate], select=[f"MIN({self.split_column})", f"MAX({self.split_column})"]),
+            filter_params
+        )[0]
+        filter_predicate, filter_params = self.destination_filter
+        destination = self._fetch_destination(
+            f"SELECT MIN(`{self.split_column}`), MAX(`{self.split_column}`) FROM `{self.destination_table}`"
+            + (f" WHERE {filter_predicate}" if filter_predicate else ""),
+            tuple(filter_params)
+        )[0]
+        lows = [value for value in (source[0], destination[0]) if value is not None]
+        highs = [value for value in (source[1], destination[1]) if value is not None]
+        if not lows:
+            return None
+        return min(lows), max(highs), True
+
+    def aggregates(self, key_range):
+        """
+        `COUNT(*)` plus `COUNT` and `SUM` of every checksum column, from both sides.
+
+        Returns:
+            tuple: (source aggregates, destination aggregates) as lists of Decimals.
+        """
+        terms = ["COUNT(*)"]
+        destination_terms = ["COUNT(*)"]
+        for col in self.checksum_columns:
+            terms += [f"COUNT({col})", f"SUM({col})"]
+            destination_terms += [f"COUNT(`{col}`)", f"SUM(`{col}`)"]
+        source = self._fetch_source(*self._source_query(terms, key_range))[0]
+        destination = self._fetch_destination(*self._destination_query(destination_terms, key_range))[0]
+        return _aggregates(source), _aggregates(destination)
+
+    def content_checksums(self, key_range):
+        """
+        Sum of `row_checksum` over the rows of a range, from both sides.
+
+        Rows are streamed and hashed here, source rows after conversion, so both sides
+        hash the same normalised text; rows that fail conversion are hashed as read.
+
+        Returns:
+            tuple: (source checksum, destination checksum), each a (rows, sum) pair.
+        """
+        width = len(self.columns)
+        source_rows, source_sum = 0, 0
+        for chunk in self._stream_source(*self._source_query(self.select_columns, key_range)):
+            converted_rows, bad_rows = convert_chunk(chunk, self.row_converter)
+            for row in converted_rows + bad_rows:
+                source_sum += row_checksum(row[:width])
+            source_rows += len(chunk)
+        destination_rows, destination_sum = 0, 0
+        for chunk in self._stream_destination(*self._destination_query([f"`{name}`" for name in self.column_names], key_range)):
+            for row in chunk:
+                destination_sum += row_checksum(row)
+            destination_rows += len(chunk)
+        return (source_rows, source_sum & CHECKSUM_MASK), (destination_rows, destination_sum & CHECKSUM_MASK)
+
+    def sample_keys(self, key_range, parts, side_rows):
+        """
+        Split keys for a text-keyed range: every `rows / parts`-th key in key order, read
+        from MySQL, or from the source when MySQL has no rows in the range.
+
+        Returns:
+            list: The keys, without trailing spaces.
+        """
+        source_rows, destination_rows = side_rows
+        if destination_rows:
+            rows = destination_rows
+            query, params = self._destination_query([f"`{self.split_column}`"], key_range)
+            batches = self._stream_destination(f"{query} ORDER BY `{self.split_column}`", params)
+        else:
+            rows = source_rows
+            query, params = self._source_query([self.split_column], key_range)
+            batches = self._stream_source(f"{query} ORDER BY {self.split_column}", params)
+        step = max(1, -(-rows // parts))
+        keys = []
+        position = 0
+        for chunk in batches:
+            for row in chunk:
+                position += 1
+                if position % step == 0 and position < rows:
+                    keys.append(comparable(row[0]))
+        return keys
+
+    def split(self, key_range, parts, side_rows):
+        """Split a range into up to `parts` sub-ranges; None when it cannot be split further."""
+        if self.sampled_split:
+            return split_at_keys(key_range, self.sample_keys(key_range, parts, side_rows))
+        return split_range(key_range, parts)
+
+    def verify(self, ranges=DEFAULT_RANGES):
+        """
+        Verify the whole table, starting from `ranges` ranges.
+
+        Returns:
+            dict: The report: counts of ranges checked, checked by content and compared
+            row by row, rows compared, `missing`, `extra` and `different` rows, rows
+            `written` and `deleted` by a resync, one entry per mismatched range, and the
+            text-key ranges that were `skipped`.
+        """
+        bounds = self.key_bounds()
+        if bounds is not None:
+            # Text keys start from one range; it is only split, at sampled keys, if it differs
+            initial = [bounds] if self.sampled_split else split_range(bounds, ranges) or [bounds]
+            for key_range in initial:
+                self.verify_range(key_range, 0)
+        report = self.report
+        logging.info(
+            f"Verified `{self.source_table}` -> `{self.destination_table}`: {report['ranges_checked']} ranges checked "
+            f"({report['ranges_hashed']} by content), "
+            f"{report['ranges_compared']} compared row by row ({report['rows_compared']} source rows); "
+            f"{report['missing']} missing, {report['extra']} extra, {report['different']} different"
+            + (f"; {report['written']} rows rewritten, {report['deleted']} deleted" if self.resync else "")
+            + (f"; {report['ranges_skipped']} ranges skipped." if report["ranges_skipped"] else ".")
+        )
+        return report
+
+    def verify_range(self, key_range, depth, parent_rows=None):
+        source, destination = self.aggregates(key_range)
+        self.report["ranges_checked"] += 1
+        if source == destination and not self.full:
+            if not self.content_checksum or source[0] == 0:
+                return
+            self.report["ranges_hashed"] += 1
+            source_checksum, destination_checksum = self.content_checksums(key_range)
+            if source_checksum == destination_checksum:
+                return
+        side_rows = (int(source[0]), int(destination[0]))
+        rows = max(side_rows)
+        if rows == 0:
+            return
+        sub_ranges = None
+        if rows > self.leaf_rows and depth < MAX_DEPTH:
+            if self.sampled_split and parent_rows is not None and rows >= parent_rows:
+                # The sides order the keys so differently that splitting gets nowhere
+                self.skip_range(key_range, side_rows)
+                return
+            sub_ranges = self.split(key_range, self.fanout, side_rows)
+        if not sub_ranges:
+            self.compare_rows(key_range)
+            return
+        for sub_range in sub_ranges:
+            self.verify_range(sub_range, depth + 1, rows)
+
+    def skip_range(self, key_range, side_rows):
+        low, high, closed = key_range
+        logging.warning(
+            f"`{self.destination_table}` differs for {self.split_column} in [{low}, {high}{']' if closed else ')'}, "
+            f"but the source and MySQL order `{self.split_column}` too differently to narrow it down; "
+            f"{max(side_rows)} rows left unverified."
+        )
+        self.report["ranges_skipped"] += 1
+        self.report["skipped"].append({"range": [low, high, closed], "source_rows": side_rows[0], "destination_rows": side_rows[1]})
+
+    def _key(self, row):
+        return tuple(comparable(row[idx]) for idx in self.key_indexes)
+
+    def compare_rows(self, key_range):
+        """Compare one range row by row, record the differences and resync them if asked."""
+        source_rows = self._fetch_source(*self._source_query(self.select_columns, key_range))
+        converted_rows, bad_rows = convert_chunk(source_rows, self.row_converter)
+        destination_rows = self._fetch_destination(
+            *self._destination_query([f"`{name}`" for name in self.column_names], key_range)
+        )
+        self.report["ranges_compared"] += 1
+        self.report["rows_compared"] += len(source_rows)
+
+        # Converted rows end with `created_at`/`updated_at`, which are not compared
+        width = len(self.columns)
+        source_by_key = {self._key(row): row for row in converted_rows}
+        destination_by_key = {self._key(row): row for row in destination_rows}
+        # Rows that failed conversion still exist in the source and are never deleted
+        unconverted = {self._key(row) for row in bad_rows}
+        if self.sampled_split:
+            self.cross_check(source_by_key, destination_by_key, unconverted)
+        missing = [key for key in source_by_key if key not in destination_by_key]
+        extra = [key for key in destination_by_key if key not in source_by_key and key not in unconverted]
+        different = []
+        for key, row in source_by_key.items():
+            destination_row = destination_by_key.get(key)
+            if destination_row is None:
+                continue
+            columns = [
+                self.column_names[idx] for idx in range(width) if not values_match(row[idx], destination_row[idx])
+            ]
+            if columns:
+                different.append({"key": list(key), "columns": columns})
+        if not (missing or extra or different):
+            return
+
+        low, high, closed = key_range
+        logging.warning(
+            f"`{self.destination_table}` differs for {self.split_column} in [{low}, {high}{']' if closed else ')'}: "
+            f"{len(missing)} missing, {len(extra)} extra, {len(different)} different rows."
+        )
+        self.report["missing"] += len(missing)
+        self.report["extra"] += len(extra)
+        self.report["different"] += len(different)
+        self.report["mismatches"].append({
+            "range": [low, high, closed],
+            "source_rows": len(source_rows),
+            "destination_rows": len(destination_rows),
+            "missing": [list(key) for key in missing[:SAMPLE_KEYS]],
+            "extra": [list(key) for key in extra[:SAMPLE_KEYS]],
+            "different": different[:SAMPLE_KEYS],
+        })
+        if self.resync:
+            rewrite = [source_by_key[key] for key in missing] + [source_by_key[tuple(entry["key"])] for entry in different]
+            self.write_rows(rewrite)
+            self.delete_rows([tuple(destination_by_key[key][idx] for idx in self.key_indexes) for key in extra])
+
+    def cross_check(self, source_by_key, destination_by_key, unconverted):
+        """
+        Look up the keys found on one side of a text-keyed range only on the other side.
+
+        Each database orders text by its own collation, so a row can fall into this range
+        on one side and into a neighbouring one on the other. Rows found by key are
+        added to the range and compared here; rows compared that way in an earlier range
+        are left out.
+        """
+        for key in self._cross_checked:
+            if (key in source_by_key) != (key in destination_by_key):
+                source_by_key.pop(key, None)
+                destination_by_key.pop(key, None)
+        only_source = [key for key in source_by_key if key not in destination_by_key]
+        only_destination = [key for key in destination_by_key if key not in source_by_key and key not in unconverted]
+        for row in self._rows_by_key(
+            [normalize_key(source_by_key[key][idx] for idx in self.key_indexes) for key in only_source], destination=True
+        ):
+            destination_by_key[self._key(row)] = row
+            self._cross_checked.add(self._key(row))
+        found = self._rows_by_key([tuple(destination_by_key[key][idx] for idx in self.key_indexes) for key in only_destination])
+        converted_rows, bad_rows = convert_chunk(found, self.row_converter)
+        for row in converted_rows:
+            source_by_key[self._key(row)] = row
+        unconverted.update(self._key(row) for row in bad_rows)
+        self._cross_checked.update(self._key(row) for row in found)
+
+    def _rows_by_key(self, keys, destination=False):
+        """Fetch the rows with the given primary keys from the source, or from the destination."""
+        placeholder = "%s" if destination else "?"
+        column = (lambda name: f"`{name}`") if destination else (lambda name: name)
+        match = " AND ".join(f"{column(name)} = {placeholder}" for name in self.key_columns)
+        filter_predicate, filter_params = self.destination_filter if destination else self.source_filter
+        rows = []
+        for start in range(0, len(keys), VERIFY_BATCH):
+            batch = keys[start:start + VERIFY_BATCH]
+            predicate = " OR ".join([f"({match})"] * len(batch))
+            params = [*filter_params, *[value for key in batch for value in key]]
+            if destination:
+                where = " AND ".join(f"({term})" for term in (filter_predicate, predicate) if term)
+                rows += self._fetch_destination(
+                    f"SELECT {', '.join(column(name) for name in self.column_names)} FROM `{self.destination_table}` WHERE {where}",
+                    tuple(params)
+                )
+            else:
+                rows += self._fetch_source(
+                    build_source_query(self.source_table, [filter_predicate, predicate], select=self.select_columns), params
+                )
+        return rows
+
+    def write_rows(self, rows):
+        """Upsert converted source rows over whatever MySQL holds for their keys."""
+        if not rows:
+            return
+        final_columns = self.columns + [("created_at", "DATETIME"), ("updated_at", "DATETIME")]
+        update_columns = [name for name in self.column_names if name not in self.key_columns] or self.key_columns[:1]
+        if self.row_hash_indexes:
+            final_columns = final_columns + [(ROW_HASH_COLUMN, "CHAR")]
+            update_columns = update_columns + [ROW_HASH_COLUMN]
+            rows = [row + (row_hash([row[idx] for idx in self.row_hash_indexes]),) for row in rows]
+        self.report["written"] += upsert_data_to_mysql(
+            self.mysql_conn, self.destination_table, final_columns, rows, update_columns,
+            batch_info={"source": self.source_table, "verify": True}
+        )
+
+    def delete_rows(self, keys):
+        for start in range(0, len(keys), DEFAULT_DELETE_BATCH):
+            self.report["deleted"] += delete_keys(
+                self.mysql_conn, self.destination_table, self.key_columns, keys[start:start + DEFAULT_DELETE_BATCH]
+            )